@@ -0,0 +1,335 @@
+import asyncio
+import logging
+import weakref
+
+import httpx
+
+import bulk_delete
+import governor
+from wordpress_client import (
+    WordpressAuthError,
+    build_post_payload,
+    media_upload_fields,
+    parse_daily_views,
+    parse_media_response,
+    parse_posts,
+    parse_search_terms,
+    select_account,
+)
+
+try:  # HTTP/2 needs the optional ``h2`` package
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - depends on environment
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+logger = logging.getLogger(__name__)
+
+# One connection pool per event loop, shared by every AsyncWordpressClient.
+_SHARED_HTTP: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Return the pooled ``httpx.AsyncClient`` for the running event loop.
+
+    HTTP/2 is negotiated when the ``h2`` package is installed; otherwise
+    keep-alive HTTP/1.1 connections are pooled.
+    """
+    loop = asyncio.get_running_loop()
+    http = _SHARED_HTTP.get(loop)
+    if http is None or http.is_closed:
+        http = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        _SHARED_HTTP[loop] = http
+    return http
+
+
+async def close_shared_http_client() -> None:
+    """Close the pooled client of the running event loop, if any."""
+    http = _SHARED_HTTP.pop(asyncio.get_running_loop(), None)
+    if http is not None:
+        await http.aclose()
+
+
+class AsyncWordpressClient:
+    """Asynchronous counterpart of :class:`wordpress_client.WordpressClient`.
+
+    All API methods are coroutines and share a connection-pooled
+    ``httpx.AsyncClient`` unless ``http`` is supplied, so many calls can be
+    awaited concurrently without a thread each.
+    """
+
+    TOKEN_URL = "https://public-api.wordpress.com/oauth2/token"
+    API_BASE = "https://public-api.wordpress.com/rest/v1.1/sites/{site}"
+
+    def __init__(
+        self,
+        config: dict,
+        http: httpx.AsyncClient | None = None,
+        timeout: int = 300,
+    ):
+        self.config = config or {}
+        self.http = http
+        self.timeout = timeout
+        acct = select_account(self.config)
+        self.site = acct.get("site")
+        self.client_id = acct.get("client_id")
+        self.client_secret = acct.get("client_secret")
+        self.username = acct.get("username")
+        self.password = acct.get("password")
+        self.plan_id: str | None = acct.get("plan_id")
+        self.access_token: str | None = None
+        self.headers: dict[str, str] = {}
+        # Retry and rate-limit policy; ``None`` uses the shared governor.
+        self.governor: governor.Governor | None = None
+
+    def _site_url(self, path: str = "") -> str:
+        return f"{self.API_BASE.format(site=self.site)}{path}"
+
+    async def _request(
+        self, method: str, url: str, idempotent: bool | None = None, **kwargs
+    ) -> httpx.Response:
+        """Send a request, re-authenticating once when the token is rejected.
+
+        Requests are paced and retried by the :mod:`governor`; ``idempotent``
+        marks a ``POST`` as safe to repeat.
+        """
+        http = self.http or get_shared_http_client()
+        gov = self.governor or governor.GOVERNOR
+        kwargs.setdefault("timeout", self.timeout)
+
+        def send():
+            return http.request(method, url, headers=self.headers, **kwargs)
+
+        resp = await gov.arequest(send, url, method, idempotent)
+        if (
+            resp.status_code == 401
+            and url != self.TOKEN_URL
+            and self.access_token is not None
+        ):
+            logger.debug("Access token rejected, re-authenticating")
+            await self.authenticate()
+            resp = await gov.arequest(send, url, method, idempotent)
+        return resp
+
+    async def authenticate(self) -> None:
+        """Authenticate and store the access token for later requests."""
+        data = {
+            "grant_type": "password",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "username": self.username,
+            "password": self.password,
+            "scope": "global",
+        }
+        try:
+            resp = await self._request("POST", self.TOKEN_URL, data=data)
+            logger.debug(
+                "Auth response status: %s, body: [redacted]", resp.status_code
+            )
+            resp.raise_for_status()
+            token = resp.json().get("access_token")
+            if not token:
+                raise WordpressAuthError("No access_token in response")
+            self.access_token = token
+            self.headers["Authorization"] = f"Bearer {token}"
+        except Exception as exc:
+            raise WordpressAuthError(f"Authentication failed: {exc}") from exc
+
+    async def _call(self, what: str, method: str, url: str, **kwargs):
+        """Perform a request and return its JSON body or raise ``RuntimeError``."""
+        resp: httpx.Response | None = None
+        try:
+            resp = await self._request(method, url, **kwargs)
+            resp.raise_for_status()
+            return resp.json() if resp.content else {}
+        except Exception as exc:
+            if resp is not None:
+                logger.debug("%s failed: %s %s", what, resp.status_code, resp.text)
+            raise RuntimeError(f"{what} failed: {exc}") from exc
+
+    async def upload_media(
+        self, content: bytes, filename: str, alt: str | None = None
+    ) -> dict:
+        """Upload media bytes, with optional alt text, and return ID and URL."""
+        data = await self._call(
+            "Media upload",
+            "POST",
+            self._site_url("/media/new"),
+            files={"media[]": (filename, content)},
+            data=media_upload_fields(alt),
+        )
+        return parse_media_response(data)
+
+    async def create_post(
+        self,
+        title: str,
+        html: str,
+        featured_id: int | None = None,
+        paid_content: str | None = None,
+        categories: list[str] | None = None,
+        tags: list[str] | None = None,
+        slug: str | None = None,
+        excerpt: str | None = None,
+    ) -> dict:
+        """Create and publish a post with optional featured image."""
+        payload = build_post_payload(
+            title,
+            html,
+            featured_id,
+            paid_content=paid_content,
+            categories=categories,
+            tags=tags,
+            slug=slug,
+            excerpt=excerpt,
+        )
+        data = await self._call(
+            "Post creation", "POST", self._site_url("/posts/new"), json=payload
+        )
+        return {"id": data.get("ID"), "link": data.get("URL") or data.get("link")}
+
+    async def list_posts(
+        self,
+        page: int = 1,
+        number: int = 10,
+        status: str | None = None,
+        fields: str | None = None,
+    ) -> list[dict]:
+        """Return posts with basic information, optionally only ``fields``."""
+        params = {"page": page, "number": number}
+        if status is not None:
+            params["status"] = status
+        if fields is not None:
+            params["fields"] = fields
+        data = await self._call(
+            "Fetching posts", "GET", self._site_url("/posts"), params=params
+        )
+        return parse_posts(data)
+
+    async def delete_post(self, post_id: int, permanent: bool = False) -> int:
+        """Delete a post by ID and return the deleted ID."""
+        params = {"force": 1} if permanent else None
+        await self._call(
+            "Post deletion",
+            "POST",
+            self._site_url(f"/posts/{post_id}/delete"),
+            params=params,
+            idempotent=True,
+        )
+        return post_id
+
+    async def empty_trash(self) -> list[int]:
+        """Permanently remove all trashed posts, deleting each page concurrently.
+
+        At most :data:`bulk_delete.MAX_WORKERS` deletions run at once.
+        """
+        limit = asyncio.Semaphore(bulk_delete.MAX_WORKERS)
+
+        async def delete(pid: int) -> int:
+            async with limit:
+                return await self.delete_post(pid, permanent=True)
+
+        deleted: list[int] = []
+        while True:
+            # Deleting shifts later posts forward, so always read page 1.
+            items = await self.list_posts(page=1, number=100, status="trash")
+            if not items:
+                break
+            ids = [item["id"] for item in items]
+            results = await asyncio.gather(
+                *(delete(pid) for pid in ids),
+                return_exceptions=True,
+            )
+            done = [pid for pid, res in zip(ids, results) if res == pid]
+            deleted.extend(done)
+            if not done or len(items) < 100:
+                break
+        return deleted
+
+    async def get_site_info(self, fields: str | None = None) -> dict:
+        """Return information about the site."""
+        params = {"fields": fields} if fields else None
+        return await self._call(
+            "Fetching site info", "GET", self._site_url(), params=params
+        )
+
+    async def list_media(
+        self, post_id: int | None = None, page: int = 1, number: int = 100
+    ) -> list[dict]:
+        """Return media library items."""
+        params = {"page": page, "number": number}
+        if post_id is not None:
+            params["post_ID"] = post_id
+        data = await self._call(
+            "Fetching media", "GET", self._site_url("/media"), params=params
+        )
+        return data.get("media", [])
+
+    async def update_media_alt_text(self, media_id: int, alt_text: str) -> dict:
+        """Update the alt text for a media item."""
+        return await self._call(
+            "Updating media alt text",
+            "POST",
+            self._site_url(f"/media/{media_id}"),
+            json={"alt_text": alt_text},
+        )
+
+    async def delete_media(self, media_id: int) -> int:
+        """Delete a media item by ID and return the deleted ID."""
+        await self._call(
+            "Media deletion",
+            "POST",
+            self._site_url(f"/media/{media_id}/delete"),
+            idempotent=True,
+        )
+        return media_id
+
+    async def get_daily_views(self, post_ids: list[int], day: str) -> dict[int, int]:
+        """Return view counts for the given posts on ``day``.
+
+        Batches of 100 IDs are requested concurrently.
+        """
+        url = self._site_url("/stats/views/posts")
+        batches = [post_ids[i : i + 100] for i in range(0, len(post_ids), 100)]
+        responses = await asyncio.gather(
+            *(
+                self._call(
+                    "Fetching daily views",
+                    "GET",
+                    url,
+                    params={
+                        "post_ids": ",".join(str(pid) for pid in batch),
+                        "day": day,
+                    },
+                )
+                for batch in batches
+            )
+        )
+        results: dict[int, int] = {}
+        for data in responses:
+            results.update(parse_daily_views(data))
+        return results
+
+    async def get_post_views(self, post_id: int, days: int) -> dict:
+        """Return view statistics for a post over a number of days."""
+        return await self._call(
+            "Fetching post views",
+            "GET",
+            self._site_url(f"/stats/post/{post_id}"),
+            params={"unit": "day", "quantity": days},
+        )
+
+    async def get_search_terms(self, days: int) -> list[dict]:
+        """Return search terms and view counts over a number of days."""
+        data = await self._call(
+            "Fetching search terms",
+            "GET",
+            self._site_url("/stats/search-terms"),
+            params={"days": days},
+        )
+        return parse_search_terms(data)
@@ -0,0 +1,134 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from rate_limit import TokenBucket
+
+# Deletions in flight per bulk operation.
+MAX_WORKERS = 8
+# Delete requests per second allowed for each site.
+REQUESTS_PER_SECOND = 10.0
+
+_SITE_LIMITERS: dict[str, TokenBucket] = {}
+_SITE_LIMITERS_LOCK = threading.Lock()
+
+
+def site_limiter(site: str | None, rate: float = REQUESTS_PER_SECOND) -> TokenBucket:
+    """Return the token bucket shared by all bulk deletes on ``site``."""
+    key = site or ""
+    with _SITE_LIMITERS_LOCK:
+        bucket = _SITE_LIMITERS.get(key)
+        if bucket is None:
+            bucket = _SITE_LIMITERS[key] = TokenBucket(rate)
+        return bucket
+
+
+class BulkProgress:
+    """Thread-safe counters of one running bulk operation."""
+
+    def __init__(self, name: str, total: int):
+        self.name = name
+        self.total = total
+        self.deleted = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.deleted += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "total": self.total,
+                "deleted": self.deleted,
+                "failed": self.failed,
+                "pending": self.total - self.deleted - self.failed,
+                "elapsed": round(time.monotonic() - self.started, 3),
+            }
+
+
+_ACTIVE: dict[int, BulkProgress] = {}
+_ACTIVE_LOCK = threading.Lock()
+
+
+def stats() -> dict:
+    """Return progress of the bulk deletions currently running."""
+    with _ACTIVE_LOCK:
+        active = list(_ACTIVE.values())
+    return {"active": [p.snapshot() for p in active]}
+
+
+class BulkResult:
+    """Outcome of :func:`bulk_delete` with results kept in input order."""
+
+    def __init__(self) -> None:
+        self.deleted: list[Any] = []
+        self.results: list[Any] = []
+        self.errors: dict[str, str] = {}
+
+
+def bulk_delete(
+    delete: Callable[[Any], Any],
+    ids: Iterable[Any],
+    site: str | None = None,
+    name: str = "delete",
+    max_workers: int = MAX_WORKERS,
+    limiter: TokenBucket | None = None,
+) -> BulkResult:
+    """Call ``delete(id)`` for every ID using a bounded worker pool.
+
+    Calls are paced by ``limiter`` (the shared bucket of ``site`` by
+    default), so one site cannot take the whole budget of the API host all
+    sites share.
+    Retries are left to ``delete``: the WordPress client sends deletions
+    through the :mod:`governor`, which also paces the API host and retries
+    rate-limited and failed requests. Each ID is therefore tried once here.
+    ``deleted`` and ``results`` hold the IDs and return values of
+    successful calls in the order of ``ids``, and ``errors`` maps the
+    string form of failed IDs to their message.
+    """
+    ids = list(ids)
+    result = BulkResult()
+    if not ids:
+        return result
+    if limiter is None:
+        limiter = site_limiter(site)
+    progress = BulkProgress(name, len(ids))
+
+    def run_one(item):
+        limiter.acquire()
+        try:
+            value = delete(item)
+        except Exception:
+            progress.record(False)
+            raise
+        progress.record(True)
+        return value
+
+    with _ACTIVE_LOCK:
+        _ACTIVE[id(progress)] = progress
+    try:
+        workers = max(1, min(max_workers, len(ids)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bulk-delete"
+        ) as pool:
+            futures = [pool.submit(run_one, item) for item in ids]
+            for item, future in zip(ids, futures):
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    result.errors[str(item)] = str(exc)
+                else:
+                    result.deleted.append(item)
+                    result.results.append(value)
+    finally:
+        with _ACTIVE_LOCK:
+            _ACTIVE.pop(id(progress), None)
+    return result
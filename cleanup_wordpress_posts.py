@@ -39,16 +39,7 @@ def main() -> None:
         print(f"Authentication failed: {exc}")
         return
 
-    posts: list[dict[str, Any]] = []
-    page = 1
-    while True:
-        items = client.list_posts(page=page, number=100)
-        if not items:
-            break
-        posts.extend(items)
-        if len(items) < 100:
-            break
-        page += 1
+    posts: list[dict[str, Any]] = list(client.iter_all_posts())
 
     if not posts:
         print("No posts found.")
@@ -11,6 +11,7 @@ import argparse
 import json
 from pathlib import Path
 
+from services.pv_writers import WRITERS
 from services.wordpress_pv_csv import export_views
 
 CONFIG_PATH = Path("config.json")
@@ -39,6 +40,17 @@ def main() -> None:
         default=Path(__file__).resolve().parent / "csv",
         help="Directory to write CSV files to.",
     )
+    parser.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        default="csv",
+        help="Output format: wide CSV or long-form ndjson/parquet/arrow.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the local views store and fetch every day from the API.",
+    )
     args = parser.parse_args()
 
     if not 1 <= args.days <= 30:
@@ -54,7 +66,13 @@ def main() -> None:
         print("No WordPress accounts configured")
         return
 
-    result = export_views(accounts, args.days, args.out_dir)
+    result = export_views(
+        accounts,
+        args.days,
+        args.out_dir,
+        incremental=not args.full,
+        fmt=args.format,
+    )
     if "file" in result:
         print(result["file"])
     else:
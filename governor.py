@@ -0,0 +1,380 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
+
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Requests per second allowed for a host without its own entry in ``rates``.
+DEFAULT_RATE = 25.0
+# Attempts after the first one for retryable failures.
+MAX_RETRIES = 3
+# Base delay in seconds, doubled after every retry and jittered.
+BACKOFF = 0.5
+# Longest delay in seconds the governor waits before giving up.
+MAX_WAIT = 60.0
+
+# Statuses retried for idempotent calls; 429 is retried for every call since
+# the server did not process the request.
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def _header(headers: Any, name: str) -> str | None:
+    if not headers:
+        return None
+    try:
+        value = headers.get(name)
+        if value is None:
+            value = headers.get(name.lower())
+    except AttributeError:
+        return None
+    return None if value is None else str(value)
+
+
+def _seconds_until(value: str, now: float) -> float | None:
+    """Parse a delay given as seconds, an epoch timestamp or a date."""
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        pass
+    else:
+        # Large numbers are epoch timestamps (X-RateLimit-Reset on Twitter).
+        return max(number - now, 0.0) if number > 1e9 else max(number, 0.0)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(when.timestamp() - now, 0.0)
+
+
+def retry_delay(headers: Any, now: float | None = None) -> float | None:
+    """Return how long the server asked callers to wait, if it said so.
+
+    ``Retry-After`` wins; otherwise an exhausted ``X-RateLimit-Remaining``
+    (or Twitter's ``x-rate-limit-remaining``) yields the time until the
+    matching reset header.
+    """
+    now = time.time() if now is None else now
+    retry_after = _header(headers, "Retry-After")
+    if retry_after is not None:
+        return _seconds_until(retry_after, now)
+    for prefix in ("X-RateLimit", "x-rate-limit"):
+        remaining = _header(headers, f"{prefix}-Remaining")
+        reset = _header(headers, f"{prefix}-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                exhausted = float(remaining) <= 0
+            except ValueError:
+                continue
+            if exhausted:
+                return _seconds_until(reset, now)
+    return None
+
+
+def response_of(exc: BaseException) -> Any:
+    """Return the HTTP response carried by ``exc`` or its causes, if any."""
+    seen = 0
+    while exc is not None and seen < 5:
+        resp = getattr(exc, "response", None)
+        if getattr(resp, "status_code", None) is not None:
+            return resp
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return None
+
+
+def status_of(exc: BaseException) -> int | None:
+    """Return the HTTP status behind ``exc``.
+
+    Looks at a ``response`` attribute (``requests``, ``httpx``, tweepy) and
+    at Mastodon.py errors, whose second argument is the status code.
+    """
+    resp = response_of(exc)
+    if resp is not None:
+        return resp.status_code
+    args = getattr(exc, "args", ())
+    if len(args) > 1 and isinstance(args[1], int) and 100 <= args[1] < 600:
+        return args[1]
+    return None
+
+
+def _network_error(exc: BaseException) -> bool:
+    name = type(exc).__name__
+    return isinstance(exc, (ConnectionError, TimeoutError)) or name in (
+        "ConnectionError",
+        "Timeout",
+        "ConnectTimeout",
+        "ReadTimeout",
+        "ConnectError",
+        "ReadError",
+        "RemoteProtocolError",
+        "MastodonNetworkError",
+    )
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Return whether ``exc`` is a failure worth trying again later."""
+    return _network_error(exc) or status_of(exc) in RETRY_STATUS
+
+
+class Governor:
+    """Shared retry, backoff and rate limiting for every platform client.
+
+    Each host gets a :class:`rate_limit.TokenBucket` paced at its entry in
+    ``rates`` (or ``rate``). Responses asking callers to slow down, through
+    ``Retry-After`` or exhausted rate-limit headers, pause the whole host
+    until the given time, so concurrent callers wait instead of piling up
+    more 429s. Rate-limited calls are retried; 5xx responses and network
+    errors are retried only for idempotent calls, with jittered exponential
+    backoff. Delays longer than ``max_wait`` are not waited for.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        rates: dict[str, float] | None = None,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF,
+        max_wait: float = MAX_WAIT,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.rate = float(rate)
+        self.rates = {host.lower(): float(r) for host, r in (rates or {}).items()}
+        self.max_retries = max(int(max_retries), 0)
+        self.backoff = float(backoff)
+        self.max_wait = float(max_wait)
+        self.sleep = sleep
+        self.clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Return the token bucket pacing ``host``."""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(
+                    self.rates.get(host, self.rate), sleep=self.sleep
+                )
+                self._counters[host] = {
+                    "requests": 0,
+                    "retries": 0,
+                    "throttled": 0,
+                }
+            return bucket
+
+    def _count(self, host: str, name: str) -> None:
+        with self._lock:
+            self._counters[host][name] += 1
+
+    def _pause(self, host: str) -> float:
+        with self._lock:
+            return max(self._blocked_until.get(host, 0.0) - self.clock(), 0.0)
+
+    def block(self, host: str, seconds: float) -> None:
+        """Hold every request to ``host`` for ``seconds``."""
+        with self._lock:
+            until = self.clock() + seconds
+            if until > self._blocked_until.get(host, 0.0):
+                self._blocked_until[host] = until
+
+    def _backoff(self, attempt: int) -> float:
+        delay = self.backoff * (2**attempt)
+        return min(delay * (0.5 + random.random() / 2), self.max_wait)
+
+    def _decide(
+        self,
+        host: str,
+        attempt: int,
+        status: int | None,
+        headers: Any,
+        idempotent: bool,
+        network: bool = False,
+    ) -> float | None:
+        """Return the delay before another attempt, or ``None`` to stop."""
+        requested = retry_delay(headers, self.clock()) if headers is not None else None
+        if status == 429 or requested is not None:
+            self._count(host, "throttled")
+            if requested is not None and requested <= self.max_wait:
+                self.block(host, requested)
+        retryable = status == 429 or (
+            idempotent and (network or status in RETRY_STATUS)
+        )
+        if not retryable or attempt >= self.max_retries:
+            return None
+        if requested is not None:
+            return requested if requested <= self.max_wait else None
+        return self._backoff(attempt)
+
+    def _before(self, host: str) -> None:
+        pause = self._pause(host)
+        if pause > 0:
+            self.sleep(pause)
+        self.bucket(host).acquire()
+        self._count(host, "requests")
+
+    def request(
+        self,
+        send: Callable[[], Any],
+        url: str,
+        method: str = "GET",
+        idempotent: bool | None = None,
+    ) -> Any:
+        """Call ``send()`` for an HTTP request to ``url`` under the host's limits.
+
+        ``send`` returns a response with ``status_code`` and ``headers``.
+        The last response is returned when retries are exhausted, so callers
+        keep their own error handling.
+        """
+        host = host_of(url)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self._before(host)
+            try:
+                resp = send()
+            except Exception as exc:
+                if not _network_error(exc):
+                    raise
+                delay = self._decide(host, attempt, None, None, idempotent, True)
+                if delay is None:
+                    raise
+            else:
+                status = getattr(resp, "status_code", None)
+                headers = getattr(resp, "headers", None)
+                delay = self._decide(host, attempt, status, headers, idempotent)
+                if delay is None:
+                    return resp
+            logger.debug("Retrying %s %s in %.2fs", method, url, delay)
+            self._count(host, "retries")
+            self.sleep(delay)
+            attempt += 1
+
+    def call(
+        self,
+        host: str,
+        func: Callable[..., Any],
+        *args,
+        idempotent: bool = False,
+        **kwargs,
+    ) -> Any:
+        """Call an SDK method talking to ``host`` under the host's limits.
+
+        Failures are recognised from the HTTP status carried by the raised
+        exception (see :func:`status_of`).
+        """
+        host = host.lower()
+        attempt = 0
+        while True:
+            self._before(host)
+            try:
+                return func(*args, **kwargs)
+            except Exception as exc:
+                resp = response_of(exc)
+                delay = self._decide(
+                    host,
+                    attempt,
+                    status_of(exc),
+                    getattr(resp, "headers", None),
+                    idempotent,
+                    _network_error(exc),
+                )
+                if delay is None:
+                    raise
+            self._count(host, "retries")
+            self.sleep(delay)
+            attempt += 1
+
+    async def arequest(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        url: str,
+        method: str = "GET",
+        idempotent: bool | None = None,
+    ) -> Any:
+        """Asynchronous :meth:`request` that waits without blocking the loop."""
+        host = host_of(url)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        bucket = self.bucket(host)
+        attempt = 0
+        while True:
+            pause = self._pause(host)
+            if pause > 0:
+                await asyncio.sleep(pause)
+            while not bucket.try_acquire():
+                await asyncio.sleep(1 / bucket.rate)
+            self._count(host, "requests")
+            try:
+                resp = await send()
+            except Exception as exc:
+                if not _network_error(exc):
+                    raise
+                delay = self._decide(host, attempt, None, None, idempotent, True)
+                if delay is None:
+                    raise
+            else:
+                delay = self._decide(
+                    host,
+                    attempt,
+                    getattr(resp, "status_code", None),
+                    getattr(resp, "headers", None),
+                    idempotent,
+                )
+                if delay is None:
+                    return resp
+            self._count(host, "retries")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict[str, dict]:
+        """Return per-host request, retry and throttle counters."""
+        with self._lock:
+            now = self.clock()
+            return {
+                host: {
+                    **counters,
+                    "blocked_for": round(
+                        max(self._blocked_until.get(host, 0.0) - now, 0.0), 2
+                    ),
+                }
+                for host, counters in self._counters.items()
+            }
+
+
+def create_governor(config: dict | None) -> Governor:
+    """Build a governor from the ``governor`` config section."""
+    config = config or {}
+    return Governor(
+        rate=config.get("rate", DEFAULT_RATE),
+        rates=config.get("hosts"),
+        max_retries=config.get("max_retries", MAX_RETRIES),
+        backoff=config.get("backoff", BACKOFF),
+        max_wait=config.get("max_wait", MAX_WAIT),
+    )
+
+
+# Shared by every client; the server replaces it with a configured one.
+GOVERNOR = Governor()
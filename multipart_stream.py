@@ -0,0 +1,123 @@
+import io
+import os
+import uuid
+from typing import BinaryIO
+
+# Bytes read from a file part per ``read`` call when no size is requested.
+CHUNK_SIZE = 64 * 1024
+
+
+def _quote(value: str) -> str:
+    """Escape a parameter value of a part header as browsers do."""
+    return value.replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _remaining(fh: BinaryIO) -> int:
+    """Return the number of bytes between the position of ``fh`` and its end."""
+    start = fh.tell()
+    end = fh.seek(0, os.SEEK_END)
+    fh.seek(start)
+    return end - start
+
+
+class MultipartStream(io.RawIOBase):
+    """Read-only ``multipart/form-data`` body that streams file parts.
+
+    Form fields are encoded up front; file objects are read lazily in
+    chunks as the HTTP layer consumes the stream, so memory use is bounded
+    by the chunk size rather than the file size. ``len()`` gives the exact
+    body length so ``requests`` sends a ``Content-Length`` header, and
+    :meth:`seek` back to ``0`` rewinds the files for a retry.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str] | None = None,
+        files: dict[str, tuple[str, BinaryIO, str]] | None = None,
+        boundary: str | None = None,
+    ):
+        super().__init__()
+        self.boundary = boundary or uuid.uuid4().hex
+        self._parts: list[tuple[bytes | BinaryIO, int, int]] = []
+        for name, value in (fields or {}).items():
+            self._add_bytes(
+                self._header(f'form-data; name="{_quote(name)}"')
+                + str(value).encode("utf-8")
+                + b"\r\n"
+            )
+        for name, (filename, fh, content_type) in (files or {}).items():
+            self._add_bytes(
+                self._header(
+                    f'form-data; name="{_quote(name)}"; '
+                    f'filename="{_quote(filename)}"',
+                    content_type,
+                )
+            )
+            self._parts.append((fh, fh.tell(), _remaining(fh)))
+            self._add_bytes(b"\r\n")
+        self._add_bytes(f"--{self.boundary}--\r\n".encode("ascii"))
+        self.length = sum(size for _, _, size in self._parts)
+        self._index = 0
+        self._offset = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def _header(self, disposition: str, content_type: str | None = None) -> bytes:
+        lines = [f"--{self.boundary}", f"Content-Disposition: {disposition}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+    def _add_bytes(self, data: bytes) -> None:
+        self._parts.append((data, 0, len(data)))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if offset != 0 or whence != os.SEEK_SET:
+            raise io.UnsupportedOperation("MultipartStream can only rewind")
+        for part, start, _ in self._parts:
+            if not isinstance(part, bytes):
+                part.seek(start)
+        self._index = 0
+        self._offset = 0
+        return 0
+
+    def tell(self) -> int:
+        done = sum(size for _, _, size in self._parts[: self._index])
+        return done + self._offset
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            # Read everything that is left, one chunk at a time.
+            return b"".join(iter(lambda: self.read(CHUNK_SIZE), b""))
+        while self._index < len(self._parts):
+            part, _, length = self._parts[self._index]
+            want = min(size, length - self._offset)
+            if want <= 0:
+                self._index += 1
+                self._offset = 0
+                continue
+            if isinstance(part, bytes):
+                chunk = part[self._offset : self._offset + want]
+            else:
+                chunk = part.read(want)
+                if not chunk:
+                    raise IOError("File part ended before its expected size")
+            self._offset += len(chunk)
+            return chunk
+        return b""
+
+    def readinto(self, buffer) -> int:
+        chunk = self.read(len(buffer))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
@@ -1,7 +1,11 @@
 from pathlib import Path
+from typing import Callable
 import logging
+import mimetypes
 import requests
 
+import governor
+
 class NoteAuthError(Exception):
     """Raised when authentication with Note fails."""
 
@@ -17,15 +21,50 @@ class NoteClient:
         self.session = session or requests.Session()
         note_cfg = self.config.get("note", {})
         self.base_url = note_cfg.get("base_url", "https://note.com").rstrip("/")
+        # Retry and rate-limit policy; ``None`` uses the shared governor.
+        self.governor: governor.Governor | None = None
+        # Called after every successful login, e.g. to persist the cookies.
+        self.on_login: Callable[[], None] | None = None
+
+    @property
+    def sign_in_url(self) -> str:
+        return f"{self.base_url}/api/v1/sessions/sign_in"
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a session request paced and retried by the governor.
+
+        A ``401`` means the session expired: the client logs in again and
+        repeats the request once.
+        """
+        gov = self.governor or governor.GOVERNOR
+        session_send = getattr(self.session, method)
+
+        def send():
+            for value in (kwargs.get("files") or {}).values():
+                if hasattr(value, "seek"):
+                    # File bodies were consumed by the previous attempt.
+                    value.seek(0)
+            return session_send(url, **kwargs)
+
+        resp = gov.request(send, url, method)
+        note_cfg = self.config.get("note", {})
+        if (
+            resp.status_code == 401
+            and url != self.sign_in_url
+            and note_cfg.get("username")
+        ):
+            logger.debug("Note session expired; logging in again")
+            self.login()
+            resp = gov.request(send, url, method)
+        return resp
 
     def login(self) -> None:
         """Authenticate and store cookies in the session."""
         note_cfg = self.config.get("note", {})
         username = note_cfg.get("username")
         password = note_cfg.get("password")
-        url = f"{self.base_url}/api/v1/sessions/sign_in"
-        resp = self.session.post(
-            url, json={"login": username, "password": password}
+        resp = self._send(
+            "post", self.sign_in_url, json={"login": username, "password": password}
         )
         self.session.cookies.update(resp.cookies)
         logger.debug(
@@ -33,13 +72,26 @@ class NoteClient:
         )
         if resp.status_code not in (200, 201):
             raise NoteAuthError(f"Login failed with status {resp.status_code}")
+        if self.on_login is not None:
+            self.on_login()
+
+    def upload_image(self, image: Path | bytes, filename: str = "image") -> str:
+        """Upload an image file or raw bytes and return its CDN URL.
 
-    def upload_image(self, path: Path) -> str:
-        """Upload an image and return the CDN URL from the API response."""
+        Raw bytes are sent as ``filename``, with the content type its
+        extension implies.
+        """
         url = f"{self.base_url}/api/v1/upload_image"
         try:
-            with path.open("rb") as fh:
-                resp = self.session.post(url, files={"file": fh})
+            if isinstance(image, Path):
+                with image.open("rb") as fh:
+                    resp = self._send("post", url, files={"file": fh})
+            else:
+                part = (filename, bytes(image))
+                mime_type = mimetypes.guess_type(filename)[0]
+                if mime_type:
+                    part += (mime_type,)
+                resp = self._send("post", url, files={"file": part})
             resp.raise_for_status()
             data = resp.json()
             if "data" in data:
@@ -48,29 +100,40 @@ class NoteClient:
         except Exception as exc:  # Mimic the simple try/except pattern
             raise RuntimeError(f"Image upload failed: {exc}") from exc
 
-    def create_draft(self, title: str, body_html: str) -> dict:
-        """Create a draft text note and return identifiers."""
+    def create_draft_shell(self, title: str) -> dict:
+        """Create an empty draft text note and return its identifiers."""
         post_url = f"{self.base_url}/api/v1/text_notes"
         try:
-            resp = self.session.post(
+            resp = self._send(
+                "post",
                 post_url,
                 json={"name": title, "body": "", "template_key": None},
             )
             resp.raise_for_status()
             data = resp.json()
-            note_id = data.get("id")
-            note_key = data.get("key")
-            draft_url = data.get("draft_url")
-            put_url = f"{self.base_url}/api/v1/text_notes/{note_id}"
-            resp2 = self.session.put(
-                put_url,
-                json={"name": title, "body": body_html, "status": "draft"},
-            )
-            resp2.raise_for_status()
             return {
-                "note_id": note_id,
-                "note_key": note_key,
-                "draft_url": draft_url,
+                "note_id": data.get("id"),
+                "note_key": data.get("key"),
+                "draft_url": data.get("draft_url"),
             }
         except Exception as exc:  # Mimic the simple try/except pattern
             raise RuntimeError(f"Draft creation failed: {exc}") from exc
+
+    def update_draft(self, note_id, title: str, body_html: str) -> None:
+        """Replace the title and body of draft ``note_id``."""
+        put_url = f"{self.base_url}/api/v1/text_notes/{note_id}"
+        try:
+            resp = self._send(
+                "put",
+                put_url,
+                json={"name": title, "body": body_html, "status": "draft"},
+            )
+            resp.raise_for_status()
+        except Exception as exc:  # Mimic the simple try/except pattern
+            raise RuntimeError(f"Draft update failed: {exc}") from exc
+
+    def create_draft(self, title: str, body_html: str) -> dict:
+        """Create a draft text note and return identifiers."""
+        draft = self.create_draft_shell(title)
+        self.update_draft(draft["note_id"], title, body_html)
+        return draft
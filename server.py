@@ -1,15 +1,50 @@
+import asyncio
 import json
+import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Any, BinaryIO, List, Literal, Optional, Dict
 
 import base64
 from io import BytesIO
 from mastodon import Mastodon
 import tweepy
 from note_client import NoteClient
-from wordpress_client import WordpressClient
+import bulk_delete
+import governor
+import services.cleanup_wordpress_posts as cleanup_service
+import services.post_to_note as note_service
+import services.post_to_wordpress as wordpress_service
 from services.post_to_note import post_to_note
 from services.post_to_wordpress import post_to_wordpress as service_post_to_wordpress
+from services.wordpress_pool import WP_POOL
+from services.executor import PlatformExecutor
+import services.image_prep as image_prep
+import services.media_cache as media_cache
+import services.note_pool as note_pool
+from services.image_prep import (
+    create_image_preprocessor,
+    detect_media_type,
+    prepare_media,
+)
+from services.media_cache import cached_upload, create_media_cache
+from services.note_pool import create_note_pool
+from services.media_upload import (
+    ChunkedUpload,
+    media_size,
+    needs_chunked,
+    upload_concurrently,
+    wait_for_mastodon_media,
+)
+from services.jobs import JobQueue
+from services.access_log import AccessLog, AccessLogMiddleware
+from services.config_watch import ConfigWatcher
+from services.client_registry import (
+    DEFAULT_TIMEOUT as DEFAULT_CLIENT_TIMEOUT,
+    DEFAULT_WORKERS as DEFAULT_CLIENT_WORKERS,
+    ClientRegistry,
+)
 from services.wordpress_stats import (
     get_post_views as service_get_post_views,
     get_search_terms as service_get_search_terms,
@@ -24,37 +59,101 @@ from services.cleanup_wordpress_posts import (
 from services.wordpress_pv_csv import (
     export_views as service_export_views,
 )
-import os
-import tempfile
 
-from fastapi import FastAPI, Query, Request, BackgroundTasks
+from fastapi import FastAPI, File, Form, Query, UploadFile
 from pydantic import BaseModel
 
 CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
 print(f"Loading config from {CONFIG_PATH}")
 
+
+def load_config(path: Path) -> dict:
+    """Return the parsed config file, or ``{}`` when it does not exist."""
+    if path.exists():
+        with path.open() as f:
+            return json.load(f)
+    return {}
+
+
 # Load config if available
-if CONFIG_PATH.exists():
-    with CONFIG_PATH.open() as f:
-        CONFIG = json.load(f)
-else:
-    CONFIG = {}
+CONFIG = load_config(CONFIG_PATH)
 print(json.dumps(CONFIG.get('note', {}), indent=2))
 
-app = FastAPI(title="autoPoster")
+# Every platform client is paced and retried by the shared governor.
+governor.GOVERNOR = governor.create_governor(CONFIG.get("governor"))
 
+# Blocking platform calls run on bounded per-platform thread pools so they
+# never stall the event loop.
+EXECUTOR = PlatformExecutor(CONFIG.get("executor"))
+
+
+def create_job_queue(config: dict | None) -> JobQueue:
+    """Build the maintenance job queue from the ``jobs`` config section."""
+    config = config or {}
+    path = Path(
+        config.get("path")
+        or Path(__file__).resolve().parent / "jobs.sqlite3"
+    )
+    return JobQueue(
+        path,
+        workers=config.get("workers", 2),
+        resume=config.get("resume", True),
+    )
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log incoming API requests with method, path and body."""
-    body = await request.body()
-    try:
-        body_text = body.decode("utf-8")
-    except Exception:
-        body_text = str(body)
-    print(f"{request.method} {request.url.path} {body_text}")
-    response = await call_next(request)
-    return response
+
+# Cleanup and pv export run as durable jobs on their own worker threads.
+JOBS = create_job_queue(CONFIG.get("jobs"))
+
+ACCESS_LOG = AccessLog(CONFIG.get("access_log"))
+
+# Images are resized per platform when the ``image_prep`` section is set.
+image_prep.IMAGE_PREP = create_image_preprocessor(CONFIG.get("image_prep"))
+
+# Uploaded media is reused across posts when the ``media_cache`` section is set.
+media_cache.MEDIA_CACHE = create_media_cache(
+    CONFIG.get("media_cache"), Path(__file__).resolve().parent / "media_cache.sqlite3"
+)
+
+# Note sessions survive restarts when the ``note_sessions`` section is set.
+note_pool.NOTE_POOL = create_note_pool(
+    CONFIG.get("note_sessions"),
+    Path(__file__).resolve().parent / "note_sessions.bin",
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up jobs interrupted by a previous shutdown.
+    if JOBS.resume and JOBS.path.exists():
+        JOBS.start()
+    # Log in to every account in the background; requests are served
+    # meanwhile and wait only for the account they use.
+    if CONFIG.get("clients", {}).get("warm_up", True):
+        for registry in _client_registries().values():
+            registry.warm_up()
+    watch = CONFIG.get("reload", {})
+    watcher = None
+    if watch.get("watch"):
+        watcher = ConfigWatcher(
+            CONFIG_PATH, reload_config, float(watch.get("interval", 2.0))
+        ).start()
+    yield
+    if watcher is not None:
+        watcher.stop()
+    JOBS.stop(wait=False)
+    for registry in _client_registries().values():
+        registry.shutdown()
+    if image_prep.IMAGE_PREP is not None:
+        image_prep.IMAGE_PREP.shutdown()
+    ACCESS_LOG.close()
+
+
+app = FastAPI(title="autoPoster", lifespan=lifespan)
+
+
+# One sampled JSON line per request: method, path, status, latency, body size
+# and a short redacted preview. Bodies are observed, never buffered.
+app.add_middleware(AccessLogMiddleware, access_log=ACCESS_LOG)
 
 
 def validate_mastodon_accounts(config: Dict) -> Dict[str, str]:
@@ -91,22 +190,38 @@ if MASTODON_ACCOUNT_ERRORS:
         print(f"Mastodon config error for {acc}: {err}")
 
 
-def create_mastodon_clients():
-    """Create Mastodon clients for all configured accounts."""
-    clients = {}
-    accounts = CONFIG.get("mastodon", {}).get("accounts", {})
-    for name, info in accounts.items():
-        if name in MASTODON_ACCOUNT_ERRORS:
-            continue
-        try:
-            clients[name] = Mastodon(
-                access_token=info["access_token"],
-                api_base_url=info["instance_url"],
-            )
-        except Exception as exc:
-            # Log error but continue creating other clients
-            print(f"Failed to init Mastodon client for {name}: {exc}")
-    return clients
+def _client_settings() -> dict:
+    """Return registry settings from the optional ``clients`` config section."""
+    cfg = CONFIG.get("clients", {})
+    settings = {
+        "timeout": float(cfg.get("timeout", DEFAULT_CLIENT_TIMEOUT)),
+        "workers": int(cfg.get("workers", DEFAULT_CLIENT_WORKERS)),
+    }
+    if "retry_after" in cfg:
+        settings["retry_after"] = float(cfg["retry_after"])
+    return settings
+
+
+def _valid_accounts(platform: str, errors: Dict[str, str]) -> Dict[str, dict]:
+    accounts = CONFIG.get(platform, {}).get("accounts", {}) or {}
+    return {name: info for name, info in accounts.items() if name not in errors}
+
+
+def _make_mastodon_client(name: str, info: dict):
+    return Mastodon(
+        access_token=info["access_token"],
+        api_base_url=info["instance_url"],
+    )
+
+
+def create_mastodon_clients() -> ClientRegistry:
+    """Return a lazy registry of Mastodon clients for all configured accounts."""
+    return ClientRegistry(
+        "mastodon",
+        _make_mastodon_client,
+        _valid_accounts("mastodon", MASTODON_ACCOUNT_ERRORS),
+        **_client_settings(),
+    )
 
 
 MASTODON_CLIENTS = create_mastodon_clients()
@@ -139,25 +254,26 @@ if NOTE_ACCOUNT_ERRORS:
         print(f"Note config error for {acc}: {err}")
 
 
-def create_note_clients():
-    """Create Note clients for all configured accounts."""
-    clients = {}
-    note_cfg = CONFIG.get("note", {})
-    accounts = note_cfg.get("accounts", {})
-    base_url = note_cfg.get("base_url")
-    for name, info in accounts.items():
-        if name in NOTE_ACCOUNT_ERRORS:
-            continue
-        cfg = {"note": {"username": info.get("username"), "password": info.get("password")}}
-        if base_url:
-            cfg["note"]["base_url"] = base_url
-        try:
-            client = NoteClient(cfg)
-            client.login()
-            clients[name] = client
-        except Exception as exc:
-            print(f"Failed to init Note client for {name}: {exc}")
-    return clients
+def _make_note_client(name: str, info: dict) -> NoteClient:
+    cfg = {"note": {"username": info.get("username"), "password": info.get("password")}}
+    base_url = CONFIG.get("note", {}).get("base_url")
+    if base_url:
+        cfg["note"]["base_url"] = base_url
+    return note_pool.NOTE_POOL.get(name, cfg, NoteClient)
+
+
+def create_note_clients() -> ClientRegistry:
+    """Return a lazy registry of logged-in Note clients.
+
+    Clients come from the shared :data:`note_pool.NOTE_POOL`, so the
+    server and :mod:`services.post_to_note` reuse the same sessions.
+    """
+    return ClientRegistry(
+        "note",
+        _make_note_client,
+        _valid_accounts("note", NOTE_ACCOUNT_ERRORS),
+        **_client_settings(),
+    )
 
 
 NOTE_CLIENTS = create_note_clients()
@@ -199,32 +315,70 @@ if TWITTER_ACCOUNT_ERRORS:
         print(f"Twitter config error for {acc}: {err}")
 
 
-def create_twitter_clients():
-    """Create Tweepy clients for all configured accounts."""
-    clients = {}
-    accounts = CONFIG.get("twitter", {}).get("accounts", {})
-    for name, info in accounts.items():
-        if name in TWITTER_ACCOUNT_ERRORS:
-            continue
-        try:
-            auth = tweepy.OAuth1UserHandler(
-                info["consumer_key"],
-                info["consumer_secret"],
-                info["access_token"],
-                info["access_token_secret"],
-            )
-            api = tweepy.API(auth)
-            client = tweepy.Client(
-                bearer_token=info["bearer_token"],
-                consumer_key=info["consumer_key"],
-                consumer_secret=info["consumer_secret"],
-                access_token=info["access_token"],
-                access_token_secret=info["access_token_secret"],
-            )
-            clients[name] = {"client": client, "api": api}
-        except Exception as exc:
-            print(f"Failed to init Twitter client for {name}: {exc}")
-    return clients
+def _make_twitter_client(name: str, info: dict) -> dict:
+    auth = tweepy.OAuth1UserHandler(
+        info["consumer_key"],
+        info["consumer_secret"],
+        info["access_token"],
+        info["access_token_secret"],
+    )
+    api = tweepy.API(auth)
+    client = tweepy.Client(
+        bearer_token=info["bearer_token"],
+        consumer_key=info["consumer_key"],
+        consumer_secret=info["consumer_secret"],
+        access_token=info["access_token"],
+        access_token_secret=info["access_token_secret"],
+    )
+    entry = {"client": client, "api": api}
+    # Resolved here, off the request path, so tweets never wait for it.
+    twitter_identity(entry)
+    return entry
+
+
+# Seconds before a cached screen name is looked up again.
+TWITTER_IDENTITY_TTL = 24 * 3600
+
+
+def twitter_identity(entry: dict, refresh: bool = False) -> dict:
+    """Return the ``screen_name`` and ``user_id`` cached in a client entry.
+
+    The first call, a ``refresh`` or an entry older than
+    :data:`TWITTER_IDENTITY_TTL` calls ``verify_credentials`` and stores the
+    result in ``entry``. Failed lookups return the stale values, if any,
+    and are retried on the next call.
+    """
+    resolved_at = entry.get("identity_at")
+    fresh = (
+        resolved_at is not None
+        and time.monotonic() - resolved_at < TWITTER_IDENTITY_TTL
+    )
+    if fresh and not refresh:
+        return {"screen_name": entry["screen_name"], "user_id": entry["user_id"]}
+    try:
+        user = governor.GOVERNOR.call(
+            TWITTER_API_HOST, entry["api"].verify_credentials, idempotent=True
+        )
+    except Exception as exc:
+        print(f"Failed to resolve Twitter identity: {exc}")
+    else:
+        entry["screen_name"] = getattr(user, "screen_name", None)
+        entry["user_id"] = getattr(user, "id_str", None) or getattr(user, "id", None)
+        entry["identity_at"] = time.monotonic()
+    return {
+        "screen_name": entry.get("screen_name"),
+        "user_id": entry.get("user_id"),
+    }
+
+
+def create_twitter_clients() -> ClientRegistry:
+    """Return a lazy registry of Tweepy clients for all configured accounts."""
+    return ClientRegistry(
+        "twitter",
+        _make_twitter_client,
+        _valid_accounts("twitter", TWITTER_ACCOUNT_ERRORS),
+        **_client_settings(),
+    )
 
 
 TWITTER_CLIENTS = create_twitter_clients()
@@ -272,28 +426,118 @@ if WORDPRESS_ACCOUNT_ERRORS:
         print(f"WordPress config error for {acc}: {err}")
 
 
-def create_wordpress_clients():
-    """Create WordPress clients for all configured accounts."""
-    clients = {}
-    accounts = CONFIG.get("wordpress", {}).get("accounts", {})
-    for name, info in accounts.items():
-        if name in WORDPRESS_ACCOUNT_ERRORS:
-            continue
-        cfg = {"wordpress": {"accounts": {"default": info}}}
-        try:
-            client = WordpressClient(cfg)
-            client.authenticate()
-            clients[name] = client
-        except Exception as exc:
-            print(f"Failed to init WordPress client for {name}: {exc}")
-    return clients
+def create_wordpress_clients() -> ClientRegistry:
+    """Return a lazy registry of WordPress clients for all configured accounts.
+
+    Clients are built and cached by the shared :data:`WP_POOL`, so the
+    server and the services reuse the same sessions.
+    """
+    return ClientRegistry(
+        "wordpress",
+        lambda name, info: WP_POOL.get(name, info),
+        _valid_accounts("wordpress", WORDPRESS_ACCOUNT_ERRORS),
+        **_client_settings(),
+    )
 
 
 WORDPRESS_CLIENTS = create_wordpress_clients()
 
+
+def _client_registries() -> Dict[str, ClientRegistry]:
+    registries = {
+        "mastodon": MASTODON_CLIENTS,
+        "note": NOTE_CLIENTS,
+        "twitter": TWITTER_CLIENTS,
+        "wordpress": WORDPRESS_CLIENTS,
+    }
+    return {
+        name: registry
+        for name, registry in registries.items()
+        if isinstance(registry, ClientRegistry)
+    }
+
+
+# Serializes reloads triggered by the endpoint and the file watcher.
+RELOAD_LOCK = threading.Lock()
+
+
+def reload_config(path: Optional[Path] = None) -> dict:
+    """Re-read ``config.json`` and rebuild only the affected clients.
+
+    Account sections are validated again and each client registry is
+    updated in place: added, changed and removed accounts are reported per
+    platform, while untouched accounts keep their logged-in clients.
+    Other sections (executor, jobs, access log) still need a restart.
+    A missing file is refused rather than read as an empty config, which
+    would drop every account.
+    """
+    global CONFIG, MASTODON_ACCOUNT_ERRORS, NOTE_ACCOUNT_ERRORS
+    global TWITTER_ACCOUNT_ERRORS, WORDPRESS_ACCOUNT_ERRORS
+    path = path or CONFIG_PATH
+    with RELOAD_LOCK:
+        if not path.exists():
+            return {"error": f"Config file not found: {path}"}
+        try:
+            config = load_config(path)
+        except ValueError as exc:
+            return {"error": f"Invalid config: {exc}"}
+
+        CONFIG = config
+        for module in (wordpress_service, note_service, cleanup_service):
+            module.CONFIG = config
+
+        MASTODON_ACCOUNT_ERRORS = validate_mastodon_accounts(config)
+        NOTE_ACCOUNT_ERRORS = validate_note_accounts(config)
+        TWITTER_ACCOUNT_ERRORS = validate_twitter_accounts(config)
+        WORDPRESS_ACCOUNT_ERRORS = validate_wordpress_accounts(config)
+        errors = {
+            "mastodon": MASTODON_ACCOUNT_ERRORS,
+            "note": NOTE_ACCOUNT_ERRORS,
+            "twitter": TWITTER_ACCOUNT_ERRORS,
+            "wordpress": WORDPRESS_ACCOUNT_ERRORS,
+        }
+
+        labels = {"wordpress": "WordPress"}
+        for platform, platform_errors in errors.items():
+            label = labels.get(platform, platform.capitalize())
+            for acc, err in platform_errors.items():
+                print(f"{label} config error for {acc}: {err}")
+
+        changes = {}
+        warm_up = config.get("clients", {}).get("warm_up", True)
+        for platform, registry in _client_registries().items():
+            diff = registry.update(_valid_accounts(platform, errors[platform]))
+            if platform == "wordpress":
+                for name in diff["changed"] + diff["removed"]:
+                    WP_POOL.invalidate(name)
+            if platform == "note":
+                for name in diff["changed"] + diff["removed"]:
+                    note_pool.NOTE_POOL.invalidate(name, forget=True)
+            if warm_up:
+                registry.warm_up()
+            changes[platform] = diff
+        print(f"Config reloaded: {changes}")
+        return {"reloaded": True, "platforms": changes}
+
+
+def _missing_client(clients, account: str) -> dict:
+    """Return the error for an account without a usable client."""
+    error = clients.error(account) if isinstance(clients, ClientRegistry) else None
+    if error:
+        return {"error": f"Account unavailable: {error}"}
+    return {"error": "Account not configured"}
+
+class PostTarget(BaseModel):
+    platform: Literal["mastodon", "twitter", "wordpress", "note"]
+    account: str
+    title: Optional[str] = None  # WordPress only; overrides the shared title
+
+
 class PostRequest(BaseModel):
     text: str
     media: Optional[List[str]] = None  # base64 encoded strings
+    title: Optional[str] = None
+    targets: Optional[List[PostTarget]] = None
 
 
 class MastodonPostRequest(BaseModel):
@@ -345,26 +589,73 @@ class WordpressCleanupRequest(BaseModel):
     items: List[WordpressCleanupItem]
 
 
-def post_to_mastodon(account: str, text: str, media: Optional[List[str]] = None):
+TWITTER_API_HOST = "api.twitter.com"
+TWITTER_UPLOAD_HOST = "upload.twitter.com"
+
+
+def _mastodon_host(account: str) -> str:
+    info = CONFIG.get("mastodon", {}).get("accounts", {}).get(account) or {}
+    return governor.host_of(info.get("instance_url") or "") or "mastodon"
+
+
+def _rewinding(upload, source: BinaryIO, keyword: Optional[str] = None):
+    """Return ``upload`` bound to ``source``, rewinding it before every attempt.
+
+    ``source`` is passed positionally, or as ``keyword`` when given.
+    """
+    start = source.tell()
+
+    def call(**kwargs):
+        source.seek(start)
+        if keyword:
+            return upload(**{keyword: source}, **kwargs)
+        return upload(source, **kwargs)
+
+    return call
+
+
+def post_to_mastodon(
+    account: str,
+    text: str,
+    media: Optional[List[str]] = None,
+    files: Optional[List[tuple[BinaryIO, Optional[str]]]] = None,
+):
+    """Post a status with base64 ``media`` and/or ``(file, mime_type)`` files."""
     if account in MASTODON_ACCOUNT_ERRORS:
         return {"error": "Account misconfigured"}
     client = MASTODON_CLIENTS.get(account)
     if not client:
-        return {"error": "Account not configured"}
+        return _missing_client(MASTODON_CLIENTS, account)
+
+    host = _mastodon_host(account)
+    # Mastodon attaches a media ID to a single status, so these uploads
+    # bypass the media cache.
+    def upload(index: int, item: tuple) -> Any:
+        source, mime_type = item
+        source, mime_type, _ = _prepare_upload(
+            "mastodon", source, mime_type=mime_type, index=index
+        )
+        if isinstance(source, bytes):
+            source = BytesIO(source)
+        uploaded = governor.GOVERNOR.call(
+            host, _rewinding(client.media_post, source), mime_type=mime_type
+        )
+        # Videos and large GIFs are transcoded after the v2 upload returns;
+        # each worker polls its own attachment while the others upload.
+        return wait_for_mastodon_media(client, uploaded, host).get("id")
 
     media_ids = None
-    if media:
-        media_ids = []
-        for item in media:
-            try:
-                data = base64.b64decode(item)
-                uploaded = client.media_post(BytesIO(data), mime_type="application/octet-stream")
-                media_ids.append(uploaded.get("id"))
-            except Exception as exc:
-                return {"error": f"Media upload failed: {exc}"}
+    if media or files:
+        sources = [(item, None) for item in media or []] + list(files or [])
+        try:
+            media_ids = upload_concurrently("mastodon", sources, upload)
+        except Exception as exc:
+            return {"error": f"Media upload failed: {exc}"}
 
     try:
-        status = client.status_post(text, media_ids=media_ids)
+        status = governor.GOVERNOR.call(
+            host, client.status_post, text, media_ids=media_ids
+        )
     except Exception as exc:
         return {"error": str(exc)}
 
@@ -375,29 +666,52 @@ def post_to_mastodon(account: str, text: str, media: Optional[List[str]] = None)
     }
 
 
-def post_to_twitter(account: str, text: str, media: Optional[List[str]] = None):
+def post_to_twitter(
+    account: str,
+    text: str,
+    media: Optional[List[str]] = None,
+    files: Optional[List[tuple[BinaryIO, str]]] = None,
+):
+    """Tweet with base64 ``media`` and/or ``(file, filename)`` files."""
     if account in TWITTER_ACCOUNT_ERRORS:
         return {"error": "Account misconfigured"}
     info = TWITTER_CLIENTS.get(account)
     if not info:
-        return {"error": "Account not configured"}
+        return _missing_client(TWITTER_CLIENTS, account)
 
     client = info["client"]
     api = info["api"]
 
+    def upload(index: int, item: tuple) -> Any:
+        source, filename = item
+        source, mime_type, filename = _prepare_upload(
+            "twitter", source, filename, index=index
+        )
+        if needs_chunked(mime_type, media_size(source)):
+            chunked = ChunkedUpload(api, source, mime_type, TWITTER_UPLOAD_HOST)
+            send = chunked.run
+        else:
+            if isinstance(source, bytes):
+                source = BytesIO(source)
+            media_upload = _rewinding(api.media_upload, source, "file")
+            send = lambda: governor.GOVERNOR.call(
+                TWITTER_UPLOAD_HOST, media_upload, filename=filename
+            ).media_id
+        uploaded = cached_upload("twitter", account, source, lambda: {"id": send()})
+        return uploaded["id"]
+
     media_ids = None
-    if media:
-        media_ids = []
-        for item in media:
-            try:
-                data = base64.b64decode(item)
-                uploaded = api.media_upload(filename="media", file=BytesIO(data))
-                media_ids.append(uploaded.media_id)
-            except Exception as exc:
-                return {"error": f"Media upload failed: {exc}"}
+    if media or files:
+        sources = [(item, None) for item in media or []] + list(files or [])
+        try:
+            media_ids = upload_concurrently("twitter", sources, upload)
+        except Exception as exc:
+            return {"error": f"Media upload failed: {exc}"}
 
     try:
-        response = client.create_tweet(text=text, media_ids=media_ids)
+        response = governor.GOVERNOR.call(
+            TWITTER_API_HOST, client.create_tweet, text=text, media_ids=media_ids
+        )
     except Exception as exc:
         return {"error": str(exc)}
 
@@ -407,11 +721,7 @@ def post_to_twitter(account: str, text: str, media: Optional[List[str]] = None):
     elif isinstance(response, dict):
         tweet_id = response.get("id") or response.get("data", {}).get("id")
 
-    try:
-        username = api.verify_credentials().screen_name
-    except Exception:
-        username = ""
-
+    username = twitter_identity(info).get("screen_name")
     url = (
         f"https://twitter.com/{username}/status/{tweet_id}"
         if tweet_id and username
@@ -438,81 +748,287 @@ def post_to_wordpress(
     categories: Optional[List[str]] = None,
     tags: Optional[List[str]] = None,
     json_ld: Optional[dict] = None,
+    files: Optional[List[tuple[BinaryIO, str, Optional[str]]]] = None,
 ):
+    """Create a post with base64 ``media`` and/or ``(file, filename, alt)``."""
     if account in WORDPRESS_ACCOUNT_ERRORS:
         return {"error": "Account misconfigured"}
     client = WORDPRESS_CLIENTS.get(account)
     if not client:
-        return {"error": "Account not configured"}
-
-    images: List[tuple[Path, str, Optional[str]]] = []
-    if media:
-        for item in media:
-            try:
-                data = base64.b64decode(item.data)
-                tmp = tempfile.NamedTemporaryFile(
-                    delete=False, suffix=Path(item.filename).suffix
-                )
-                tmp.write(data)
-                tmp.flush()
-                tmp.close()
-                images.append((Path(tmp.name), item.filename, item.alt))
-            except Exception as exc:
-                for p, _, _ in images:
-                    try:
-                        os.unlink(p)
-                    except Exception:
-                        pass
-                return {"error": f"Media upload failed: {exc}"}
+        return _missing_client(WORDPRESS_CLIENTS, account)
 
-    try:
-        result = service_post_to_wordpress(
-            title,
-            content,
-            images,
-            account,
-            paid_content=paid_content,
-            paid_title=paid_title,
-            paid_message=paid_message,
-            plan_id=plan_id,
-            categories=categories,
-            tags=tags,
-            slug=slug,
-            excerpt=excerpt,
-            json_ld=json_ld,
+    # Decoded bytes go straight to the upload; nothing touches the disk.
+    images: List[tuple[bytes | BinaryIO, str, Optional[str]]] = []
+    sources = [(item.data, item.filename, item.alt) for item in media or []]
+    sources.extend(files or [])
+    for index, (source, filename, alt) in enumerate(sources, 1):
+        try:
+            source, _, filename = _prepare_upload(
+                "wordpress", source, filename, index=index
+            )
+        except Exception as exc:
+            return {"error": f"Media upload failed: {exc}"}
+        images.append((source, filename, alt))
+
+    return service_post_to_wordpress(
+        title,
+        content,
+        images,
+        account,
+        paid_content=paid_content,
+        paid_title=paid_title,
+        paid_message=paid_message,
+        plan_id=plan_id,
+        categories=categories,
+        tags=tags,
+        slug=slug,
+        excerpt=excerpt,
+        json_ld=json_ld,
+    )
+
+def _prepare_upload(
+    platform: str,
+    source,
+    filename: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    index: int = 1,
+) -> tuple[bytes | BinaryIO, str, str]:
+    """Return ``(content, mime_type, filename)`` ready to upload one media source.
+
+    Base64 strings are decoded and returned as bytes. Images go through the
+    optional preprocessing stage for ``platform``; everything else, and all
+    media while preprocessing is disabled, is passed on unchanged with the
+    given type and name, or ones sniffed from its first bytes.
+    """
+    if isinstance(source, str):
+        source = base64.b64decode(source)
+    if isinstance(source, bytes):
+        head = source[:16]
+    else:
+        start = source.tell()
+        head = source.read(16)
+        source.seek(start)
+    detected, ext = detect_media_type(head)
+    if image_prep.IMAGE_PREP is None or not detected.startswith("image/"):
+        return source, mime_type or detected, filename or f"media{index}{ext}"
+    data = source if isinstance(source, bytes) else source.read()
+    prepared = prepare_media(platform, data)
+    return prepared.data, prepared.mime_type, prepared.filename(filename, index)
+
+
+def _cross_post_call(target: PostTarget, data: PostRequest, media: List[bytes]):
+    """Return the ``(func, args, kwargs)`` posting ``data`` to one target.
+
+    Every call gets its own file objects over the shared decoded bytes, so
+    targets read the media concurrently without copying it. Per-platform
+    preprocessing happens inside the posting functions.
+    """
+    if target.platform == "mastodon":
+        files = [(BytesIO(item), None) for item in media]
+        return post_to_mastodon, (target.account, data.text), {"files": files}
+    if target.platform == "twitter":
+        files = [(BytesIO(item), None) for item in media]
+        return post_to_twitter, (target.account, data.text), {"files": files}
+    if target.platform == "wordpress":
+        title = target.title or data.title
+        if not title:
+            return None
+        files = [(BytesIO(item), None, None) for item in media]
+        return (
+            post_to_wordpress,
+            (target.account, title, data.text),
+            {"files": files},
         )
-    finally:
-        for p, _, _ in images:
-            try:
-                os.unlink(p)
-            except Exception:
-                pass
-    return result
+    return _post_note_media, (data.text, media, target.account), {}
+
+
+def _post_note_media(content: str, media: List[bytes], account: str) -> dict:
+    images = []
+    for index, item in enumerate(media, 1):
+        prepared = prepare_media("note", item)
+        # Named after the sniffed type, so Note gets a typed file part.
+        images.append((prepared.data, prepared.filename(None, index)))
+    return post_to_note(content, images, account)
+
+
+async def cross_post(data: PostRequest) -> dict:
+    """Post ``data`` to every target concurrently and collect per-target results.
+
+    Shared media is decoded once. Each target runs on its platform's
+    executor pool, so the request takes as long as the slowest target.
+    A failing target never affects the others.
+    """
+    try:
+        media = [base64.b64decode(item) for item in data.media or []]
+    except Exception as exc:
+        return {"error": f"Media decode failed: {exc}"}
+
+    async def run(target: PostTarget) -> dict:
+        call = _cross_post_call(target, data, media)
+        if call is None:
+            return {"error": "title is required for WordPress targets"}
+        func, args, kwargs = call
+        try:
+            return await EXECUTOR.run(target.platform, func, *args, **kwargs)
+        except Exception as exc:
+            return {"error": str(exc)}
+
+    results = await asyncio.gather(*(run(target) for target in data.targets))
+    return {
+        "results": [
+            {"platform": target.platform, "account": target.account, **result}
+            for target, result in zip(data.targets, results)
+        ]
+    }
+
 
 @app.get("/")
 async def root():
     return {"status": "ok"}
 
+@app.post("/admin/reload")
+async def admin_reload():
+    return await EXECUTOR.run("admin", reload_config)
+
+
+@app.get("/ready")
+async def ready():
+    platforms = {
+        name: registry.status() for name, registry in _client_registries().items()
+    }
+    all_ready = all(
+        info["state"] == "ready"
+        for accounts in platforms.values()
+        for info in accounts.values()
+    )
+    return {"ready": all_ready, "platforms": platforms}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "executor": EXECUTOR.stats(),
+        "governor": governor.GOVERNOR.stats(),
+        "wordpress_pool": WP_POOL.stats(),
+        "bulk_delete": bulk_delete.stats(),
+        "jobs": JOBS.stats(),
+        "image_prep": (
+            image_prep.IMAGE_PREP.stats() if image_prep.IMAGE_PREP else None
+        ),
+        "media_cache": (
+            media_cache.MEDIA_CACHE.stats() if media_cache.MEDIA_CACHE else None
+        ),
+        "note_sessions": note_pool.NOTE_POOL.stats(),
+    }
+
+
 @app.post("/post")
 async def receive_post(data: PostRequest):
-    # For now just log that data was received
+    if data.targets:
+        return await cross_post(data)
+    # Without targets the request is only acknowledged.
     media_count = len(data.media or [])
     return {"received": True, "media_items": media_count}
 
 
 @app.post("/mastodon/post")
 async def mastodon_post(data: MastodonPostRequest):
-    return post_to_mastodon(data.account, data.text, data.media)
+    return await EXECUTOR.run(
+        "mastodon", post_to_mastodon, data.account, data.text, data.media
+    )
 
 
 @app.post("/twitter/post")
 async def twitter_post(data: TwitterPostRequest):
-    return post_to_twitter(data.account, data.text, data.media)
+    return await EXECUTOR.run(
+        "twitter", post_to_twitter, data.account, data.text, data.media
+    )
+
+
+@app.get("/twitter/identity")
+async def twitter_identity_endpoint(account: str, refresh: bool = False):
+    if account in TWITTER_ACCOUNT_ERRORS:
+        return {"error": "Account misconfigured"}
+    info = TWITTER_CLIENTS.get(account)
+    if not info:
+        return _missing_client(TWITTER_CLIENTS, account)
+    return await EXECUTOR.run("twitter", twitter_identity, info, refresh)
+
+
+@app.post("/mastodon/post/multipart")
+async def mastodon_post_multipart(
+    account: str = Form(...),
+    text: str = Form(...),
+    media: List[UploadFile] = File(default_factory=list),
+):
+    files = [(upload.file, upload.content_type) for upload in media]
+    return await EXECUTOR.run(
+        "mastodon", post_to_mastodon, account, text, files=files
+    )
+
+
+@app.post("/twitter/post/multipart")
+async def twitter_post_multipart(
+    account: str = Form(...),
+    text: str = Form(...),
+    media: List[UploadFile] = File(default_factory=list),
+):
+    files = [(upload.file, upload.filename or "media") for upload in media]
+    return await EXECUTOR.run(
+        "twitter", post_to_twitter, account, text, files=files
+    )
+
+
+@app.post("/wordpress/post/multipart")
+async def wordpress_post_multipart(
+    account: str = Form(...),
+    title: str = Form(...),
+    content: str = Form(...),
+    slug: Optional[str] = Form(None),
+    excerpt: Optional[str] = Form(None),
+    paid_content: Optional[str] = Form(None),
+    paid_title: Optional[str] = Form(None),
+    paid_message: Optional[str] = Form(None),
+    plan_id: Optional[str] = Form(None),
+    categories: List[str] = Form(default_factory=list),
+    tags: List[str] = Form(default_factory=list),
+    json_ld: Optional[str] = Form(None),
+    media: List[UploadFile] = File(default_factory=list),
+    alt: List[str] = Form(default_factory=list),
+):
+    # ``alt`` values pair with ``media`` files by position.
+    files = [
+        (upload.file, upload.filename or f"media{i}", alt[i] if i < len(alt) else None)
+        for i, upload in enumerate(media)
+    ]
+    try:
+        ld = json.loads(json_ld) if json_ld else None
+    except ValueError as exc:
+        return {"error": f"Invalid json_ld: {exc}"}
+    return await EXECUTOR.run(
+        "wordpress",
+        post_to_wordpress,
+        account,
+        title,
+        content,
+        slug=slug,
+        excerpt=excerpt,
+        paid_content=paid_content,
+        paid_title=paid_title,
+        paid_message=paid_message,
+        plan_id=plan_id,
+        categories=categories or None,
+        tags=tags or None,
+        json_ld=ld,
+        files=files,
+    )
 
 
 @app.post("/wordpress/post")
 async def wordpress_post(data: WordpressPostRequest):
-    post_info = post_to_wordpress(
+    post_info = await EXECUTOR.run(
+        "wordpress",
+        post_to_wordpress,
         data.account,
         data.title,
         data.content,
@@ -536,7 +1052,9 @@ async def wordpress_posts(
     number: int = Query(10, gt=0),
     account: str | None = None,
 ):
-    return service_list_posts(account, page, number)
+    return await EXECUTOR.run(
+        "wordpress", service_list_posts, account, page, number
+    )
 
 
 @app.delete("/wordpress/posts")
@@ -544,20 +1062,22 @@ async def wordpress_delete_posts(
     ids: List[int] = Query(...),
     account: str | None = None,
 ):
-    result = service_delete_posts(account, ids)
+    result = await EXECUTOR.run(
+        "wordpress", service_delete_posts, account, ids
+    )
     success = len(result.get("deleted", []))
     failed = len(result.get("errors", {}))
     return {**result, "success": success, "failed": failed}
 
 
-def _run_cleanup(identifier: str, keep_latest: int) -> None:
+def _run_cleanup(identifier: str, keep_latest: int) -> dict:
     """Execute cleanup for a single WordPress account and log progress."""
     print(f"[cleanup] Starting cleanup for {identifier}")
     result = service_cleanup_posts(identifier, keep_latest)
     error = result.get("error")
     if error:
         print(f"[cleanup] {identifier} error: {error}")
-        return
+        return result
     deleted = len(result.get("deleted_posts", []))
     trash = result.get("trash_emptied", 0)
     media = result.get("deleted_media", 0)
@@ -565,17 +1085,30 @@ def _run_cleanup(identifier: str, keep_latest: int) -> None:
         f"[cleanup] {identifier} finished: deleted {deleted} posts, "
         f"emptied trash {trash}, removed {media} media items",
     )
+    return result
+
+
+def _pv_csv_job(days: int, out_dir: str, format: str = "csv"):
+    # Accounts are read when the job runs so secrets never reach the queue.
+    accounts = CONFIG.get("wordpress", {}).get("accounts", {})
+    return service_export_views(accounts, days, Path(out_dir), fmt=format)
+
+
+JOBS.register("wordpress_cleanup", _run_cleanup)
+JOBS.register("wordpress_pv_csv", _pv_csv_job)
 
 
 @app.post("/wordpress/cleanup")
-async def wordpress_cleanup(
-    data: WordpressCleanupRequest, background_tasks: BackgroundTasks
-):
-    for item in data.items:
-        background_tasks.add_task(
-            _run_cleanup, item.identifier, item.keep_latest
+async def wordpress_cleanup(data: WordpressCleanupRequest):
+    job_ids = [
+        JOBS.submit(
+            "wordpress_cleanup",
+            identifier=item.identifier,
+            keep_latest=item.keep_latest,
         )
-    return {"status": "accepted"}
+        for item in data.items
+    ]
+    return {"status": "accepted", "jobs": job_ids}
 
 
 @app.get("/wordpress/stats/views")
@@ -584,7 +1117,9 @@ async def wordpress_post_views(
     days: int = Query(..., gt=0, le=30),
     account: str | None = None,
 ):
-    return service_get_post_views(account, post_id, days)
+    return await EXECUTOR.run(
+        "wordpress", service_get_post_views, account, post_id, days
+    )
 
 
 @app.get("/wordpress/stats/search-terms")
@@ -592,31 +1127,42 @@ async def wordpress_search_terms(
     days: int = Query(..., gt=0, le=30),
     account: str | None = None,
 ):
-    return service_get_search_terms(account, days)
+    return await EXECUTOR.run(
+        "wordpress", service_get_search_terms, account, days
+    )
 
 
 @app.post("/wordpress/stats/pv-csv")
 async def wordpress_pv_csv(
-    background_tasks: BackgroundTasks,
     days: int = Query(30, gt=0, le=30),
     out_dir: str | None = Query(None),
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet|arrow)$"),
 ):
-    accounts = CONFIG.get("wordpress", {}).get("accounts", {})
     output_path = (
         Path(out_dir)
         if out_dir
         else Path(__file__).resolve().parent / "csv"
     )
-    background_tasks.add_task(
-        service_export_views, accounts, days, output_path
+    job_id = JOBS.submit(
+        "wordpress_pv_csv", days=days, out_dir=str(output_path), format=format
     )
-    return {"status": "accepted"}
+    return {"status": "accepted", "job": job_id}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        return {"id": job_id, "error": "Job not found"}
+    return job
 
 
 @app.post("/note/draft")
 async def note_draft(data: NotePostRequest):
     paths = [Path(p) for p in data.images] if data.images else []
-    return post_to_note(data.content, paths, data.account)
+    return await EXECUTOR.run(
+        "note", post_to_note, data.content, paths, data.account
+    )
 
 if __name__ == "__main__":
     import uvicorn
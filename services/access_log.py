@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+DEFAULTS = {
+    "path": None,
+    "sample_rate": 1.0,
+    "slow_ms": 1000,
+    "preview_bytes": 256,
+    "max_bytes": 10 * 1024 * 1024,
+    "backup_count": 5,
+}
+
+# JSON keys whose values never appear in a preview.
+REDACT_KEYS = (
+    "password",
+    "access_token",
+    "access_token_secret",
+    "client_secret",
+    "consumer_secret",
+    "bearer_token",
+    "token",
+    "data",
+    "media",
+)
+# Content types whose bodies may be previewed.
+TEXT_TYPES = ("application/json", "application/x-www-form-urlencoded", "text/")
+
+_KEY_RE = re.compile(
+    r'("(?:%s)"\s*:\s*)(\[[^\]]*\]?|"(?:[^"\\]|\\.)*"?)' % "|".join(REDACT_KEYS)
+)
+# The same keys as ``key=value`` pairs of form-encoded bodies.
+_FORM_RE = re.compile(r"((?:^|&)(?:%s)=)[^&]*" % "|".join(REDACT_KEYS))
+_BLOB_RE = re.compile(r"[A-Za-z0-9+/=_-]{64,}")
+
+
+def redact_preview(text: str) -> str:
+    """Mask secret and media values and long base64-like runs in ``text``."""
+    text = _KEY_RE.sub(r'\1"[redacted]"', text)
+    text = _FORM_RE.sub(r"\1[redacted]", text)
+    return _BLOB_RE.sub(lambda m: f"[{len(m.group())} chars]", text)
+
+
+class AccessLog:
+    """Sampled, structured access log written off the request path.
+
+    Records are put on an in-memory queue by a :class:`QueueHandler` and
+    written by a :class:`QueueListener` thread, either to a rotating file
+    (``path``) or to stdout. Successful requests are kept with probability
+    ``sample_rate``; errors and requests slower than ``slow_ms`` are always
+    logged. Settings come from the ``access_log`` section of
+    ``config.json``.
+    """
+
+    def __init__(
+        self, config: dict | None = None, handler: logging.Handler | None = None
+    ):
+        cfg = {**DEFAULTS, **(config or {})}
+        self.sample_rate = float(cfg["sample_rate"])
+        self.slow_ms = float(cfg["slow_ms"])
+        self.preview_bytes = int(cfg["preview_bytes"])
+        if handler is None:
+            if cfg["path"]:
+                path = Path(cfg["path"])
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    path,
+                    maxBytes=int(cfg["max_bytes"]),
+                    backupCount=int(cfg["backup_count"]),
+                    encoding="utf-8",
+                )
+            else:
+                handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue: queue.Queue = queue.Queue(-1)
+        self.listener = QueueListener(self._queue, handler)
+        self.logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(QueueHandler(self._queue))
+        self.listener.start()
+        self._started = True
+
+    def should_log(self, status: int, latency_ms: float) -> bool:
+        if status >= 400 or latency_ms >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def log(self, entry: dict) -> None:
+        self.logger.info(json.dumps(entry, ensure_ascii=False))
+
+    def close(self) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._started:
+            self._started = False
+            self.listener.stop()
+
+
+class AccessLogMiddleware:
+    """ASGI middleware logging one structured record per HTTP request.
+
+    The request body is observed as the application reads it: only its size
+    and the first ``preview_bytes`` bytes are kept, so bodies are never
+    buffered or consumed by the logger.
+    """
+
+    def __init__(self, app, access_log: AccessLog):
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = self.access_log
+        start = time.perf_counter()
+        headers = {
+            k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        content_type = headers.get("content-type", "")
+        want_preview = log.preview_bytes > 0 and content_type.startswith(TEXT_TYPES)
+        state = {"size": 0, "preview": b"", "status": 500}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                state["size"] += len(chunk)
+                room = log.preview_bytes - len(state["preview"])
+                if want_preview and room > 0:
+                    state["preview"] += chunk[:room]
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            if log.should_log(state["status"], latency_ms):
+                # Fall back to Content-Length for bodies the app never read.
+                declared = headers.get("content-length", "")
+                entry = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": state["status"],
+                    "latency_ms": round(latency_ms, 2),
+                    "body_bytes": max(
+                        state["size"], int(declared) if declared.isdigit() else 0
+                    ),
+                }
+                if state["preview"]:
+                    text = state["preview"].decode("utf-8", errors="replace")
+                    entry["preview"] = redact_preview(text)
+                    entry["truncated"] = entry["body_bytes"] > len(state["preview"])
+                log.log(entry)
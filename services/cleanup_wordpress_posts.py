@@ -2,12 +2,18 @@ import json
 from pathlib import Path
 from typing import Any, Dict, List
 
+from bulk_delete import bulk_delete
+from wordpress_client import iter_all_posts
 from services.post_to_wordpress import create_wp_client, CONFIG
 
 
 def cleanup_posts(account: str, keep_latest: int) -> Dict[str, Any]:
     """Remove old posts and unattached media for a WordPress account.
 
+    Posts and media are deleted concurrently through
+    :func:`bulk_delete.bulk_delete`, which paces them per site; the
+    client's requests are retried by the governor.
+
     Parameters
     ----------
     account: str
@@ -23,17 +29,7 @@ def cleanup_posts(account: str, keep_latest: int) -> Dict[str, Any]:
     if client is None:
         return {"account": account, "error": "WordPress client unavailable"}
 
-    posts: List[Dict[str, Any]] = []
-    page = 1
-    while True:
-        items = client.list_posts(page=page, number=100)
-        if not items:
-            break
-        posts.extend(items)
-        if len(items) < 100:
-            break
-        page += 1
-
+    posts: List[Dict[str, Any]] = list(iter_all_posts(client))
     posts.sort(key=lambda p: p["date"])
     delete_count = len(posts) - keep_latest
     if delete_count <= 0:
@@ -41,14 +37,15 @@ def cleanup_posts(account: str, keep_latest: int) -> Dict[str, Any]:
     print(f"[cleanup] {account}: fetched {len(posts)} posts")
     print(f"[cleanup] {account}: deleting {delete_count} posts")
 
-    deleted: List[int] = []
-    errors: Dict[str, str] = {}
-    for p in posts[:delete_count]:
-        try:
-            client.delete_post(p["id"])
-            deleted.append(p["id"])
-        except Exception as exc:
-            errors[str(p["id"])] = str(exc)
+    site = getattr(client, "site", None)
+    result = bulk_delete(
+        client.delete_post,
+        [p["id"] for p in posts[:delete_count]],
+        site=site,
+        name=f"{account}:posts",
+    )
+    deleted: List[int] = result.deleted
+    errors: Dict[str, str] = result.errors
     print(f"[cleanup] {account}: deleted {len(deleted)} posts")
 
     try:
@@ -67,9 +64,10 @@ def cleanup_posts(account: str, keep_latest: int) -> Dict[str, Any]:
             if isinstance(val, str):
                 protected.add(val)
 
-    removed = 0
-    page = 1
     print(f"[cleanup] {account}: removing unattached media")
+    # Collect every page first; deleting while paging would shift items.
+    doomed: List[int] = []
+    page = 1
     while True:
         media = client.list_media(post_id=0, page=page, number=100)
         if not media:
@@ -78,14 +76,15 @@ def cleanup_posts(account: str, keep_latest: int) -> Dict[str, Any]:
             url = item.get("URL")
             if url and url in protected:
                 continue
-            try:
-                client.delete_media(item["ID"])
-                removed += 1
-            except Exception:
-                pass
+            doomed.append(item["ID"])
         if len(media) < 100:
             break
         page += 1
+    removed = len(
+        bulk_delete(
+            client.delete_media, doomed, site=site, name=f"{account}:media"
+        ).deleted
+    )
     print(f"[cleanup] {account}: removed {removed} media items")
 
     return {
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Iterator
+
+# Seconds a caller waits for one account to finish initializing.
+DEFAULT_TIMEOUT = 15.0
+# Accounts initialized in parallel per platform.
+DEFAULT_WORKERS = 8
+# Seconds before a failed account is tried again.
+DEFAULT_RETRY_AFTER = 30.0
+
+PENDING = "pending"
+INITIALIZING = "initializing"
+READY = "ready"
+FAILED = "failed"
+
+
+class ClientRegistry(Mapping):
+    """Lazily initialized API clients for the accounts of one platform.
+
+    ``factory(name, account_cfg)`` builds (and logs in) a client. Nothing
+    runs at construction: a client is created on its first :meth:`get`, or
+    for every account at once by :meth:`warm_up`, on a bounded thread pool.
+    Callers wait at most ``timeout`` seconds, so one hung login never
+    blocks other accounts. Failed accounts are retried on a lookup once
+    ``retry_after`` seconds have passed.
+
+    The registry behaves like a read-only mapping of account names to
+    clients; accounts that are not ready are looked up as missing.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        factory: Callable[[str, dict], Any],
+        accounts: dict[str, dict] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        workers: int = DEFAULT_WORKERS,
+        retry_after: float = DEFAULT_RETRY_AFTER,
+    ):
+        self.platform = platform
+        self.factory = factory
+        self.accounts = dict(accounts or {})
+        self.timeout = timeout
+        self.workers = max(int(workers), 1)
+        self.retry_after = retry_after
+        self._failed_at: dict[str, float] = {}
+        self._clients: dict[str, Any] = {}
+        self._futures: dict[str, Future] = {}
+        self._status: dict[str, dict] = {
+            name: {"state": PENDING} for name in self.accounts
+        }
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _init(self, name: str) -> Any:
+        start = time.monotonic()
+        cfg = self.accounts[name]
+        try:
+            client = self.factory(name, cfg)
+        except Exception as exc:
+            print(f"Failed to init {self.platform} client for {name}: {exc}")
+            with self._lock:
+                if self.accounts.get(name) is cfg:
+                    self._failed_at[name] = time.monotonic()
+                    self._status[name] = {
+                        "state": FAILED,
+                        "error": str(exc),
+                        "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+                    }
+            raise
+        with self._lock:
+            # Results for a configuration replaced by ``update`` are dropped.
+            if self.accounts.get(name) is cfg:
+                self._clients[name] = client
+                self._status[name] = {
+                    "state": READY,
+                    "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+                }
+        return client
+
+    def _start(self, name: str) -> Future:
+        # Called with ``_lock`` held.
+        future = self._futures.get(name)
+        retry = (
+            future is not None
+            and future.done()
+            and name not in self._clients
+            and time.monotonic() - self._failed_at.get(name, 0.0) >= self.retry_after
+        )
+        if future is None or retry:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f"{self.platform}-init",
+                )
+            self._status[name] = {"state": INITIALIZING}
+            future = self._pool.submit(self._init, name)
+            self._futures[name] = future
+        return future
+
+    def warm_up(self) -> None:
+        """Start initializing every account that is not ready, without waiting."""
+        with self._lock:
+            for name in self.accounts:
+                if name not in self._clients:
+                    self._start(name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Return the client for ``name``, initializing it if needed."""
+        if name not in self.accounts:
+            return default
+        with self._lock:
+            client = self._clients.get(name)
+            if client is not None:
+                return client
+            future = self._start(name)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                if self._status[name]["state"] == INITIALIZING:
+                    self._status[name]["error"] = (
+                        f"timed out after {self.timeout:g}s"
+                    )
+            return default
+        except Exception:
+            return default
+
+    def update(self, accounts: dict[str, dict]) -> dict[str, list[str]]:
+        """Replace the account configuration, keeping unchanged clients.
+
+        Clients of removed accounts are dropped; changed accounts go back to
+        ``pending`` and are rebuilt on next use. The swap happens under the
+        registry lock, so lookups see either the old or the new state, and
+        requests still holding an old client finish with it.
+        """
+        accounts = dict(accounts or {})
+        with self._lock:
+            old = self.accounts
+            added = [n for n in accounts if n not in old]
+            removed = [n for n in old if n not in accounts]
+            changed = [n for n in accounts if n in old and accounts[n] != old[n]]
+            for name in removed + changed:
+                self._clients.pop(name, None)
+                self._futures.pop(name, None)
+                self._failed_at.pop(name, None)
+                self._status.pop(name, None)
+            for name in added + changed:
+                self._status[name] = {"state": PENDING}
+            self.accounts = accounts
+        return {"added": added, "changed": changed, "removed": removed}
+
+    def __getitem__(self, name: str) -> Any:
+        client = self.get(name)
+        if client is None:
+            raise KeyError(name)
+        return client
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.accounts)
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.accounts
+
+    def error(self, name: str) -> str | None:
+        """Return the last initialization error of ``name``, if any."""
+        with self._lock:
+            return self._status.get(name, {}).get("error")
+
+    def status(self) -> dict[str, dict]:
+        """Return the state of every account: pending, initializing, ready or failed."""
+        with self._lock:
+            return {name: dict(info) for name, info in self._status.items()}
+
+    def ready(self) -> bool:
+        """Return ``True`` when every account has a client."""
+        with self._lock:
+            return len(self._clients) == len(self.accounts)
+
+    def shutdown(self) -> None:
+        """Stop the init pool without waiting for hung logins."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
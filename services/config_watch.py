@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable
+
+# Seconds between checks of the watched file.
+DEFAULT_INTERVAL = 2.0
+
+
+class ConfigWatcher:
+    """Call ``on_change`` whenever a file's modification time changes.
+
+    A daemon thread polls ``path`` every ``interval`` seconds. A missing
+    file is not a change: saving by rename or a ``git checkout`` briefly
+    removes it, and the next version is picked up once it is back.
+    Errors raised by ``on_change`` are printed and polling continues.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[], object],
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.on_change = on_change
+        self.interval = interval
+        self._mtime = self._stat()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _stat(self) -> float | None:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """Run ``on_change`` if the file changed since the last check."""
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            self.on_change()
+        except Exception as exc:
+            print(f"Config reload failed: {exc}")
+        return True
+
+    def start(self) -> "ConfigWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="config-watch", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+DEFAULT_LIMITS = {
+    "mastodon": 4,
+    "twitter": 4,
+    "wordpress": 8,
+    "note": 4,
+}
+DEFAULT_LIMIT = 4
+
+
+class PlatformExecutor:
+    """Run blocking platform calls off the event loop.
+
+    Each platform gets its own bounded thread pool so a slow upload to one
+    service cannot starve the others. Limits come from the ``executor``
+    section of ``config.json``::
+
+        "executor": {"default_limit": 4, "limits": {"wordpress": 8}}
+
+    Per-platform counters track queued, running, completed and failed calls.
+    """
+
+    def __init__(self, config: dict | None = None):
+        config = config or {}
+        self.default_limit = int(config.get("default_limit", DEFAULT_LIMIT))
+        self.limits = {**DEFAULT_LIMITS, **(config.get("limits") or {})}
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, platform: str) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(platform)
+            if pool is None:
+                limit = int(self.limits.get(platform, self.default_limit))
+                pool = ThreadPoolExecutor(
+                    max_workers=max(limit, 1),
+                    thread_name_prefix=f"{platform}-worker",
+                )
+                self._pools[platform] = pool
+                self._counters[platform] = {
+                    "limit": max(limit, 1),
+                    "queued": 0,
+                    "running": 0,
+                    "completed": 0,
+                    "failed": 0,
+                }
+            return pool
+
+    def _count(self, platform: str, **deltas: int) -> None:
+        with self._lock:
+            counters = self._counters[platform]
+            for key, delta in deltas.items():
+                counters[key] += delta
+
+    def _call(self, platform: str, func: Callable, *args, **kwargs) -> Any:
+        self._count(platform, queued=-1, running=1)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            self._count(platform, running=-1, failed=1)
+            raise
+        self._count(platform, running=-1, completed=1)
+        return result
+
+    def submit(self, platform: str, func: Callable, *args, **kwargs):
+        """Schedule ``func`` on the platform pool and return its future."""
+        pool = self._pool(platform)
+        self._count(platform, queued=1)
+        return pool.submit(self._call, platform, func, *args, **kwargs)
+
+    async def run(self, platform: str, func: Callable, *args, **kwargs) -> Any:
+        """Await ``func(*args, **kwargs)`` executed on the platform pool."""
+        pool = self._pool(platform)
+        self._count(platform, queued=1)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._call, platform, func, *args, **kwargs)
+        return await loop.run_in_executor(pool, call)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return a snapshot of the per-platform counters."""
+        with self._lock:
+            return {name: dict(c) for name, c in self._counters.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down every platform pool."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+try:  # Resizing and recompression need the optional ``Pillow`` package
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on environment
+    Image = None
+
+# Leading bytes of the media types accepted by every platform.
+MEDIA_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"GIF8", "image/gif", ".gif"),
+)
+
+# Per-platform limits applied when the ``image_prep`` section does not
+# override them. ``format`` ``auto`` keeps transparency as PNG and turns
+# everything else into JPEG.
+DEFAULT_PROFILES = {
+    "mastodon": {"max_width": 1920, "max_height": 1920, "format": "auto", "quality": 85},
+    "twitter": {"max_width": 4096, "max_height": 4096, "format": "auto", "quality": 85},
+    "wordpress": {"max_width": 2560, "max_height": 2560, "format": "auto", "quality": 82},
+    "note": {"max_width": 1920, "max_height": 1920, "format": "auto", "quality": 85},
+}
+PROFILE_DEFAULTS = {
+    "max_width": None,
+    "max_height": None,
+    "format": "auto",
+    "quality": 85,
+    "strip_exif": True,
+}
+# Processed images kept in memory, keyed by content hash and profile.
+DEFAULT_CACHE_SIZE = 256
+
+# ISO base media files (``ftyp`` box) by major brand.
+FTYP_BRANDS = {
+    b"qt  ": ("video/quicktime", ".mov"),
+    b"M4V ": ("video/mp4", ".m4v"),
+    b"M4A ": ("audio/mp4", ".m4a"),
+    b"heic": ("image/heic", ".heic"),
+    b"heix": ("image/heic", ".heic"),
+    b"avif": ("image/avif", ".avif"),
+    b"3gp4": ("video/3gpp", ".3gp"),
+    b"3gp5": ("video/3gpp", ".3gp"),
+}
+MP4_BRANDS = frozenset(
+    {b"isom", b"iso2", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42", b"avc1", b"dash"}
+)
+
+_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "png": ("PNG", "image/png", ".png"),
+    "webp": ("WEBP", "image/webp", ".webp"),
+}
+
+
+def detect_media_type(data: bytes) -> tuple[str, str]:
+    """Return ``(mime_type, extension)`` sniffed from the first bytes of ``data``."""
+    for signature, mime_type, ext in MEDIA_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type, ext
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    if data[4:8] == b"ftyp":
+        brand = data[8:12]
+        if brand in MP4_BRANDS:
+            return "video/mp4", ".mp4"
+        return FTYP_BRANDS.get(brand, ("application/octet-stream", ""))
+    return "application/octet-stream", ""
+
+
+@dataclass(frozen=True)
+class PreparedMedia:
+    """Media ready for upload with its detected type."""
+
+    data: bytes
+    mime_type: str
+    extension: str
+
+    def filename(self, original: str | None, index: int = 1) -> str:
+        """Return ``original`` with the extension matching the content."""
+        if not original:
+            return f"media{index}{self.extension}"
+        if not self.extension:
+            return original
+        return str(Path(original).with_suffix(self.extension))
+
+
+def prepare_image(data: bytes, profile: dict) -> PreparedMedia:
+    """Resize and recompress an image according to ``profile``.
+
+    Runs in a worker process. Videos, animated images, unknown content,
+    images Pillow cannot read and results that would not be smaller are
+    returned unchanged, except that metadata is always dropped when
+    ``strip_exif`` is set.
+    """
+    mime_type, ext = detect_media_type(data)
+    original = PreparedMedia(data, mime_type, ext)
+    if Image is None or mime_type not in ("image/png", "image/jpeg", "image/webp"):
+        return original
+    try:
+        return _prepare_image(data, {**PROFILE_DEFAULTS, **profile}, original)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+        # Corrupt, truncated or oversized images are uploaded as they are.
+        print(f"Image preprocessing skipped: {exc}")
+        return original
+
+
+def _prepare_image(
+    data: bytes, profile: dict, original: PreparedMedia
+) -> PreparedMedia:
+    with Image.open(io.BytesIO(data)) as img:
+        if getattr(img, "is_animated", False):
+            return original
+        has_exif = bool(img.info.get("exif"))
+        img = ImageOps.exif_transpose(img)
+        width, height = img.size
+        max_w = profile["max_width"] or width
+        max_h = profile["max_height"] or height
+        resized = width > max_w or height > max_h
+        if resized:
+            img.thumbnail((max_w, max_h), Image.LANCZOS)
+
+        fmt = profile["format"]
+        if fmt == "auto":
+            alpha = img.mode in ("RGBA", "LA") or (
+                img.mode == "P" and "transparency" in img.info
+            )
+            fmt = "png" if alpha else "jpeg"
+        pil_format, out_mime, out_ext = _FORMATS[fmt]
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        options = {"optimize": True}
+        if pil_format in ("JPEG", "WEBP"):
+            options["quality"] = int(profile["quality"])
+        if not profile["strip_exif"] and has_exif:
+            options["exif"] = img.info.get("exif", b"")
+        img.save(out, pil_format, **options)
+
+    result = PreparedMedia(out.getvalue(), out_mime, out_ext)
+    must_strip = profile["strip_exif"] and has_exif
+    if not resized and not must_strip and len(result.data) >= len(data):
+        return original
+    return result
+
+
+class ImagePreprocessor:
+    """Per-platform image resizing on a process pool with a result cache.
+
+    Images are decoded and re-encoded in ``workers`` separate processes so
+    CPU-heavy work never holds the GIL of the server. ``workers=0``
+    processes inline. Results are cached by BLAKE2b content hash and
+    profile, so reposting an image costs no processing at all.
+    """
+
+    def __init__(
+        self,
+        profiles: dict[str, dict] | None = None,
+        workers: int = 2,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.profiles = {
+            name: {**profile, **(profiles or {}).get(name, {})}
+            for name, profile in DEFAULT_PROFILES.items()
+        }
+        for name, profile in (profiles or {}).items():
+            self.profiles.setdefault(name, dict(profile))
+        self.workers = max(int(workers), 0)
+        self.cache_size = max(int(cache_size), 0)
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple[str, str], PreparedMedia] = OrderedDict()
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _submit(self, data: bytes, profile: dict):
+        with self._lock:
+            if self._pool is None:
+                # Forking a threaded server can deadlock on inherited locks.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool.submit(prepare_image, data, profile)
+
+    def process(self, platform: str, data: bytes) -> PreparedMedia:
+        """Return ``data`` prepared for ``platform``."""
+        profile = self.profiles.get(platform)
+        if profile is None:
+            mime_type, ext = detect_media_type(data)
+            return PreparedMedia(data, mime_type, ext)
+        key = (
+            hashlib.blake2b(data, digest_size=32).hexdigest(),
+            json.dumps(profile, sort_keys=True),
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        if self.workers:
+            try:
+                result = self._submit(bytes(data), profile).result()
+            except Exception as exc:
+                # A crashed worker must not fail the post; upload as is.
+                print(f"Image preprocessing failed: {exc}")
+                mime_type, ext = detect_media_type(data)
+                return PreparedMedia(data, mime_type, ext)
+        else:
+            result = prepare_image(bytes(data), profile)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_image_preprocessor(config: dict | None) -> ImagePreprocessor | None:
+    """Build a preprocessor from the ``image_prep`` config section.
+
+    Preprocessing is disabled when the section is missing, ``enabled`` is
+    false or Pillow is not installed.
+    """
+    if config is None or not config.get("enabled", True):
+        return None
+    if Image is None:
+        print("image_prep is configured but Pillow is not installed; disabled")
+        return None
+    return ImagePreprocessor(
+        config.get("profiles"),
+        workers=config.get("workers", 2),
+        cache_size=config.get("cache_size", DEFAULT_CACHE_SIZE),
+    )
+
+
+# Shared preprocessor used by the posting endpoints; set up by the server.
+IMAGE_PREP: ImagePreprocessor | None = None
+
+
+def prepare_media(platform: str, data: bytes) -> PreparedMedia:
+    """Prepare ``data`` with :data:`IMAGE_PREP`, or only detect its type."""
+    prep = IMAGE_PREP
+    if prep is None:
+        mime_type, ext = detect_media_type(data)
+        return PreparedMedia(data, mime_type, ext)
+    return prep.process(platform, data)
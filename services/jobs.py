@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+# Worker threads used when the ``jobs`` config section does not set one.
+DEFAULT_WORKERS = 2
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueue:
+    """Durable queue of background jobs backed by SQLite.
+
+    Jobs are rows with a ``kind`` and JSON ``params``. A handler registered
+    for the kind is called as ``handler(**params)`` on one of ``workers``
+    threads, and its JSON-serialisable return value is stored as the
+    result. Workers start on the first :meth:`submit`.
+
+    With ``resume`` enabled, jobs that were queued or running when the
+    process stopped are queued again on start; otherwise they are marked
+    failed.
+    """
+
+    def __init__(self, path: Path, workers: int = DEFAULT_WORKERS, resume: bool = True):
+        self.path = Path(path)
+        self.workers = max(int(workers), 1)
+        self.resume = resume
+        self.handlers: dict[str, Callable[..., Any]] = {}
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._threads: list[threading.Thread] = []
+        self._stopping = False
+        self._recovered = False
+
+    def register(self, kind: str, handler: Callable[..., Any]) -> None:
+        """Register ``handler`` to run jobs of ``kind``."""
+        self.handlers[kind] = handler
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with ``_lock`` held. The file is only created once used.
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    " id TEXT PRIMARY KEY,"
+                    " kind TEXT NOT NULL,"
+                    " params TEXT NOT NULL,"
+                    " status TEXT NOT NULL,"
+                    " result TEXT,"
+                    " error TEXT,"
+                    " created_at REAL NOT NULL,"
+                    " started_at REAL,"
+                    " finished_at REAL"
+                    ")"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS jobs_status"
+                    " ON jobs (status, created_at)"
+                )
+        if not self._recovered:
+            self._recovered = True
+            self._recover()
+        return self._conn
+
+    def _recover(self) -> None:
+        # Jobs left by a previous process are resumed or failed.
+        with self._conn:
+            if self.resume:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = NULL"
+                    " WHERE status = ?",
+                    (QUEUED, RUNNING),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?"
+                    " WHERE status IN (?, ?)",
+                    (FAILED, "Interrupted by restart", time.time(), QUEUED, RUNNING),
+                )
+
+    def start(self) -> None:
+        """Start the worker threads, resuming pending jobs if enabled."""
+        with self._lock:
+            self._db()
+            self._stopping = False
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"job-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            self._cond.notify_all()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the workers after their current job."""
+        with self._lock:
+            self._stopping = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def submit(self, kind: str, **params: Any) -> str:
+        """Persist a new job and return its ID."""
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, params, status, created_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(params), QUEUED, time.time()),
+                )
+        self.start()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        """Return the job as a dict, or ``None`` when it does not exist."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def wait(self, job_id: str, timeout: float | None = None) -> dict | None:
+        """Block until the job has finished and return it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                row = self._db().execute(
+                    "SELECT status FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone()
+                if row is None or row["status"] in (SUCCEEDED, FAILED):
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of jobs per status and the worker count."""
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        with self._lock:
+            if self._conn is not None or self.path.exists():
+                rows = self._db().execute(
+                    "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+                ).fetchall()
+                counts.update({status: n for status, n in rows})
+            counts["workers"] = sum(t.is_alive() for t in self._threads)
+        return counts
+
+    def _claim(self) -> sqlite3.Row | None:
+        # Called with ``_lock`` held.
+        conn = self._db()
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+            (QUEUED,),
+        ).fetchone()
+        if row is not None:
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                    (RUNNING, time.time(), row["id"]),
+                )
+        return row
+
+    def _finish(self, job_id: str, status: str, result=None, error=None) -> None:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?,"
+                    " finished_at = ? WHERE id = ?",
+                    (
+                        status,
+                        None if result is None else json.dumps(result, default=str),
+                        error,
+                        time.time(),
+                        job_id,
+                    ),
+                )
+            self._cond.notify_all()
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                row = None
+                while not self._stopping and (row := self._claim()) is None:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+            handler = self.handlers.get(row["kind"])
+            try:
+                if handler is None:
+                    raise RuntimeError(f"No handler for job kind {row['kind']!r}")
+                result = handler(**json.loads(row["params"]))
+            except Exception as exc:
+                traceback.print_exc()
+                self._finish(row["id"], FAILED, error=str(exc))
+            else:
+                self._finish(row["id"], SUCCEEDED, result=result)
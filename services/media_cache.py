@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+# Seconds a cached upload is reused unless a platform overrides it.
+DEFAULT_TTL = 30 * 24 * 3600
+# Entries kept before the least recently used ones are evicted.
+DEFAULT_MAX_ENTRIES = 5000
+# Seconds after which a hit is checked against the platform before reuse.
+DEFAULT_VALIDATE_AFTER = 3600
+# Twitter media IDs expire 24 hours after upload.
+PLATFORM_TTL = {"twitter": 23 * 3600}
+
+# Bytes hashed per read when digesting files.
+CHUNK_SIZE = 1024 * 1024
+
+
+def media_digest(source: Any) -> str | None:
+    """Return the BLAKE2b hex digest of a media source.
+
+    ``source`` may be a path, a bytes-like object or a seekable binary file
+    object, which is read in chunks and rewound to where it started. Other
+    sources return ``None`` and are never cached.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+        return digest.hexdigest()
+    if isinstance(source, Path):
+        with source.open("rb") as fh:
+            while chunk := fh.read(CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
+    try:
+        if not source.seekable():
+            return None
+        start = source.tell()
+    except Exception:
+        return None
+    try:
+        while chunk := source.read(CHUNK_SIZE):
+            digest.update(chunk)
+    finally:
+        source.seek(start)
+    return digest.hexdigest()
+
+
+class MediaCache:
+    """Persistent map of media content hashes to uploaded media.
+
+    Entries are keyed by ``(platform, account, digest)`` and hold the
+    platform's upload result (media ID and/or URL) in SQLite, so an image
+    posted again is not uploaded again, even after a restart. Entries
+    expire after ``ttl`` seconds (``platform_ttl`` overrides it per
+    platform) and the least recently used ones are evicted beyond
+    ``max_entries``. Hits older than ``validate_after`` seconds are checked
+    with the caller's ``validate`` function first, and dropped if the
+    remote media is gone.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        validate_after: float = DEFAULT_VALIDATE_AFTER,
+        platform_ttl: dict[str, float] | None = None,
+    ):
+        self.path = Path(path)
+        self.ttl = float(ttl)
+        self.max_entries = max(int(max_entries), 1)
+        self.validate_after = float(validate_after)
+        self.platform_ttl = {**PLATFORM_TTL, **(platform_ttl or {})}
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        # Per-key locks with their number of users; dropped when unused.
+        self._key_locks: dict[tuple[str, str, str], list] = {}
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with ``_lock`` held. The file is only created once used.
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS media ("
+                    " platform TEXT NOT NULL,"
+                    " account TEXT NOT NULL,"
+                    " digest TEXT NOT NULL,"
+                    " value TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " checked_at REAL NOT NULL,"
+                    " used_at REAL NOT NULL,"
+                    " PRIMARY KEY (platform, account, digest)"
+                    ")"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS media_used ON media (used_at)"
+                )
+        return self._conn
+
+    def ttl_for(self, platform: str) -> float:
+        return float(self.platform_ttl.get(platform, self.ttl))
+
+    def get(self, platform: str, account: str, digest: str) -> dict | None:
+        """Return the cached entry with its timestamps, dropping it if expired."""
+        key = (platform, account, digest)
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT value, created_at, checked_at FROM media"
+                " WHERE platform = ? AND account = ? AND digest = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at, checked_at = row
+            if time.time() - created_at >= self.ttl_for(platform):
+                with conn:
+                    conn.execute(
+                        "DELETE FROM media"
+                        " WHERE platform = ? AND account = ? AND digest = ?",
+                        key,
+                    )
+                return None
+        return {
+            "value": json.loads(value),
+            "created_at": created_at,
+            "checked_at": checked_at,
+        }
+
+    def put(self, platform: str, account: str, digest: str, value: dict) -> None:
+        """Store an upload result and evict least recently used entries."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO media"
+                    " (platform, account, digest, value,"
+                    " created_at, checked_at, used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (platform, account, digest, json.dumps(value), now, now, now),
+                )
+                conn.execute(
+                    "DELETE FROM media WHERE rowid IN ("
+                    " SELECT rowid FROM media ORDER BY used_at DESC"
+                    " LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def forget(self, platform: str, account: str, digest: str) -> None:
+        """Drop one entry, e.g. after the platform rejected it."""
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "DELETE FROM media"
+                    " WHERE platform = ? AND account = ? AND digest = ?",
+                    (platform, account, digest),
+                )
+
+    def _touch(self, key: tuple[str, str, str], checked: bool) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            with conn:
+                if checked:
+                    conn.execute(
+                        "UPDATE media SET used_at = ?, checked_at = ?"
+                        " WHERE platform = ? AND account = ? AND digest = ?",
+                        (now, now, *key),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE media SET used_at = ?"
+                        " WHERE platform = ? AND account = ? AND digest = ?",
+                        (now, *key),
+                    )
+
+    def fetch(
+        self,
+        platform: str,
+        account: str,
+        source: Any,
+        upload: Callable[[], dict],
+        validate: Callable[[dict], bool] | None = None,
+    ) -> dict:
+        """Return the cached upload of ``source`` or call ``upload`` and cache it.
+
+        Concurrent calls for the same content and account wait for one
+        upload instead of racing. Sources that cannot be hashed, and
+        uploads that raise, are never cached.
+        """
+        digest = media_digest(source)
+        if digest is None:
+            return upload()
+        key = (platform, account, digest)
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                return self._fetch(key, upload, validate)
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._key_locks[key]
+
+    def _fetch(
+        self,
+        key: tuple[str, str, str],
+        upload: Callable[[], dict],
+        validate: Callable[[dict], bool] | None,
+    ) -> dict:
+        # Called with the lock of ``key`` held.
+        platform = key[0]
+        entry = self.get(*key)
+        if entry is not None:
+            checked = False
+            if (
+                validate is not None
+                and time.time() - entry["checked_at"] >= self.validate_after
+            ):
+                try:
+                    valid = validate(entry["value"])
+                except Exception as exc:
+                    print(f"Cached {platform} media check failed: {exc}")
+                    valid = False
+                if not valid:
+                    self.forget(*key)
+                    entry = None
+                checked = True
+            if entry is not None:
+                self._touch(key, checked)
+                with self._lock:
+                    self.hits += 1
+                return entry["value"]
+        with self._lock:
+            self.misses += 1
+        value = upload()
+        self.put(*key, value)
+        return value
+
+    def stats(self) -> dict:
+        """Return entry count and hit/miss counters."""
+        with self._lock:
+            entries = 0
+            if self._conn is not None or self.path.exists():
+                entries = self._db().execute("SELECT COUNT(*) FROM media").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+def create_media_cache(config: dict | None, default_path: Path) -> MediaCache | None:
+    """Build a cache from the ``media_cache`` config section.
+
+    The cache is disabled when the section is missing or ``enabled`` is
+    false.
+    """
+    if config is None or not config.get("enabled", True):
+        return None
+    return MediaCache(
+        Path(config.get("path") or default_path),
+        ttl=config.get("ttl", DEFAULT_TTL),
+        max_entries=config.get("max_entries", DEFAULT_MAX_ENTRIES),
+        validate_after=config.get("validate_after", DEFAULT_VALIDATE_AFTER),
+        platform_ttl=config.get("platform_ttl"),
+    )
+
+
+# Shared cache used by the posting services; set up by the server.
+MEDIA_CACHE: MediaCache | None = None
+
+
+def cached_upload(
+    platform: str,
+    account: str | None,
+    source: Any,
+    upload: Callable[[], dict],
+    validate: Callable[[dict], bool] | None = None,
+) -> dict:
+    """Upload through :data:`MEDIA_CACHE`, or directly when it is disabled."""
+    cache = MEDIA_CACHE
+    if cache is None:
+        return upload()
+    return cache.fetch(platform, account or "default", source, upload, validate)
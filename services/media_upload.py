@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, BinaryIO, Callable, Sequence
+
+import governor
+
+# Attachments allowed per status; uploads run at most this many at a time.
+# Note drafts take any number of images; four keeps the upload API polite.
+MEDIA_LIMITS = {"mastodon": 4, "twitter": 4, "note": 4}
+DEFAULT_LIMIT = 4
+
+# Twitter accepts APPEND segments of up to 5 MB.
+SEGMENT_SIZE = 4 * 1024 * 1024
+# Media above this size, and every video or GIF, use the chunked upload.
+CHUNKED_THRESHOLD = 5 * 1024 * 1024
+# Segments of one file sent at the same time.
+SEGMENT_WORKERS = 4
+# Times an interrupted chunked upload is resumed after a transient failure.
+RESUME_ATTEMPTS = 3
+RESUME_BACKOFF = 1.0
+# Seconds between processing checks and before giving up on them.
+POLL_INTERVAL = 1.0
+POLL_TIMEOUT = 300.0
+
+
+def upload_concurrently(
+    platform: str,
+    items: Sequence[Any],
+    upload: Callable[[int, Any], Any],
+    workers: int | None = None,
+) -> list[Any]:
+    """Call ``upload(index, item)`` for every item in parallel.
+
+    At most ``workers`` uploads, by default the platform's attachment limit,
+    run at once. Results keep the order of ``items`` (``index`` starts at
+    1). The first failure cancels uploads that have not started yet and is
+    raised.
+    """
+    if not items:
+        return []
+    limit = workers or MEDIA_LIMITS.get(platform, DEFAULT_LIMIT)
+    pool = ThreadPoolExecutor(
+        max_workers=max(1, min(len(items), limit)),
+        thread_name_prefix=f"{platform}-media",
+    )
+    try:
+        futures = [
+            pool.submit(upload, index, item) for index, item in enumerate(items, 1)
+        ]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            if future in done and future.exception() is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise future.exception()
+        return [future.result() for future in futures]
+    finally:
+        pool.shutdown(wait=False)
+
+
+def media_size(source: bytes | BinaryIO) -> int:
+    """Return the bytes left to read in ``source``."""
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    start = source.tell()
+    end = source.seek(0, 2)
+    source.seek(start)
+    return end - start
+
+
+def needs_chunked(mime_type: str | None, size: int) -> bool:
+    """Return whether Twitter requires the chunked upload for this media."""
+    mime_type = mime_type or ""
+    return (
+        mime_type.startswith("video/")
+        or mime_type == "image/gif"
+        or size > CHUNKED_THRESHOLD
+    )
+
+
+def twitter_media_category(mime_type: str | None) -> str:
+    mime_type = mime_type or ""
+    if mime_type.startswith("video/"):
+        return "tweet_video"
+    if mime_type == "image/gif":
+        return "tweet_gif"
+    return "tweet_image"
+
+
+class ChunkedUpload:
+    """Twitter ``INIT``/``APPEND``/``FINALIZE`` upload that can resume.
+
+    ``source`` is read one segment at a time, so large files are never
+    held in memory whole, and up to ``workers`` segments are sent at once.
+    Every call goes through :data:`governor.GOVERNOR` for ``host``. When a
+    transient failure outlasts the governor's retries, :meth:`run` resumes
+    with the same media ID and sends only the segments still missing.
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        source: bytes | BinaryIO,
+        mime_type: str,
+        host: str,
+        segment_size: int | None = None,
+        workers: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.api = api
+        self.source = source
+        self.mime_type = mime_type
+        self.host = host
+        self.segment_size = segment_size or SEGMENT_SIZE
+        self.workers = workers or SEGMENT_WORKERS
+        self.sleep = sleep
+        self.start = 0 if isinstance(source, (bytes, bytearray)) else source.tell()
+        self.size = media_size(source)
+        self.media_id = None
+        self.sent: set[int] = set()
+        self.finalized = None
+        self._lock = threading.Lock()
+
+    @property
+    def segments(self) -> int:
+        return max(1, -(-self.size // self.segment_size))
+
+    def _call(self, func: Callable[..., Any], *args, idempotent=False, **kwargs):
+        return governor.GOVERNOR.call(
+            self.host, func, *args, idempotent=idempotent, **kwargs
+        )
+
+    def _read(self, segment: int) -> bytes:
+        offset = segment * self.segment_size
+        if isinstance(self.source, (bytes, bytearray)):
+            return bytes(self.source[offset : offset + self.segment_size])
+        # File objects are shared by the segment workers.
+        with self._lock:
+            self.source.seek(self.start + offset)
+            return self.source.read(self.segment_size)
+
+    def _append(self, _index: int, segment: int) -> None:
+        data = self._read(segment)
+        # Sending a segment again replaces it, so retries are safe.
+        self._call(
+            lambda: self.api.chunked_upload_append(self.media_id, data, segment),
+            idempotent=True,
+        )
+        with self._lock:
+            self.sent.add(segment)
+
+    def _wait_for_processing(self, info: dict | None) -> None:
+        deadline = time.monotonic() + POLL_TIMEOUT
+        while info and info.get("state") in ("pending", "in_progress"):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Media {self.media_id} is still processing")
+            self.sleep(info.get("check_after_secs") or POLL_INTERVAL)
+            status = self._call(
+                self.api.get_media_upload_status, self.media_id, idempotent=True
+            )
+            info = getattr(status, "processing_info", None)
+        if info and info.get("state") == "failed":
+            error = info.get("error") or {}
+            raise RuntimeError(error.get("message") or "Media processing failed")
+
+    def _attempt(self) -> Any:
+        if self.media_id is None:
+            media = self._call(
+                self.api.chunked_upload_init,
+                self.size,
+                self.mime_type,
+                media_category=twitter_media_category(self.mime_type),
+            )
+            self.media_id = media.media_id
+        pending = [i for i in range(self.segments) if i not in self.sent]
+        upload_concurrently("twitter", pending, self._append, workers=self.workers)
+        if self.finalized is None:
+            self.finalized = self._call(
+                self.api.chunked_upload_finalize, self.media_id
+            )
+        self._wait_for_processing(getattr(self.finalized, "processing_info", None))
+        return self.media_id
+
+    def run(self, attempts: int | None = None) -> Any:
+        """Upload the media and return its ID."""
+        attempts = RESUME_ATTEMPTS if attempts is None else attempts
+        for attempt in range(attempts + 1):
+            try:
+                return self._attempt()
+            except Exception as exc:
+                if attempt >= attempts or not governor.is_transient(exc):
+                    raise
+                print(
+                    f"Resuming Twitter upload {self.media_id} after {exc}; "
+                    f"{len(self.sent)}/{self.segments} segments sent"
+                )
+                self.sleep(RESUME_BACKOFF * 2**attempt)
+
+
+def mastodon_processing(attachment: Any) -> bool:
+    """Return whether a v2 media attachment is still being processed.
+
+    Mastodon answers large uploads with ``202`` and a ``null`` ``url``
+    until the file has been transcoded.
+    """
+    try:
+        return "url" in attachment and attachment["url"] is None
+    except TypeError:
+        return False
+
+
+def wait_for_mastodon_media(
+    client: Any,
+    attachment: Any,
+    host: str,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Any:
+    """Poll ``client.media`` until ``attachment`` is ready to be attached."""
+    deadline = time.monotonic() + POLL_TIMEOUT
+    while mastodon_processing(attachment):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Media {attachment['id']} is still processing")
+        sleep(POLL_INTERVAL)
+        attachment = governor.GOVERNOR.call(
+            host, client.media, attachment["id"], idempotent=True
+        )
+    return attachment
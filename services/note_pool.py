@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from note_client import NoteClient
+
+try:  # Persisting cookies needs the optional ``cryptography`` package
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # pragma: no cover - depends on environment
+    Fernet = None
+
+# Environment variable holding the Fernet key for the cookie cache.
+KEY_ENV = "NOTE_SESSION_KEY"
+
+
+def _fingerprint(config: dict) -> str:
+    """Hash of the settings a session belongs to; no secret is stored."""
+    note_cfg = config.get("note", {})
+    raw = json.dumps(
+        [note_cfg.get("username"), note_cfg.get("password"), note_cfg.get("base_url")]
+    )
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def dump_cookies(jar: Any) -> list[dict]:
+    return [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "expires": cookie.expires,
+            "secure": cookie.secure,
+        }
+        for cookie in jar
+    ]
+
+
+def load_cookies(jar: Any, cookies: list[dict], now: float | None = None) -> int:
+    """Add unexpired ``cookies`` to ``jar`` and return how many were added."""
+    now = time.time() if now is None else now
+    added = 0
+    for cookie in cookies:
+        if cookie.get("expires") is not None and cookie["expires"] <= now:
+            continue
+        jar.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain") or "",
+            path=cookie.get("path") or "/",
+            expires=cookie.get("expires"),
+            secure=cookie.get("secure", False),
+        )
+        added += 1
+    return added
+
+
+class SessionStore:
+    """Encrypted file holding the Note cookies of every account.
+
+    The file is encrypted with Fernet. The key comes from ``key``, or the
+    ``NOTE_SESSION_KEY`` environment variable. Without either, a key is
+    generated once and kept next to the cache in a ``.key`` file readable
+    only by the owner. Unreadable files are treated as empty, so a lost
+    key only costs a new sign-in.
+    """
+
+    def __init__(self, path: Path, key: str | bytes | None = None):
+        if Fernet is None:
+            raise RuntimeError("cryptography is not installed")
+        self.path = Path(path)
+        self.key_path = self.path.with_suffix(".key")
+        self._fernet = Fernet(key or os.environ.get(KEY_ENV) or self._load_key())
+        self._lock = threading.Lock()
+
+    def _load_key(self) -> bytes:
+        if self.key_path.exists():
+            return self.key_path.read_bytes().strip()
+        key = Fernet.generate_key()
+        self.key_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(key)
+        return key
+
+    def _read(self) -> dict:
+        # Called with ``_lock`` held.
+        try:
+            token = self.path.read_bytes()
+        except FileNotFoundError:
+            return {}
+        try:
+            return json.loads(self._fernet.decrypt(token))
+        except (InvalidToken, ValueError) as exc:
+            print(f"Ignoring unreadable Note session cache: {exc!r}")
+            return {}
+
+    def load(self, name: str) -> dict | None:
+        with self._lock:
+            return self._read().get(name)
+
+    def save(self, name: str, entry: dict | None) -> None:
+        """Store ``entry`` for ``name``, or drop it when ``None``."""
+        with self._lock:
+            sessions = self._read()
+            if entry is None:
+                if sessions.pop(name, None) is None:
+                    return
+            else:
+                sessions[name] = entry
+            token = self._fernet.encrypt(json.dumps(sessions).encode())
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(token)
+            os.replace(tmp, self.path)
+
+
+class NoteSessionPool:
+    """Process-wide cache of logged-in Note clients, keyed by account.
+
+    The server's client registry and :mod:`services.post_to_note` share
+    one pool, so an account signs in once per process. With a
+    :class:`SessionStore`, cookies survive restarts: a client is restored
+    from unexpired cookies without signing in. It logs in again only when
+    Note answers ``401`` (see :meth:`NoteClient._send`), and the new
+    cookies are stored again.
+    """
+
+    def __init__(self, store: SessionStore | None = None):
+        self.store = store
+        self.clients: dict[str, Any] = {}
+        self._sources: dict[str, tuple[type, str]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.restored = 0
+        self.logins = 0
+
+    def _save(self, name: str, client: Any, fingerprint: str) -> None:
+        with self._lock:
+            self.logins += 1
+        session = getattr(client, "session", None)
+        if self.store is None or session is None:
+            return
+        try:
+            self.store.save(
+                name,
+                {
+                    "fingerprint": fingerprint,
+                    "cookies": dump_cookies(session.cookies),
+                    "saved_at": time.time(),
+                },
+            )
+        except Exception as exc:
+            print(f"Failed to persist Note session for {name}: {exc}")
+
+    def _restore(self, name: str, client: Any, fingerprint: str) -> bool:
+        session = getattr(client, "session", None)
+        if self.store is None or session is None:
+            return False
+        try:
+            entry = self.store.load(name)
+        except Exception as exc:
+            print(f"Failed to read Note session for {name}: {exc}")
+            return False
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return False
+        return load_cookies(session.cookies, entry.get("cookies") or []) > 0
+
+    def get(self, name: str, config: dict, client_cls: type = NoteClient) -> Any:
+        """Return a logged-in client for ``name`` built from ``config``.
+
+        ``config`` is the :class:`NoteClient` configuration of the account.
+        A cached client built from other settings or another class is
+        replaced. Login errors propagate and nothing is cached.
+        """
+        fingerprint = _fingerprint(config)
+        source = (client_cls, fingerprint)
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            client = self.clients.get(name)
+            if client is not None and self._sources.get(name) == source:
+                with self._lock:
+                    self.hits += 1
+                return client
+            with self._lock:
+                self.misses += 1
+            client = client_cls(config)
+            client.on_login = lambda: self._save(name, client, fingerprint)
+            if self._restore(name, client, fingerprint):
+                with self._lock:
+                    self.restored += 1
+            else:
+                client.login()
+            self.clients[name] = client
+            self._sources[name] = source
+            return client
+
+    def invalidate(self, name: str, forget: bool = False) -> None:
+        """Drop the cached client for ``name``; ``forget`` also drops its cookies."""
+        with self._lock:
+            self.clients.pop(name, None)
+            self._sources.pop(name, None)
+        if forget and self.store is not None:
+            self.store.save(name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self.clients),
+                "hits": self.hits,
+                "misses": self.misses,
+                "restored": self.restored,
+                "logins": self.logins,
+                "persistent": self.store is not None,
+            }
+
+
+def create_note_pool(config: dict | None, default_path: Path) -> NoteSessionPool:
+    """Build the pool from the ``note_sessions`` config section.
+
+    Sessions are kept in memory only when the section is missing,
+    ``enabled`` is false or ``cryptography`` is not installed.
+    """
+    if config is None or not config.get("enabled", True):
+        return NoteSessionPool()
+    if Fernet is None:
+        print("note_sessions is configured but cryptography is not installed; disabled")
+        return NoteSessionPool()
+    store = SessionStore(Path(config.get("path") or default_path), config.get("key"))
+    return NoteSessionPool(store)
+
+
+# Shared by the server and the Note service; set up by the server.
+NOTE_POOL = NoteSessionPool()
@@ -1,8 +1,13 @@
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
+import services.note_pool as note_pool
 from note_client import NoteClient
+from services.media_cache import cached_upload
+from services.media_upload import upload_concurrently
 
 CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.json"
 
@@ -13,63 +18,118 @@ else:
     CONFIG = {}
 
 
+def resolve_account(account: str | None = None) -> str:
+    """Return the configured account name ``account`` stands for.
+
+    Without ``account`` this is ``default`` when configured, otherwise the
+    first configured account, as used by :func:`create_note_client`.
+    """
+    if account:
+        return account
+    accounts = CONFIG.get("note", {}).get("accounts") or {}
+    if "default" in accounts:
+        return "default"
+    return next(iter(accounts), "default")
+
+
 def create_note_client(account: str | None = None) -> NoteClient | None:
-    """Initialize a NoteClient using the specified Note account."""
+    """Return the pooled, logged-in NoteClient of the specified Note account."""
     note_cfg = CONFIG.get("note", {})
     accounts = note_cfg.get("accounts") or {}
     if not accounts:
         print("No Note accounts configured")
         return None
 
-    acct = None
-    if account:
-        acct = accounts.get(account)
-        if not acct:
-            print(f"No Note account configured for {account}")
-            return None
-    elif "default" in accounts:
-        acct = accounts["default"]
-    else:
-        acct = next(iter(accounts.values()))
+    account = resolve_account(account)
+    if not accounts.get(account):
+        print(f"No Note account configured for {account}")
+        return None
+    acct = accounts[account]
 
     cfg = {"note": {"username": acct.get("username"), "password": acct.get("password")}}
     if note_cfg.get("base_url"):
         cfg["note"]["base_url"] = note_cfg["base_url"]
 
     try:
-        client = NoteClient(cfg)
-        client.login()
-        return client
+        return note_pool.NOTE_POOL.get(account, cfg, NoteClient)
     except Exception as exc:
         print(f"Failed to init Note client: {exc}")
         print(f"CONFIG used for NoteClient: {cfg}")
         return None
 
 
-NOTE_CLIENT = create_note_client()
+def post_to_note(
+    content: str,
+    images: List[Path | bytes | tuple[bytes, str]] = [],
+    account: str | None = None,
+) -> dict:
+    """Create a Note draft with optional image paths or bytes and return draft details.
 
+    In-memory images may be given as ``(bytes, filename)`` so Note receives
+    a file name and content type for them.
 
-def post_to_note(content: str, images: List[Path] = [], account: str | None = None) -> dict:
-    """Create a Note draft with optional images and return draft details."""
-    client = NOTE_CLIENT if account is None else create_note_client(account)
+    Images upload concurrently. The empty draft is created once the first
+    image has uploaded, while the rest are still in flight, and is then
+    filled in with a single update carrying the body in image order. If an
+    image fails before that, no draft is created; if one fails after, the
+    error names the empty draft left on Note.
+    """
+    client = create_note_client(account)
     if client is None:
         print('NOTE_CLIENT is None')
         return {"error": "Note client unavailable"}
+    # Media is cached under the account the client was resolved for.
+    account = resolve_account(account)
 
-    body = f"<p>{content}</p>"
     for img in images:
-        if not img.exists():
+        if isinstance(img, Path) and not img.exists():
             return {"error": f"Image file not found: {img}"}
-        try:
-            url = client.upload_image(img)
-            body += f'<img src="{url}" />'
-        except Exception as exc:
-            return {"error": f"Image upload failed: {exc}"}
+
+    title = "Auto Post"
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="note-draft")
+    shell = None
+    failed = False
+    lock = threading.Lock()
+
+    def start_shell() -> None:
+        nonlocal shell
+        with lock:
+            if shell is None and not failed:
+                shell = pool.submit(client.create_draft_shell, title)
+
+    def upload(_index: int, item: Path | bytes | tuple[bytes, str]) -> str:
+        img, *name = item if isinstance(item, tuple) else (item,)
+        uploaded = cached_upload(
+            "note", account, img, lambda: {"url": client.upload_image(img, *name)}
+        )
+        start_shell()
+        return f'<img src="{uploaded["url"]}" />'
 
     try:
-        draft_info = client.create_draft("Auto Post", body)
-    except Exception as exc:
-        return {"error": str(exc)}
+        if not images:
+            start_shell()
+        try:
+            tags = upload_concurrently("note", images, upload)
+        except Exception as exc:
+            with lock:
+                failed = True
+            error = {"error": f"Image upload failed: {exc}"}
+            try:
+                draft_info = shell.result() if shell is not None else None
+            except Exception:
+                draft_info = None
+            if draft_info:
+                error["id"] = draft_info.get("note_id")
+                error["link"] = draft_info.get("draft_url")
+            return error
+        try:
+            draft_info = shell.result()
+            body = "".join([f"<p>{content}</p>", *tags])
+            client.update_draft(draft_info.get("note_id"), title, body)
+        except Exception as exc:
+            return {"error": str(exc)}
+    finally:
+        pool.shutdown(wait=False)
 
     return {
         "id": draft_info.get("note_id"),
@@ -1,11 +1,22 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Union
 
 from wordpress_client import WordpressClient
+from services.media_cache import cached_upload
+from services.wordpress_pool import WP_POOL
 
 logger = logging.getLogger(__name__)
 
+# Images uploaded in parallel for a single post.
+MEDIA_WORKERS = 4
+
+# Image data given to ``post_to_wordpress``: a file path, in-memory bytes or
+# a binary file object.
+MediaSource = Union[Path, bytes, bytearray, memoryview, BinaryIO]
+
 CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.json"
 
 if CONFIG_PATH.exists():
@@ -15,40 +26,48 @@ else:
     CONFIG = {}
 
 
+def resolve_account(account: str | None = None) -> str:
+    """Return the configured account name ``account`` stands for.
+
+    Without ``account`` this is ``default`` when configured, otherwise the
+    first configured account, as used by :func:`create_wp_client`.
+    """
+    if account:
+        return account
+    accounts = CONFIG.get("wordpress", {}).get("accounts") or {}
+    if "default" in accounts:
+        return "default"
+    return next(iter(accounts), "default")
+
+
 def create_wp_client(account: str | None = None) -> WordpressClient | None:
-    """Initialize a WordpressClient using the specified account."""
+    """Return an authenticated WordpressClient for the specified account.
+
+    Clients come from the shared :data:`WP_POOL`, so repeated calls for the
+    same account reuse the access token and HTTP session.
+    """
     wp_cfg = CONFIG.get("wordpress", {})
     accounts = wp_cfg.get("accounts") or {}
     if not accounts:
         print("No WordPress accounts configured")
         return None
 
-    acct = None
-    if account:
-        acct = accounts.get(account)
-        if not acct:
-            print(f"No WordPress account configured for {account}")
-            return None
-    elif "default" in accounts:
-        acct = accounts["default"]
-    else:
-        acct = next(iter(accounts.values()))
+    name = resolve_account(account)
+    if not accounts.get(name):
+        print(f"No WordPress account configured for {name}")
+        return None
+    acct = accounts[name]
 
     cfg = {"wordpress": {"accounts": {"default": acct}}}
 
     try:
-        client = WordpressClient(cfg)
-        client.authenticate()
-        return client
+        return WP_POOL.get(name, acct, client_cls=WordpressClient)
     except Exception as exc:
         print(f"Failed to init WordPress client: {exc}")
         print(f"CONFIG used for WordpressClient: {cfg}")
         return None
 
 
-WP_CLIENT = create_wp_client()
-
-
 def build_paid_block(
     plan_id: str | None,
     paid_title: str | None,
@@ -90,10 +109,105 @@ def generate_json_ld(title: str, content: str) -> dict:
     }
 
 
+def _describe(source: MediaSource) -> str:
+    if isinstance(source, Path):
+        return f"{source} ({source.stat().st_size} bytes)"
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{memoryview(source).nbytes} bytes>"
+    return f"<{getattr(source, 'name', 'stream')}>"
+
+
+def _media_exists(client, uploaded: dict) -> bool:
+    get_media = getattr(client, "get_media", None)
+    return get_media is None or bool(get_media(uploaded["id"]))
+
+
+def _upload_one(
+    client,
+    source: MediaSource,
+    filename: str,
+    alt: str | None,
+    account: str | None = None,
+) -> dict:
+    """Upload one image without copying in-memory data.
+
+    Paths are opened and handed to the client as file objects, so the
+    HTTP layer reads them directly. Content already uploaded for the
+    account is taken from the media cache instead.
+    """
+    label = _describe(source)
+
+    def upload() -> dict:
+        print(f"Uploading {label} as {filename}")
+        if isinstance(source, Path):
+            with source.open("rb") as fh:
+                return client.upload_media(fh, filename, alt=alt)
+        return client.upload_media(source, filename, alt=alt)
+
+    def validate(uploaded: dict) -> bool:
+        return uploaded.get("id") is not None and _media_exists(client, uploaded)
+
+    try:
+        uploaded = cached_upload("wordpress", account, source, upload, validate)
+        print(f"Uploaded {label} -> {uploaded}")
+    except Exception as exc:
+        print(f"Failed image {label}: {exc}")
+        raise
+    return uploaded
+
+
+def _alt_text(alt: str | None, uploaded: dict, filename: str) -> str:
+    return alt or uploaded.get("alt") or uploaded.get("title") or Path(filename).stem
+
+
+def _update_alt(client, media_id, alt_text: str) -> None:
+    try:
+        client.update_media_alt_text(media_id, alt_text)
+    except Exception as exc:
+        logger.warning("Failed to update alt text for media %s: %s", media_id, exc)
+
+
+def upload_images(
+    client,
+    items: list[tuple[MediaSource, str, str | None]],
+    account: str | None = None,
+) -> list[dict]:
+    """Upload ``(source, filename, alt)`` items concurrently.
+
+    Given alt texts are sent with the upload itself. Uploads whose response
+    does not echo the final alt text get concurrent ``update_media_alt_text``
+    calls instead. Results keep the order of ``items``, so the body HTML and
+    featured image are unchanged, and the first upload error is raised.
+    """
+    if not items:
+        return []
+    workers = max(1, min(MEDIA_WORKERS, len(items)))
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="wp-media"
+    ) as pool:
+        futures = [
+            pool.submit(_upload_one, client, source, filename, alt, account)
+            for source, filename, alt in items
+        ]
+        uploads = [future.result() for future in futures]
+
+        updates = []
+        for (_, filename, alt), uploaded in zip(items, uploads):
+            media_id = uploaded.get("id")
+            if media_id is None or not uploaded.get("url"):
+                continue
+            alt_text = _alt_text(alt, uploaded, filename)
+            if uploaded.get("alt") != alt_text:
+                updates.append(pool.submit(_update_alt, client, media_id, alt_text))
+        for future in updates:
+            future.result()
+    return uploads
+
+
 def post_to_wordpress(
     title: str,
     content: str,
-    images: list[tuple[Path, str, str | None]] | None = None,
+    images: list[tuple[MediaSource, str, str | None]] | None = None,
     account: str | None = None,
     paid_content: str | None = None,
     paid_title: str | None = None,
@@ -105,46 +219,42 @@ def post_to_wordpress(
     excerpt: str | None = None,
     json_ld: dict | None = None,
 ) -> dict:
-    """Create a WordPress post with optional images."""
-    client = WP_CLIENT if account is None else create_wp_client(account)
+    """Create a WordPress post with optional images.
+
+    Each image is ``(source, filename)`` or ``(source, filename, alt)``
+    where ``source`` is a file path, bytes-like object or binary file
+    object. In-memory sources are uploaded without temporary files.
+    """
+    client = create_wp_client(account)
+    # Media is cached under the account the client was resolved for.
+    account = resolve_account(account)
     if client is None:
-        print("WP_CLIENT is None")
+        print(f"No WordPress client for account {account}")
         return {"error": "WordPress client unavailable"}
 
     body = f"<p>{content}</p>"
     featured_id = None
     images = images or []
+    items = []
     for item in images:
         if len(item) == 3:
-            img_path, filename, alt = item
+            source, filename, alt = item
         else:
-            img_path, filename = item  # type: ignore[misc]
+            source, filename = item  # type: ignore[misc]
             alt = None
-        if not img_path.exists():
-            return {"error": f"Image file not found: {img_path}"}
-        try:
-            print(
-                f"Uploading {img_path} ({img_path.stat().st_size} bytes) as {filename}"
-            )
-            with img_path.open("rb") as fh:
-                uploaded = client.upload_media(fh.read(), filename)
-            print(f"Uploaded {img_path} -> {uploaded}")
-        except Exception as exc:
-            print(f"Failed image {img_path}: {exc}")
-            raise
+        if isinstance(source, Path) and not source.exists():
+            return {"error": f"Image file not found: {source}"}
+        items.append((source, filename, alt))
+
+    for (_, filename, alt), uploaded in zip(
+        items, upload_images(client, items, account)
+    ):
         url = uploaded.get("url")
         if not url:
-            print(f"No URL returned for {img_path}, skipping image tag")
+            print(f"No URL returned for {filename}, skipping image tag")
             continue
-        alt_text = alt or uploaded.get("alt") or uploaded.get("title") or Path(filename).stem
+        alt_text = _alt_text(alt, uploaded, filename)
         media_id = uploaded.get("id")
-        try:
-            if media_id is not None:
-                client.update_media_alt_text(media_id, alt_text)
-        except Exception as exc:
-            logger.warning(
-                "Failed to update alt text for media %s: %s", media_id, exc
-            )
         body += (
             f'<img src="{url}" alt="{alt_text}" '
             'style="max-width:100%;height:auto;" />'
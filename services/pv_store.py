@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class DailyViewsStore:
+    """SQLite cache of per-post daily view counts.
+
+    Rows are keyed by ``(site, post_id, day)``. Only closed days should be
+    stored, since their counts no longer change; today and yesterday are
+    always fetched from the API.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_views ("
+                " site TEXT NOT NULL,"
+                " post_id INTEGER NOT NULL,"
+                " day TEXT NOT NULL,"
+                " views INTEGER NOT NULL,"
+                " PRIMARY KEY (site, day, post_id)"
+                ") WITHOUT ROWID"
+            )
+
+    def get(self, site: str, day: str, post_ids: list[int]) -> dict[int, int]:
+        """Return stored counts for ``post_ids`` on ``day``.
+
+        Posts without a stored entry are omitted from the result.
+        """
+        if not post_ids:
+            return {}
+        marks = ",".join("?" * len(post_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT post_id, views FROM daily_views"
+                f" WHERE site = ? AND day = ? AND post_id IN ({marks})",
+                (site, day, *post_ids),
+            ).fetchall()
+        return dict(rows)
+
+    def put(self, site: str, day: str, views: dict[int, int]) -> None:
+        """Store ``{post_id: views}`` for ``day``, replacing existing rows."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_views (site, post_id, day, views)"
+                " VALUES (?, ?, ?, ?)",
+                [(site, pid, day, count) for pid, count in views.items()],
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
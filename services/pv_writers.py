@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+from abc import ABC, abstractmethod
+from array import array
+from datetime import date
+from pathlib import Path
+
+try:  # Parquet and Arrow output need the optional ``pyarrow`` package
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+
+
+class PvWriter(ABC):
+    """Base class for pv export writers.
+
+    Writers receive one chunk of posts at a time together with their view
+    counts as a flat array where the value for post ``r`` on day ``d`` is at
+    ``r * len(day_strs) + d``.
+    """
+
+    extension = ""
+
+    def __init__(self, path: Path, day_strs: list[str]):
+        self.path = path
+        self.day_strs = day_strs
+
+    @abstractmethod
+    def write_chunk(
+        self, account: str, site: str, posts: list[dict], counts: array
+    ) -> None:
+        """Write one chunk of posts with their view counts."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the output file."""
+
+    def _long_rows(self, account, site, posts, counts):
+        """Yield ``(account, site, post_id, title, day, views)`` tuples."""
+        days = len(self.day_strs)
+        for r, p in enumerate(posts):
+            for d, day_str in enumerate(self.day_strs):
+                views = counts[r * days + d]
+                yield account, site, p.get("id"), p.get("title"), day_str, views
+
+
+class CsvWriter(PvWriter):
+    """Wide CSV with one row per post and ``pv_day1..pv_dayN`` columns."""
+
+    extension = ".csv"
+
+    def __init__(self, path: Path, day_strs: list[str]):
+        super().__init__(path, day_strs)
+        self._fh = path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._fh)
+        header = ["account", "site", "post_id", "title"] + [
+            f"pv_day{i + 1}" for i in range(len(day_strs))
+        ]
+        self._writer.writerow(header)
+
+    def write_chunk(self, account, site, posts, counts):
+        days = len(self.day_strs)
+        for r, p in enumerate(posts):
+            row = [account, site, p.get("id"), p.get("title")]
+            row.extend(counts[r * days : (r + 1) * days])
+            self._writer.writerow(row)
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class NdjsonGzWriter(PvWriter):
+    """Gzip-compressed NDJSON in long form, one object per post and day."""
+
+    extension = ".ndjson.gz"
+
+    def __init__(self, path: Path, day_strs: list[str]):
+        super().__init__(path, day_strs)
+        self._fh = gzip.open(path, "wt", encoding="utf-8")
+
+    def write_chunk(self, account, site, posts, counts):
+        keys = ("account", "site", "post_id", "title", "day", "views")
+        for row in self._long_rows(account, site, posts, counts):
+            self._fh.write(json.dumps(dict(zip(keys, row)), ensure_ascii=False))
+            self._fh.write("\n")
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class _ArrowBase(PvWriter):
+    """Shared long-form record batch builder for Arrow based formats."""
+
+    def __init__(self, path: Path, day_strs: list[str]):
+        if pa is None:
+            raise RuntimeError(
+                f"pyarrow is required for {self.extension.lstrip('.')} output"
+            )
+        super().__init__(path, day_strs)
+        self.schema = pa.schema(
+            [
+                ("account", pa.string()),
+                ("site", pa.string()),
+                ("post_id", pa.int64()),
+                ("title", pa.string()),
+                ("day", pa.date32()),
+                ("views", pa.uint32()),
+            ]
+        )
+        self._days = [date.fromisoformat(d) for d in day_strs]
+
+    def _batch(self, account, site, posts, counts):
+        n_days = len(self._days)
+        n = len(posts) * n_days
+        return pa.record_batch(
+            [
+                pa.array([account] * n, pa.string()),
+                pa.array([site] * n, pa.string()),
+                pa.array(
+                    [p.get("id") for p in posts for _ in range(n_days)], pa.int64()
+                ),
+                pa.array(
+                    [p.get("title") for p in posts for _ in range(n_days)],
+                    pa.string(),
+                ),
+                pa.array(self._days * len(posts), pa.date32()),
+                pa.array(counts, pa.uint32()),
+            ],
+            schema=self.schema,
+        )
+
+
+class ParquetWriter(_ArrowBase):
+    """Parquet file in long form, one row group per chunk."""
+
+    extension = ".parquet"
+
+    def __init__(self, path: Path, day_strs: list[str]):
+        super().__init__(path, day_strs)
+        self._writer = pq.ParquetWriter(str(path), self.schema)
+
+    def write_chunk(self, account, site, posts, counts):
+        self._writer.write_batch(self._batch(account, site, posts, counts))
+
+    def close(self):
+        self._writer.close()
+
+
+class ArrowWriter(_ArrowBase):
+    """Arrow IPC file in long form, one record batch per chunk."""
+
+    extension = ".arrow"
+
+    def __init__(self, path: Path, day_strs: list[str]):
+        super().__init__(path, day_strs)
+        self._sink = pa.OSFile(str(path), "wb")
+        self._writer = pa_ipc.new_file(self._sink, self.schema)
+
+    def write_chunk(self, account, site, posts, counts):
+        self._writer.write_batch(self._batch(account, site, posts, counts))
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+WRITERS: dict[str, type[PvWriter]] = {
+    "csv": CsvWriter,
+    "ndjson": NdjsonGzWriter,
+    "parquet": ParquetWriter,
+    "arrow": ArrowWriter,
+}
+
+
+def get_writer(fmt: str) -> type[PvWriter]:
+    """Return the writer class registered for ``fmt``."""
+    try:
+        return WRITERS[fmt]
+    except KeyError:
+        raise ValueError(
+            f"Unknown format {fmt!r}; expected one of {', '.join(WRITERS)}"
+        ) from None
@@ -0,0 +1,79 @@
+import threading
+
+from wordpress_client import WordpressClient
+
+
+class WordpressClientPool:
+    """Process-wide cache of authenticated WordPress clients.
+
+    Clients are keyed by account name and remember the configuration they
+    were built from. Repeated lookups return the same client, reusing its
+    access token and keep-alive ``requests.Session``; a changed account
+    configuration replaces the cached client. Token refresh happens lazily
+    inside :class:`WordpressClient` on expiry or ``401``.
+    """
+
+    def __init__(self):
+        self.clients: dict[str, WordpressClient] = {}
+        self._sources: dict[str, tuple[type, dict]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, name: str, account_cfg: dict, client_cls: type = WordpressClient
+    ) -> WordpressClient:
+        """Return an authenticated client for ``name``.
+
+        Parameters
+        ----------
+        name: str
+            Account identifier from ``config.json``.
+        account_cfg: dict
+            Account section used to build the client on a cache miss.
+        client_cls: type
+            Client class to instantiate. Cached clients built from another
+            class are replaced.
+
+        Raises
+        ------
+        Exception
+            Any error raised while authenticating a new client. Failed
+            clients are not cached.
+        """
+        source = (client_cls, dict(account_cfg))
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            client = self.clients.get(name)
+            if client is not None and self._sources.get(name) == source:
+                with self._lock:
+                    self.hits += 1
+                return client
+            with self._lock:
+                self.misses += 1
+            cfg = {"wordpress": {"accounts": {"default": account_cfg}}}
+            client = client_cls(cfg)
+            client.authenticate()
+            self.clients[name] = client
+            self._sources[name] = source
+            return client
+
+    def invalidate(self, name: str) -> None:
+        """Drop the cached client for ``name`` if present."""
+        with self._lock:
+            self.clients.pop(name, None)
+            self._sources.pop(name, None)
+
+    def stats(self) -> dict:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self.clients),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+WP_POOL = WordpressClientPool()
@@ -1,9 +1,10 @@
-from services.post_to_wordpress import create_wp_client, WP_CLIENT
+from bulk_delete import bulk_delete
+from services.post_to_wordpress import create_wp_client
 
 
 def list_posts(account: str | None, page: int, number: int) -> dict:
     """Retrieve posts from WordPress."""
-    client = WP_CLIENT if account is None else create_wp_client(account)
+    client = create_wp_client(account)
     if client is None:
         return {"error": "WordPress client unavailable"}
     try:
@@ -15,17 +16,14 @@ def list_posts(account: str | None, page: int, number: int) -> dict:
 
 def delete_posts(account: str | None, ids: list[int]) -> dict:
     """Delete multiple WordPress posts and report successes and failures."""
-    client = WP_CLIENT if account is None else create_wp_client(account)
+    client = create_wp_client(account)
     if client is None:
         return {"error": "WordPress client unavailable"}
 
-    deleted: list[int] = []
-    errors: dict[str, str] = {}
-    for pid in ids:
-        try:
-            deleted_id = client.delete_post(pid)
-            deleted.append(deleted_id)
-        except Exception as exc:
-            errors[str(pid)] = str(exc)
-
-    return {"deleted": deleted, "errors": errors}
+    result = bulk_delete(
+        client.delete_post,
+        ids,
+        site=getattr(client, "site", None),
+        name=f"{account or 'default'}:posts",
+    )
+    return {"deleted": result.results, "errors": result.errors}
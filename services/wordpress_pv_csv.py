@@ -1,16 +1,157 @@
 from __future__ import annotations
 
-import csv
+import queue
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta, datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
+from rate_limit import TokenBucket
 from services.post_to_wordpress import create_wp_client
+from services.pv_store import DailyViewsStore
+from services.pv_writers import get_writer
+from wordpress_client import iter_post_pages
 
+# Maximum post IDs per ``stats/views/posts`` request; also the chunk size.
+BATCH_SIZE = 100
+# Default file name of the local daily-views store inside ``out_dir``.
+STORE_NAME = "pv_views.sqlite3"
+# Resolved chunks buffered per account before its producer waits.
+QUEUE_CHUNKS = 4
 
-def export_views(accounts: dict, days: int, out_dir: Path) -> Dict[str, Any]:
+_END = object()
+
+
+def _iter_post_pages(client) -> Iterator[list[dict]]:
+    """Yield the client's posts one page of ``BATCH_SIZE`` at a time.
+
+    Pages after the first are fetched a few at a time ahead of the consumer
+    and yielded in page order; a failing page ends the listing.
+    """
+    try:
+        yield from iter_post_pages(client, number=BATCH_SIZE)
+    except Exception:  # pragma: no cover - network errors
+        return
+
+
+def _fetch_views(
+    client,
+    batch: list[int],
+    day_str: str,
+    store: DailyViewsStore | None = None,
+    limiter: TokenBucket | None = None,
+) -> dict[int, int]:
+    """Fetch one batch of views, saving it to ``store`` when given.
+
+    ``limiter`` paces the request; a batch is never larger than one request.
+    Stored batches include explicit zeros for posts the API omitted, so a
+    closed day is never requested twice.
+    """
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        views = client.get_daily_views(batch, day_str)
+    except Exception:  # pragma: no cover - network errors
+        return {}
+    if store is not None:
+        store.put(client.site, day_str, {pid: views.get(pid, 0) for pid in batch})
+    return views
+
+
+def _resolve_chunk(
+    client,
+    posts: list[dict],
+    day_strs: list[str],
+    requests_pool: ThreadPoolExecutor,
+    store: DailyViewsStore | None,
+    closed_from: int,
+    limiter: TokenBucket | None = None,
+) -> array:
+    """Return the views of ``posts`` as a flat ``array('I')``.
+
+    The value for post ``r`` on day ``d`` is at ``r * len(day_strs) + d``.
+    Each day is one request, and all days are fetched concurrently. Days at
+    index ``closed_from`` or later are served from ``store`` where possible.
+    """
+    days = len(day_strs)
+    post_ids = [p["id"] for p in posts]
+    row_of = {pid: r for r, pid in enumerate(post_ids)}
+    counts = array("I", bytes(4 * days * len(post_ids)))
+    futures = []
+    for idx, day_str in enumerate(day_strs):
+        missing = post_ids
+        day_store = None
+        if store is not None and idx >= closed_from:
+            day_store = store
+            cached = store.get(client.site, day_str, post_ids)
+            for pid, count in cached.items():
+                counts[row_of[pid] * days + idx] = count
+            missing = [pid for pid in post_ids if pid not in cached]
+        if missing:
+            futures.append(
+                (
+                    idx,
+                    requests_pool.submit(
+                        _fetch_views, client, missing, day_str, day_store, limiter
+                    ),
+                )
+            )
+    for idx, future in futures:
+        for pid, count in future.result().items():
+            row = row_of.get(pid)
+            if row is not None:
+                counts[row * days + idx] = count
+    return counts
+
+
+def _produce_account(
+    account: str,
+    day_strs: list[str],
+    requests_pool: ThreadPoolExecutor,
+    requests_per_second: float,
+    store: DailyViewsStore | None,
+    chunks: queue.Queue,
+    closed_from: int = 2,
+) -> None:
+    """Resolve an account page by page and put ``(site, posts, counts)`` chunks.
+
+    A token bucket owned by this export paces the site's view requests; the
+    pooled client itself is left untouched. The bounded
+    ``chunks`` queue applies backpressure so at most ``QUEUE_CHUNKS`` chunks
+    wait for the writer. ``_END`` is always put last.
+    """
+    try:
+        client = create_wp_client(account)
+        if client is None:
+            return
+        limiter = TokenBucket(requests_per_second)
+        for posts in _iter_post_pages(client):
+            counts = _resolve_chunk(
+                client, posts, day_strs, requests_pool, store, closed_from, limiter
+            )
+            chunks.put((client.site, posts, counts))
+    finally:
+        chunks.put(_END)
+
+
+def export_views(
+    accounts: dict,
+    days: int,
+    out_dir: Path,
+    max_accounts: int = 4,
+    max_requests: int = 8,
+    requests_per_second: float = 5.0,
+    incremental: bool = True,
+    store_path: Path | None = None,
+    fmt: str = "csv",
+) -> Dict[str, Any]:
     """Export per-post view counts for multiple WordPress accounts.
 
+    Rows are streamed: each page of posts is written as soon as all of its
+    days are resolved, so memory stays bounded by the number of pages in
+    flight rather than the number of posts.
+
     Parameters
     ----------
     accounts: dict
@@ -19,14 +160,30 @@ def export_views(accounts: dict, days: int, out_dir: Path) -> Dict[str, Any]:
     days: int
         Number of most recent days to include in the CSV output.
     out_dir: Path
-        Destination directory for the generated CSV file.
+        Destination directory for the generated file.
+    max_accounts: int
+        Number of accounts fetched in parallel.
+    max_requests: int
+        Number of stats requests in flight across all accounts.
+    requests_per_second: float
+        Per-site request rate enforced by a token bucket.
+    incremental: bool
+        When ``True`` views of closed days (before yesterday) are kept in a
+        local :class:`DailyViewsStore` and only fetched once.
+    store_path: Path | None
+        Location of the store. Defaults to ``out_dir / "pv_views.sqlite3"``.
+    fmt: str
+        Output format: ``"csv"`` (wide, one row per post), or the long
+        ``(site, post_id, day, views)`` forms ``"ndjson"`` (gzip),
+        ``"parquet"`` and ``"arrow"``. The latter two need ``pyarrow``.
 
     Returns
     -------
     dict
-        Mapping containing the path to the generated CSV file.
+        Mapping containing the path to the generated file.
     """
 
+    writer_cls = get_writer(fmt)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Precompute the list of days in descending order (most recent first)
@@ -36,51 +193,50 @@ def export_views(accounts: dict, days: int, out_dir: Path) -> Dict[str, Any]:
     ]
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_path = out_dir / f"pv_{timestamp}.csv"
-    with csv_path.open("w", newline="", encoding="utf-8") as fh:
-        writer = csv.writer(fh)
-        header = ["account", "site", "post_id", "title"] + [
-            f"pv_day{i + 1}" for i in range(days)
-        ]
-        writer.writerow(header)
-
-        for account in accounts.keys():
-            client = create_wp_client(account)
-            if client is None:
-                continue
-
-            posts: list[dict] = []
-            page = 1
-            while True:
-                try:
-                    items = client.list_posts(page=page, number=100)
-                except Exception:  # pragma: no cover - network errors
-                    items = []
-                if not items:
-                    break
-                posts.extend(items)
-                if len(items) < 100:
-                    break
-                page += 1
-
-            if not posts:
-                continue
-
-            post_ids = [p["id"] for p in posts]
-            views: dict[int, list[int]] = {pid: [0] * days for pid in post_ids}
-
-            for idx, day_str in enumerate(day_strs):
-                try:
-                    daily = client.get_daily_views(post_ids, day_str)
-                except Exception:  # pragma: no cover - network errors
-                    daily = {}
-                for pid, count in daily.items():
-                    if pid in views:
-                        views[pid][idx] = count
-
-            for p in posts:
-                row = [account, client.site, p.get("id"), p.get("title")]
-                row.extend(views.get(p.get("id"), [0] * days))
-                writer.writerow(row)
-
-    return {"file": str(csv_path)}
+    out_path = out_dir / f"pv_{timestamp}{writer_cls.extension}"
+    writer = writer_cls(out_path, day_strs)
+
+    store = None
+    try:
+        if incremental:
+            store = DailyViewsStore(store_path or out_dir / STORE_NAME)
+        with ThreadPoolExecutor(
+            max_workers=max_requests, thread_name_prefix="pv-request"
+        ) as requests_pool, ThreadPoolExecutor(
+            max_workers=max_accounts, thread_name_prefix="pv-account"
+        ) as accounts_pool:
+            producers = []
+            for account in accounts.keys():
+                chunks: queue.Queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+                future = accounts_pool.submit(
+                    _produce_account,
+                    account,
+                    day_strs,
+                    requests_pool,
+                    requests_per_second,
+                    store,
+                    chunks,
+                )
+                producers.append((account, chunks, future))
+
+            # Accounts are drained in order, keeping rows grouped by account.
+            try:
+                for account, chunks, future in producers:
+                    while (item := chunks.get()) is not _END:
+                        site, posts, counts = item
+                        writer.write_chunk(account, site, posts, counts)
+                    future.result()
+            except BaseException:
+                # Unblock producers waiting on full queues before shutdown.
+                for _, chunks, future in producers:
+                    while not future.done() or not chunks.empty():
+                        try:
+                            chunks.get(timeout=0.1)
+                        except queue.Empty:
+                            pass
+                raise
+    finally:
+        writer.close()
+        if store is not None:
+            store.close()
+    return {"file": str(out_path)}
@@ -1,9 +1,9 @@
-from services.post_to_wordpress import create_wp_client, WP_CLIENT
+from services.post_to_wordpress import create_wp_client
 
 
 def get_post_views(account: str | None, post_id: int, days: int) -> dict:
     """Fetch view statistics for a WordPress post."""
-    client = WP_CLIENT if account is None else create_wp_client(account)
+    client = create_wp_client(account)
     if client is None:
         return {"error": "WordPress client unavailable"}
     try:
@@ -18,7 +18,7 @@ def get_post_views(account: str | None, post_id: int, days: int) -> dict:
 
 def get_search_terms(account: str | None, days: int) -> dict:
     """Fetch search terms and view counts for a WordPress site."""
-    client = WP_CLIENT if account is None else create_wp_client(account)
+    client = create_wp_client(account)
     if client is None:
         return {"error": "WordPress client unavailable"}
     try:
@@ -0,0 +1,93 @@
+import base64
+import json
+import logging
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from services.access_log import AccessLog, AccessLogMiddleware, redact_preview
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    def emit(self, record):
+        self.entries.append(json.loads(record.getMessage()))
+
+
+def _app(config):
+    handler = ListHandler()
+    log = AccessLog(config, handler=handler)
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware, access_log=log)
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        body = await request.body()
+        return {"size": len(body)}
+
+    @app.post("/ignore")
+    async def ignore():
+        return {"ok": True}
+
+    @app.get("/fail")
+    async def fail():
+        return {"x": 1}
+
+    return TestClient(app), log, handler
+
+
+def test_access_log_records_structured_entries():
+    client, log, handler = _app({"preview_bytes": 40})
+    blob = base64.b64encode(b"x" * 300).decode()
+    payload = {"account": "a", "password": "hunter2", "media": [blob]}
+    resp = client.post("/echo", json=payload)
+    assert resp.status_code == 200
+    client.post("/ignore", content=b"y" * 5000, headers={"content-type": "image/png"})
+    log.close()
+
+    first, second = handler.entries
+    body_len = int(resp.request.headers["content-length"])
+    assert first["method"] == "POST" and first["path"] == "/echo"
+    assert first["status"] == 200
+    assert first["body_bytes"] == body_len
+    assert first["latency_ms"] >= 0
+    assert first["truncated"] is True
+    assert "hunter2" not in first["preview"]
+    assert len(first["preview"]) <= 60
+    # Binary bodies are measured but never previewed.
+    assert second["body_bytes"] == 5000
+    assert "preview" not in second
+
+
+def test_access_log_sampling_keeps_errors():
+    client, log, handler = _app({"sample_rate": 0})
+    client.post("/echo", json={})
+    client.get("/missing")
+    log.close()
+    assert [e["status"] for e in handler.entries] == [404]
+
+
+def test_redact_preview():
+    text = '{"client_secret": "abc", "media": ["' + "A" * 80 + '"], "title": "t"}'
+    redacted = redact_preview(text)
+    assert "abc" not in redacted and "A" * 80 not in redacted
+    assert '"title": "t"' in redacted
+    assert redact_preview("Q" * 70) == "[70 chars]"
+    form = "username=me&password=hunter2&access_token=xyz&title=hi"
+    assert redact_preview(form) == (
+        "username=me&password=[redacted]&access_token=[redacted]&title=hi"
+    )
+    # ``token`` must not match the end of another key.
+    assert redact_preview("csrftoken=keep") == "csrftoken=keep"
+
+
+def test_access_log_close_is_idempotent():
+    log = AccessLog({}, handler=logging.NullHandler())
+    log.close()
+    log.close()
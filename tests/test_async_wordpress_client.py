@@ -0,0 +1,201 @@
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from async_wordpress_client import AsyncWordpressClient, close_shared_http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the WordPress.com REST API."""
+
+    def log_message(self, *args):  # silence test output
+        pass
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _record(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = urlparse(self.path)
+        self.server.calls.append(
+            {
+                "method": self.command,
+                "path": url.path,
+                "query": parse_qs(url.query),
+                "auth": self.headers.get("Authorization"),
+                "body": body,
+            }
+        )
+        return url
+
+    def do_POST(self):
+        url = self._record()
+        if url.path == "/oauth2/token":
+            self.server.tokens += 1
+            return self._reply(200, {"access_token": f"tok{self.server.tokens}"})
+        if self.headers.get("Authorization") in self.server.revoked:
+            return self._reply(401, {"error": "invalid_token"})
+        if url.path.endswith("/media/new"):
+            return self._reply(200, {"media": [{"id": 5, "URL": "http://img"}]})
+        if url.path.endswith("/posts/new"):
+            return self._reply(200, {"ID": 7, "URL": "http://post"})
+        if url.path.endswith("/delete"):
+            return self._reply(200, {})
+        return self._reply(404, {})
+
+    def do_GET(self):
+        url = self._record()
+        query = parse_qs(url.query)
+        if url.path.endswith("/stats/views/posts"):
+            ids = query["post_ids"][0].split(",")
+            return self._reply(200, {"views": {pid: int(pid) * 2 for pid in ids}})
+        if url.path.endswith("/posts"):
+            return self._reply(
+                200,
+                {"posts": [{"ID": 1, "title": "T", "date": "d", "URL": "u"}]},
+            )
+        if url.path.endswith("/stats/search-terms"):
+            return self._reply(200, {"search_terms": [["foo", 3]]})
+        return self._reply(404, {})
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.calls = []
+    server.tokens = 0
+    server.revoked = set()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _make_client(server):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    client = AsyncWordpressClient({"wordpress": {"site": "mysite"}})
+    client.TOKEN_URL = f"{base}/oauth2/token"
+    client.API_BASE = f"{base}/sites/{{site}}"
+    return client
+
+
+def test_authenticate_and_basic_calls(stub_server):
+    client = _make_client(stub_server)
+
+    async def main():
+        await client.authenticate()
+        posts = await client.list_posts(page=2, number=5)
+        media = await client.upload_media(b"data", "a.png")
+        post = await client.create_post("T", "<p>x</p>", featured_id=5)
+        terms = await client.get_search_terms(7)
+        deleted = await client.delete_post(3, permanent=True)
+        await close_shared_http_client()
+        return posts, media, post, terms, deleted
+
+    posts, media, post, terms, deleted = asyncio.run(main())
+    assert posts == [{"id": 1, "title": "T", "date": "d", "url": "u"}]
+    assert media == {"id": 5, "url": "http://img"}
+    assert post == {"id": 7, "link": "http://post"}
+    assert terms == [{"term": "foo", "views": 3}]
+    assert deleted == 3
+    calls = stub_server.calls
+    assert calls[1]["query"] == {"page": ["2"], "number": ["5"]}
+    assert all(c["auth"] == "Bearer tok1" for c in calls[1:])
+    assert calls[-1]["query"] == {"force": ["1"]}
+
+
+def test_get_daily_views_fetches_batches_concurrently(stub_server):
+    client = _make_client(stub_server)
+
+    async def main():
+        return await client.get_daily_views(list(range(1, 251)), "2024-01-01")
+
+    views = asyncio.run(main())
+    assert len(views) == 250
+    assert views[250] == 500
+    batch_calls = [c for c in stub_server.calls if c["path"].endswith("/stats/views/posts")]
+    assert len(batch_calls) == 3
+    assert all(c["query"]["day"] == ["2024-01-01"] for c in batch_calls)
+
+
+def test_reauthenticates_on_401(stub_server):
+    client = _make_client(stub_server)
+
+    async def main():
+        await client.authenticate()
+        stub_server.revoked.add("Bearer tok1")
+        return await client.create_post("T", "B")
+
+    assert asyncio.run(main()) == {"id": 7, "link": "http://post"}
+    assert client.access_token == "tok2"
+
+
+def test_errors_raise_runtime_error(stub_server):
+    client = _make_client(stub_server)
+
+    async def main():
+        await client.get_post_views(1, 3)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+
+
+def test_deletes_are_retried_as_idempotent(stub_server):
+    client = _make_client(stub_server)
+    seen = []
+
+    class Governor:
+        async def arequest(self, send, url, method="GET", idempotent=None):
+            seen.append((method, url.rsplit("/", 2)[-2], idempotent))
+            return await send()
+
+    client.governor = Governor()
+
+    async def main():
+        await client.delete_post(3, permanent=True)
+        await client.delete_media(4)
+        await client.create_post("T", "B")
+
+    asyncio.run(main())
+    assert seen == [("POST", "3", True), ("POST", "4", True), ("POST", "posts", None)]
+
+
+def test_empty_trash_limits_concurrent_deletes(monkeypatch):
+    import async_wordpress_client
+
+    monkeypatch.setattr(async_wordpress_client.bulk_delete, "MAX_WORKERS", 3)
+    client = AsyncWordpressClient({"wordpress": {"site": "mysite"}})
+    pages = [[{"id": i} for i in range(100)], [{"id": 100}]]
+    running = peak = 0
+
+    async def list_posts(page=1, number=10, status=None, fields=None):
+        return pages.pop(0) if pages else []
+
+    async def delete_post(post_id, permanent=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return post_id
+
+    monkeypatch.setattr(client, "list_posts", list_posts)
+    monkeypatch.setattr(client, "delete_post", delete_post)
+    assert asyncio.run(client.empty_trash()) == list(range(101))
+    assert peak == 3
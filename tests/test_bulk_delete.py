@@ -0,0 +1,83 @@
+import sys
+import threading
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import bulk_delete
+
+
+def test_bulk_delete_keeps_input_order_and_errors():
+    def delete(pid):
+        if pid == 3:
+            raise RuntimeError("nope")
+        return pid * 10
+
+    res = bulk_delete.bulk_delete(delete, [5, 3, 1, 4])
+    assert res.deleted == [5, 1, 4]
+    assert res.results == [50, 10, 40]
+    assert res.errors == {"3": "nope"}
+
+
+def test_wordpress_deletes_are_retried_once_by_the_governor(monkeypatch):
+    import governor
+    import wordpress_client
+
+    monkeypatch.setattr(
+        governor, "GOVERNOR", governor.Governor(max_retries=2, sleep=lambda s: None)
+    )
+    client = wordpress_client.WordpressClient({"wordpress": {"site": "s"}})
+    attempts = {}
+
+    def fake_post(url, **kwargs):
+        pid = int(url.split("/")[-2])
+        attempts[pid] = attempts.get(pid, 0) + 1
+        resp = requests.Response()
+        resp.status_code = {1: 503 if attempts[pid] < 3 else 200, 2: 404, 3: 429}[pid]
+        return resp
+
+    monkeypatch.setattr(client.session, "post", fake_post)
+    res = bulk_delete.bulk_delete(client.delete_post, [1, 2, 3])
+    assert res.deleted == [1]
+    assert set(res.errors) == {"2", "3"}
+    # One retry layer: the first attempt plus the governor's two retries.
+    assert attempts == {1: 3, 2: 1, 3: 3}
+
+
+def test_bulk_delete_runs_concurrently_and_reports_progress():
+    n = 4
+    barrier = threading.Barrier(n, timeout=5)
+    seen = []
+
+    def delete(pid):
+        barrier.wait()
+        seen.append(bulk_delete.stats()["active"])
+        return pid
+
+    res = bulk_delete.bulk_delete(delete, range(n), name="acc:posts", max_workers=n)
+    assert res.deleted == list(range(n))
+    snap = seen[0][0]
+    assert snap["name"] == "acc:posts"
+    assert snap["total"] == n
+    assert bulk_delete.stats() == {"active": []}
+
+
+def test_bulk_delete_paces_each_site_with_its_own_bucket(monkeypatch):
+    monkeypatch.setattr(bulk_delete, "_SITE_LIMITERS", {})
+    acquired = []
+
+    class Bucket:
+        def __init__(self, rate):
+            self.rate = rate
+
+        def acquire(self):
+            acquired.append(self)
+
+    monkeypatch.setattr(bulk_delete, "TokenBucket", Bucket)
+    bulk_delete.bulk_delete(lambda pid: pid, [1, 2], site="a")
+    bulk_delete.bulk_delete(lambda pid: pid, [3], site="b")
+    bulk_delete.bulk_delete(lambda pid: pid, [4], site="a")
+    a, b = bulk_delete.site_limiter("a"), bulk_delete.site_limiter("b")
+    assert a is not b and a.rate == bulk_delete.REQUESTS_PER_SECOND
+    assert [bucket is a for bucket in acquired] == [True, True, False, True]
@@ -50,15 +50,19 @@ def test_cleanup_service(monkeypatch):
     assert result["account"] == "acc"
     assert result["deleted_posts"] == [1, 2]
     assert result["deleted_media"] == 2
+    assert sorted(dummy.deleted_media) == [10, 11]
 
 
-def test_cleanup_endpoint(monkeypatch):
+def test_cleanup_endpoint(monkeypatch, tmp_path):
     called: list[tuple[str, int]] = []
 
-    def fake_task(identifier: str, keep_latest: int) -> None:
+    def fake_task(identifier: str, keep_latest: int) -> dict:
         called.append((identifier, keep_latest))
+        return {"account": identifier, "deleted_posts": [keep_latest]}
 
-    monkeypatch.setattr(server, "_run_cleanup", fake_task)
+    jobs = server.create_job_queue({"path": str(tmp_path / "jobs.sqlite3")})
+    jobs.register("wordpress_cleanup", fake_task)
+    monkeypatch.setattr(server, "JOBS", jobs)
     app = TestClient(server.app)
     resp = app.post(
         "/wordpress/cleanup",
@@ -70,6 +74,19 @@ def test_cleanup_endpoint(monkeypatch):
         },
     )
     assert resp.status_code == 200
-    assert resp.json() == {"status": "accepted"}
-    # Background tasks run after response in TestClient
-    assert called == [("a1", 1), ("a2", 2)]
+    body = resp.json()
+    assert body["status"] == "accepted"
+    assert len(body["jobs"]) == 2
+    for job_id in body["jobs"]:
+        assert jobs.wait(job_id, timeout=5)["status"] == "succeeded"
+    assert sorted(called) == [("a1", 1), ("a2", 2)]
+
+    job = app.get(f"/jobs/{body['jobs'][1]}").json()
+    assert job["kind"] == "wordpress_cleanup"
+    assert job["params"] == {"identifier": "a2", "keep_latest": 2}
+    assert job["result"] == {"account": "a2", "deleted_posts": [2]}
+    assert app.get("/jobs/missing").json() == {
+        "id": "missing",
+        "error": "Job not found",
+    }
+    jobs.stop()
@@ -0,0 +1,94 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import server
+from services.client_registry import ClientRegistry
+
+
+def test_registry_is_lazy_and_caches_clients():
+    calls = []
+
+    def factory(name, info):
+        calls.append(name)
+        return {"name": name, **info}
+
+    reg = ClientRegistry("demo", factory, {"a": {"x": 1}, "b": {}})
+    assert calls == []
+    assert reg.status() == {"a": {"state": "pending"}, "b": {"state": "pending"}}
+    assert reg.get("a") == {"name": "a", "x": 1}
+    assert reg.get("a") is reg["a"]
+    assert calls == ["a"]
+    assert reg.get("missing") is None
+    assert "b" in reg and "missing" not in reg
+    assert reg.status()["a"]["state"] == "ready"
+    assert not reg.ready()
+
+
+def test_warm_up_runs_concurrently_and_times_out_hung_accounts():
+    barrier = threading.Barrier(3, timeout=5)
+    release = threading.Event()
+
+    def factory(name, info):
+        if name == "hung":
+            release.wait(5)
+            return "late"
+        barrier.wait()
+        if name == "bad":
+            raise RuntimeError("login failed")
+        return name
+
+    reg = ClientRegistry(
+        "demo", factory, {"ok": {}, "bad": {}, "hung": {}, "x": {}}, timeout=0.2
+    )
+    start = time.monotonic()
+    reg.warm_up()
+    assert time.monotonic() - start < 1
+    assert reg.get("ok") == "ok"
+    assert reg.get("x") == "x"
+    assert reg.get("bad") is None
+    assert reg.error("bad") == "login failed"
+    assert reg.get("hung") is None
+    status = reg.status()
+    assert status["bad"]["state"] == "failed"
+    assert status["hung"] == {"state": "initializing", "error": "timed out after 0.2s"}
+    release.set()
+    reg.shutdown()
+
+
+def test_ready_endpoint_and_unavailable_error(monkeypatch):
+    def factory(name, info):
+        raise RuntimeError("bad token")
+
+    reg = ClientRegistry("mastodon", factory, {"acc": {}})
+    monkeypatch.setattr(server, "MASTODON_CLIENTS", reg)
+    monkeypatch.setattr(server, "MASTODON_ACCOUNT_ERRORS", {})
+    assert server.post_to_mastodon("acc", "hi") == {
+        "error": "Account unavailable: bad token"
+    }
+    resp = TestClient(server.app).get("/ready")
+    body = resp.json()
+    assert body["ready"] is False
+    assert body["platforms"]["mastodon"]["acc"]["state"] == "failed"
+
+
+def test_failed_accounts_retry_after_cooldown():
+    attempts = []
+
+    def factory(name, info):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise RuntimeError("flaky")
+        return "client"
+
+    reg = ClientRegistry("demo", factory, {"a": {}}, retry_after=0.05)
+    assert reg.get("a") is None
+    assert reg.get("a") is None
+    assert attempts == ["a"]
+    time.sleep(0.06)
+    assert reg.get("a") == "client"
+    assert reg.status()["a"]["state"] == "ready"
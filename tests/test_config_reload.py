@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import server
+import services.cleanup_wordpress_posts as cleanup_service
+import services.post_to_note as note_service
+import services.post_to_wordpress as wordpress_service
+from services.client_registry import ClientRegistry
+from services.config_watch import ConfigWatcher
+
+
+def _wp(url):
+    return {
+        "site": url,
+        "client_id": "id",
+        "client_secret": "secret",
+        "username": "u",
+        "password": "p",
+    }
+
+
+def test_registry_update_keeps_unchanged_clients():
+    calls = []
+
+    def factory(name, info):
+        calls.append(name)
+        return dict(info)
+
+    reg = ClientRegistry("demo", factory, {"a": {"x": 1}, "b": {"x": 2}})
+    client_a = reg.get("a")
+    reg.get("b")
+
+    diff = reg.update({"a": {"x": 1}, "b": {"x": 3}, "c": {"x": 4}})
+    assert diff == {"added": ["c"], "changed": ["b"], "removed": []}
+    assert reg.get("a") is client_a
+    assert reg.status()["b"] == {"state": "pending"}
+    assert reg.get("b") == {"x": 3}
+
+    diff = reg.update({"b": {"x": 3}})
+    assert diff == {"added": [], "changed": [], "removed": ["a", "c"]}
+    assert reg.get("a") is None
+    assert set(reg.status()) == {"b"}
+    assert calls == ["a", "b", "b"]
+
+
+def test_reload_endpoint_rebuilds_only_changed_accounts(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    config = {"wordpress": {"accounts": {"a": _wp("https://a"), "b": _wp("https://b")}}}
+    path.write_text(json.dumps(config))
+    monkeypatch.setattr(server, "CONFIG_PATH", path)
+    monkeypatch.setattr(server, "CONFIG", config)
+    for module in (wordpress_service, note_service, cleanup_service):
+        monkeypatch.setattr(module, "CONFIG", module.CONFIG)
+    for name in ("MASTODON", "NOTE", "TWITTER", "WORDPRESS"):
+        monkeypatch.setattr(server, f"{name}_ACCOUNT_ERRORS", {})
+        monkeypatch.setattr(
+            server, f"{name}_CLIENTS", ClientRegistry(name.lower(), lambda n, i: i)
+        )
+    invalidated = []
+    monkeypatch.setattr(server.WP_POOL, "invalidate", invalidated.append)
+    reg = ClientRegistry(
+        "wordpress", lambda n, i: dict(i), config["wordpress"]["accounts"]
+    )
+    monkeypatch.setattr(server, "WORDPRESS_CLIENTS", reg)
+    client_a = reg.get("a")
+
+    config = {
+        "wordpress": {"accounts": {"a": _wp("https://a"), "b": _wp("https://b2")}},
+        "clients": {"warm_up": False},
+    }
+    path.write_text(json.dumps(config))
+    resp = TestClient(server.app).post("/admin/reload")
+    data = resp.json()
+    assert data["reloaded"] is True
+    assert data["platforms"]["wordpress"] == {
+        "added": [],
+        "changed": ["b"],
+        "removed": [],
+    }
+    assert invalidated == ["b"]
+    assert server.CONFIG == config
+    assert wordpress_service.CONFIG == config
+    assert cleanup_service.CONFIG == config
+    assert reg.get("a") is client_a
+    assert reg.get("b")["site"] == "https://b2"
+
+    path.write_text("{not json")
+    resp = TestClient(server.app).post("/admin/reload")
+    assert resp.json()["error"].startswith("Invalid config")
+    assert server.CONFIG == config
+
+    path.unlink()
+    resp = TestClient(server.app).post("/admin/reload")
+    assert resp.json()["error"].startswith("Config file not found")
+    assert server.CONFIG == config
+    assert reg.get("a") is client_a
+
+
+def test_config_watcher_detects_changes(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    calls = []
+    watcher = ConfigWatcher(path, lambda: calls.append(1), interval=60)
+    assert watcher.check() is False
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert watcher.check() is True
+    assert watcher.check() is False
+
+    # A file briefly missing during a save is not a change.
+    path.unlink()
+    assert watcher.check() is False
+    path.write_text("{}")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+    assert watcher.check() is True
+    assert calls == [1, 1]
@@ -0,0 +1,106 @@
+import base64
+import sys
+import threading
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import server
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"pixels"
+
+
+def _b64(data):
+    return base64.b64encode(data).decode()
+
+
+def test_post_without_targets_only_acknowledges():
+    resp = TestClient(server.app).post("/post", json={"text": "hi", "media": ["a"]})
+    assert resp.json() == {"received": True, "media_items": 1}
+
+
+def test_post_fans_out_concurrently(monkeypatch):
+    barrier = threading.Barrier(4, timeout=5)
+    calls = {}
+
+    def fake_mastodon(account, text, media=None, files=None):
+        barrier.wait()
+        calls["mastodon"] = [(fh.read(), mime) for fh, mime in files]
+        return {"id": "m1", "link": "http://toot", "site": "mastodon"}
+
+    def fake_twitter(account, text, media=None, files=None):
+        barrier.wait()
+        calls["twitter"] = [(fh.read(), name) for fh, name in files]
+        return {"id": "t1", "link": None, "site": "twitter"}
+
+    def fake_wordpress(account, title, content, files=None, **kwargs):
+        barrier.wait()
+        calls["wordpress"] = (title, [(fh.read(), name) for fh, name, _ in files])
+        return {"id": 7, "link": "http://wp/7", "site": "wordpress"}
+
+    def fake_note(content, images, account):
+        barrier.wait()
+        calls["note"] = images
+        raise RuntimeError("note down")
+
+    monkeypatch.setattr(server, "post_to_mastodon", fake_mastodon)
+    monkeypatch.setattr(server, "post_to_twitter", fake_twitter)
+    monkeypatch.setattr(server, "post_to_wordpress", fake_wordpress)
+    monkeypatch.setattr(server, "post_to_note", fake_note)
+
+    resp = TestClient(server.app).post(
+        "/post",
+        json={
+            "text": "hello",
+            "title": "Shared",
+            "media": [_b64(PNG)],
+            "targets": [
+                {"platform": "mastodon", "account": "m"},
+                {"platform": "twitter", "account": "t"},
+                {"platform": "wordpress", "account": "w", "title": "Blog"},
+                {"platform": "note", "account": "n"},
+            ],
+        },
+    )
+    assert resp.json() == {
+        "results": [
+            {"platform": "mastodon", "account": "m", "id": "m1",
+             "link": "http://toot", "site": "mastodon"},
+            {"platform": "twitter", "account": "t", "id": "t1",
+             "link": None, "site": "twitter"},
+            {"platform": "wordpress", "account": "w", "id": 7,
+             "link": "http://wp/7", "site": "wordpress"},
+            {"platform": "note", "account": "n", "error": "note down"},
+        ]
+    }
+    # Types and file names are resolved by the posting functions.
+    assert calls["mastodon"] == [(PNG, None)]
+    assert calls["twitter"] == [(PNG, None)]
+    assert calls["wordpress"] == ("Blog", [(PNG, None)])
+    # Note gets a file name carrying the sniffed type.
+    assert calls["note"] == [(PNG, "media1.png")]
+
+
+def test_post_reports_target_and_media_errors(monkeypatch):
+    client = TestClient(server.app)
+    resp = client.post(
+        "/post",
+        json={"text": "x", "targets": [{"platform": "wordpress", "account": "w"}]},
+    )
+    assert resp.json()["results"][0]["error"].startswith("title is required")
+
+    resp = client.post(
+        "/post",
+        json={
+            "text": "x",
+            "media": ["a"],
+            "targets": [{"platform": "mastodon", "account": "m"}],
+        },
+    )
+    assert resp.json()["error"].startswith("Media decode failed")
+
+    resp = client.post(
+        "/post", json={"text": "x", "targets": [{"platform": "myspace", "account": "a"}]}
+    )
+    assert resp.status_code == 422
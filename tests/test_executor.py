@@ -0,0 +1,81 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from fastapi.testclient import TestClient
+
+import server
+from services.executor import PlatformExecutor
+
+
+def test_run_executes_off_event_loop():
+    executor = PlatformExecutor()
+    loop_thread = threading.get_ident()
+
+    async def main():
+        return await executor.run("wordpress", threading.get_ident)
+
+    worker_thread = asyncio.run(main())
+    assert worker_thread != loop_thread
+    stats = executor.stats()["wordpress"]
+    assert stats["completed"] == 1
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+    executor.shutdown()
+
+
+def test_calls_run_concurrently_within_limit():
+    executor = PlatformExecutor({"limits": {"mastodon": 2}})
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(executor.run("mastodon", slow) for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert executor.stats()["mastodon"]["limit"] == 2
+    assert executor.stats()["mastodon"]["completed"] == 6
+    executor.shutdown()
+
+
+def test_failures_are_counted():
+    executor = PlatformExecutor({"default_limit": 1})
+
+    def boom():
+        raise ValueError("nope")
+
+    async def main():
+        await executor.run("custom", boom)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+    stats = executor.stats()["custom"]
+    assert stats["limit"] == 1
+    assert stats["failed"] == 1
+    assert stats["running"] == 0
+    executor.shutdown()
+
+
+def test_metrics_endpoint_reports_executor(monkeypatch):
+    monkeypatch.setattr(server, "post_to_note", lambda content, images, account: {})
+    client = TestClient(server.app)
+    client.post("/note/draft", json={"account": "a", "content": "x"})
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.json()["executor"]["note"]["completed"] >= 1
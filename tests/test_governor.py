@@ -0,0 +1,134 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from governor import Governor, retry_delay, status_of
+
+
+class Resp:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _governor(**kwargs):
+    fake = FakeTime()
+    gov = Governor(rate=1000, sleep=fake.sleep, clock=fake.clock, **kwargs)
+    return gov, fake
+
+
+def _sender(*responses):
+    queue = list(responses)
+    calls = []
+
+    def send():
+        calls.append(1)
+        item = queue.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    return send, calls
+
+
+def test_retry_delay_parses_headers():
+    assert retry_delay({"Retry-After": "3"}, now=0) == 3
+    assert retry_delay({"Retry-After": "Thu, 01 Jan 1970 00:00:10 GMT"}, now=4) == 6
+    assert retry_delay(
+        {"x-rate-limit-remaining": "0", "x-rate-limit-reset": "2000000005"},
+        now=2_000_000_000,
+    ) == 5
+    assert retry_delay(
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1970-01-01T00:00:20Z"},
+        now=15,
+    ) == 5
+    assert retry_delay({"X-RateLimit-Remaining": "7", "X-RateLimit-Reset": "9"}) is None
+    assert retry_delay({}) is None
+
+
+def test_idempotent_requests_retry_with_backoff():
+    gov, fake = _governor(backoff=1)
+    send, calls = _sender(Resp(503), requests.ConnectionError("reset"), Resp(200))
+    resp = gov.request(send, "https://api.example/x", "GET")
+    assert resp.status_code == 200
+    assert len(calls) == 3
+    assert 0.5 <= fake.sleeps[0] <= 1 and 1 <= fake.sleeps[1] <= 2
+    assert gov.stats()["api.example"]["retries"] == 2
+
+
+def test_non_idempotent_requests_only_retry_rate_limits():
+    gov, fake = _governor()
+    send, calls = _sender(Resp(503))
+    assert gov.request(send, "https://api.example/x", "POST").status_code == 503
+    assert len(calls) == 1
+
+    send, calls = _sender(Resp(429, {"Retry-After": "2"}), Resp(201))
+    assert gov.request(send, "https://api.example/x", "POST").status_code == 201
+    assert fake.sleeps == [2]
+    assert gov.stats()["api.example"]["throttled"] == 1
+
+
+def test_rate_limit_pauses_whole_host_and_respects_max_wait():
+    gov, fake = _governor(max_wait=10)
+    send, _ = _sender(Resp(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "4"}))
+    gov.request(send, "https://api.example/a")
+    send, _ = _sender(Resp(200))
+    gov.request(send, "https://api.example/b")
+    assert fake.sleeps == [4]
+
+    send, calls = _sender(Resp(429, {"Retry-After": "600"}))
+    assert gov.request(send, "https://api.example/c").status_code == 429
+    assert len(calls) == 1
+    assert gov.stats()["api.example"]["blocked_for"] == 0
+
+
+def test_call_retries_sdk_errors_from_their_status():
+    gov, fake = _governor(max_retries=2)
+
+    class TooMany(Exception):
+        def __init__(self):
+            super().__init__("limited")
+            self.response = Resp(429, {"Retry-After": "1"})
+
+    send, calls = _sender(TooMany(), "ok")
+    assert gov.call("api.twitter.com", send) == "ok"
+    assert fake.sleeps == [1]
+
+    server_error = Exception("Mastodon API returned error", 502, "Bad Gateway", "")
+    assert status_of(server_error) == 502
+    send, calls = _sender(server_error)
+    with pytest.raises(Exception):
+        gov.call("mastodon.example", send)
+    assert len(calls) == 1
+    send, calls = _sender(server_error, server_error, server_error)
+    with pytest.raises(Exception):
+        gov.call("mastodon.example", send, idempotent=True)
+    assert len(calls) == 3
+
+
+def test_arequest_retries_without_blocking_loop(monkeypatch):
+    gov, _ = _governor(backoff=0.001)
+    responses = [Resp(500), Resp(200)]
+
+    async def send():
+        return responses.pop(0)
+
+    resp = asyncio.run(gov.arequest(send, "https://api.example/x"))
+    assert resp.status_code == 200
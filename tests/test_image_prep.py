@@ -0,0 +1,138 @@
+import base64
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+try:  # Only the resizing tests need Pillow
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on environment
+    Image = None
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import server
+import services.image_prep as image_prep
+from services.image_prep import (
+    ImagePreprocessor,
+    PreparedMedia,
+    detect_media_type,
+    prepare_image,
+)
+
+
+# Signatures only; enough for sniffing, not for decoding.
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 24
+JPEG = b"\xff\xd8\xff\xe0" + b"\0" * 36
+
+
+def _image(size, mode="RGB", fmt="PNG", **kwargs):
+    pytest.importorskip("PIL.Image")
+    img = Image.new(mode, size, (200, 10, 10, 128)[: len(mode)])
+    buf = io.BytesIO()
+    img.save(buf, fmt, **kwargs)
+    return buf.getvalue()
+
+
+def test_detect_media_type():
+    assert detect_media_type(PNG) == ("image/png", ".png")
+    assert detect_media_type(JPEG) == ("image/jpeg", ".jpg")
+    assert detect_media_type(b"\0\0\0\x18ftypmp42") == ("video/mp4", ".mp4")
+    assert detect_media_type(b"\0\0\0\x14ftypqt  ") == ("video/quicktime", ".mov")
+    assert detect_media_type(b"\0\0\0\x18ftypheic") == ("image/heic", ".heic")
+    assert detect_media_type(b"hello") == ("application/octet-stream", "")
+
+
+def test_large_png_is_resized_to_jpeg():
+    data = _image((3000, 1500))
+    out = prepare_image(data, {"max_width": 1000, "max_height": 1000})
+    assert out.mime_type == "image/jpeg" and out.extension == ".jpg"
+    with Image.open(io.BytesIO(out.data)) as img:
+        assert img.size == (1000, 500)
+    assert out.filename("banner.png") == "banner.jpg"
+
+
+def test_transparency_is_kept_and_exif_stripped():
+    data = _image((50, 50), mode="RGBA")
+    out = prepare_image(data, {"max_width": 10})
+    assert out.mime_type == "image/png"
+    with Image.open(io.BytesIO(out.data)) as img:
+        assert img.size == (10, 10) and img.mode == "RGBA"
+
+    exif = Image.Exif()
+    exif[0x010F] = "Camera"
+    data = _image((20, 20), fmt="JPEG", exif=exif.tobytes())
+    out = prepare_image(data, {})
+    with Image.open(io.BytesIO(out.data)) as img:
+        assert not img.info.get("exif")
+
+
+def test_non_images_are_untouched():
+    video = b"\0\0\0\x18ftypmp42" + b"x" * 10
+    assert prepare_image(video, {"max_width": 1}) == PreparedMedia(
+        video, "video/mp4", ".mp4"
+    )
+
+
+def test_unreadable_images_are_uploaded_unchanged():
+    out = prepare_image(JPEG, {"max_width": 10})
+    assert out == PreparedMedia(JPEG, "image/jpeg", ".jpg")
+
+
+def test_disabled_prep_keeps_names_and_bytes(monkeypatch):
+    monkeypatch.setattr(image_prep, "IMAGE_PREP", None)
+    data = PNG
+    encoded = base64.b64encode(data).decode()
+    assert server._prepare_upload("wordpress", encoded, "photo.jpeg") == (
+        data,
+        "image/png",
+        "photo.jpeg",
+    )
+    assert server._prepare_upload("twitter", encoded, index=2)[2] == "media2.png"
+
+
+def test_preprocessor_caches_and_uses_process_pool():
+    prep = ImagePreprocessor({"demo": {"max_width": 20, "max_height": 20}}, workers=1)
+    try:
+        data = _image((100, 40))
+        first = prep.process("demo", data)
+        assert prep.process("demo", data) is first
+        assert prep.stats() == {"cached": 1, "hits": 1, "misses": 1}
+        with Image.open(io.BytesIO(first.data)) as img:
+            assert img.size == (20, 8)
+        assert prep.process("unknown", data).data == data
+    finally:
+        prep.shutdown()
+
+
+def test_mastodon_post_uploads_preprocessed_media(monkeypatch):
+    uploads = []
+
+    class DummyMastodon:
+        def media_post(self, fh, mime_type=None):
+            uploads.append((fh.read(), mime_type))
+            return {"id": 1}
+
+        def status_post(self, text, media_ids=None):
+            return {"id": "s1", "url": "http://toot"}
+
+    monkeypatch.setattr(server, "MASTODON_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(server, "MASTODON_CLIENTS", {"acc": DummyMastodon()})
+    monkeypatch.setattr(
+        image_prep,
+        "IMAGE_PREP",
+        ImagePreprocessor({"mastodon": {"max_width": 64, "max_height": 64}}, workers=0),
+    )
+    data = _image((640, 320))
+    resp = TestClient(server.app).post(
+        "/mastodon/post/multipart",
+        data={"account": "acc", "text": "hi"},
+        files=[("media", ("a.png", data, "image/png"))],
+    )
+    assert resp.json()["id"] == "s1"
+    body, mime_type = uploads[0]
+    assert mime_type == "image/jpeg"
+    assert len(body) < len(data)
+    with Image.open(io.BytesIO(body)) as img:
+        assert img.size == (64, 32)
@@ -0,0 +1,91 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from services.jobs import JobQueue
+
+
+def test_job_runs_and_stores_result(tmp_path):
+    jobs = JobQueue(tmp_path / "jobs.sqlite3", workers=1)
+    jobs.register("add", lambda a, b: {"sum": a + b})
+    jobs.register("boom", lambda: 1 / 0)
+
+    ok = jobs.submit("add", a=1, b=2)
+    bad = jobs.submit("boom")
+    assert jobs.wait(ok, timeout=5)["result"] == {"sum": 3}
+    failed = jobs.wait(bad, timeout=5)
+    assert failed["status"] == "failed"
+    assert "division" in failed["error"]
+    assert jobs.get("nope") is None
+    stats = jobs.stats()
+    assert stats["succeeded"] == 1 and stats["failed"] == 1
+    jobs.stop()
+
+    with pytest.raises(ValueError):
+        jobs.submit("unknown")
+
+
+def test_workers_limit_concurrency(tmp_path):
+    jobs = JobQueue(tmp_path / "jobs.sqlite3", workers=2)
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+    release = threading.Event()
+
+    def slow():
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        release.wait(5)
+        with lock:
+            running["now"] -= 1
+
+    jobs.register("slow", slow)
+    ids = [jobs.submit("slow") for _ in range(4)]
+    release.set()
+    for job_id in ids:
+        assert jobs.wait(job_id, timeout=5)["status"] == "succeeded"
+    assert running["max"] <= 2
+    jobs.stop()
+
+
+def _interrupted_queue(path):
+    # Simulate a job left running and one left queued by a dead process.
+    first = JobQueue(path)
+    first.register("echo", lambda value: value)
+    with first._lock:
+        conn = first._db()
+        with conn:
+            for job_id, status in (("a", "running"), ("b", "queued")):
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, params, status, created_at)"
+                    " VALUES (?, 'echo', ?, ?, 0)",
+                    (job_id, f'{{"value": "{job_id}"}}', status),
+                )
+    first._conn.close()
+
+
+def test_resume_on_restart(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    _interrupted_queue(path)
+    jobs = JobQueue(path, resume=True)
+    jobs.register("echo", lambda value: value)
+    jobs.start()
+    assert jobs.wait("a", timeout=5)["result"] == "a"
+    assert jobs.wait("b", timeout=5)["result"] == "b"
+    jobs.stop()
+
+
+def test_no_resume_marks_interrupted_jobs_failed(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    _interrupted_queue(path)
+    jobs = JobQueue(path, resume=False)
+    jobs.register("echo", lambda value: value)
+    jobs.start()
+    for job_id in ("a", "b"):
+        job = jobs.get(job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "Interrupted by restart"
+    jobs.stop()
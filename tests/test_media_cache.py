@@ -0,0 +1,144 @@
+import io
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import services.media_cache as media_cache
+import services.post_to_wordpress as wp_service
+from services.media_cache import MediaCache, create_media_cache, media_digest
+
+
+def test_media_digest_matches_across_sources(tmp_path):
+    path = tmp_path / "img.png"
+    path.write_bytes(b"image")
+    fh = io.BytesIO(b"xximage")
+    fh.seek(2)
+    digest = media_digest(b"image")
+    assert media_digest(path) == digest
+    assert media_digest(fh) == digest
+    assert fh.tell() == 2
+    assert media_digest(object()) is None
+
+
+def test_fetch_uploads_each_content_once_per_account(tmp_path):
+    cache = MediaCache(tmp_path / "cache.sqlite3")
+    uploads = []
+
+    def upload():
+        uploads.append(1)
+        return {"id": len(uploads)}
+
+    assert cache.fetch("wordpress", "a", b"img", upload) == {"id": 1}
+    assert cache.fetch("wordpress", "a", b"img", upload) == {"id": 1}
+    assert cache.fetch("wordpress", "b", b"img", upload) == {"id": 2}
+    assert cache.fetch("twitter", "a", b"img", upload) == {"id": 3}
+    assert cache.stats() == {"entries": 3, "hits": 1, "misses": 3}
+
+    # Entries survive a restart.
+    reopened = MediaCache(tmp_path / "cache.sqlite3")
+    assert reopened.fetch("wordpress", "a", b"img", upload) == {"id": 1}
+    assert len(uploads) == 3
+
+
+def test_expired_and_evicted_entries_are_uploaded_again(tmp_path):
+    cache = MediaCache(
+        tmp_path / "cache.sqlite3", max_entries=2, platform_ttl={"twitter": 0}
+    )
+    calls = []
+
+    def upload():
+        calls.append(1)
+        return {"id": len(calls)}
+
+    cache.fetch("twitter", "a", b"x", upload)
+    cache.fetch("twitter", "a", b"x", upload)
+    assert len(calls) == 2
+
+    cache.fetch("note", "a", b"1", upload)
+    cache.fetch("note", "a", b"2", upload)
+    cache.fetch("note", "a", b"1", upload)
+    cache.fetch("note", "a", b"3", upload)
+    assert cache.get("note", "a", media_digest(b"2")) is None
+    assert cache.get("note", "a", media_digest(b"1")) is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_stale_entries_are_validated(tmp_path):
+    cache = MediaCache(tmp_path / "cache.sqlite3", validate_after=0)
+    uploads = []
+    valid = {1: False}
+
+    def upload():
+        uploads.append(1)
+        return {"id": len(uploads)}
+
+    def validate(value):
+        return valid.get(value["id"], True)
+
+    assert cache.fetch("wordpress", "a", b"img", upload, validate) == {"id": 1}
+    assert cache.fetch("wordpress", "a", b"img", upload, validate) == {"id": 2}
+    assert cache.fetch("wordpress", "a", b"img", upload, validate) == {"id": 2}
+    assert len(uploads) == 2
+
+
+def test_create_media_cache_requires_section(tmp_path):
+    assert create_media_cache(None, tmp_path / "c") is None
+    assert create_media_cache({"enabled": False}, tmp_path / "c") is None
+    cache = create_media_cache({"ttl": 10}, tmp_path / "c")
+    assert cache.ttl == 10 and cache.path == tmp_path / "c"
+
+
+def test_wordpress_uploads_reuse_cached_media(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        media_cache, "MEDIA_CACHE", MediaCache(tmp_path / "cache.sqlite3")
+    )
+
+    class Client:
+        def __init__(self):
+            self.uploaded = []
+
+        def upload_media(self, content, filename, alt=None):
+            self.uploaded.append(filename)
+            return {"id": len(self.uploaded), "url": f"http://img/{filename}", "alt": alt}
+
+        def get_media(self, media_id):
+            return {"ID": media_id}
+
+    client = Client()
+    items = [(b"banner", "a.png", "x"), (b"banner", "b.png", "x")]
+    first = wp_service.upload_images(client, items[:1], "blog")
+    second = wp_service.upload_images(client, items, "blog")
+    assert client.uploaded == ["a.png"]
+    assert second == first * 2
+
+
+def test_fetch_drops_per_key_locks_when_done(tmp_path):
+    cache = MediaCache(tmp_path / "cache.sqlite3")
+    for n in range(5):
+        cache.fetch("note", "a", f"img{n}".encode(), lambda: {"url": "u"})
+    try:
+        cache.fetch("note", "a", b"bad", lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert cache._key_locks == {}
+
+
+def test_default_account_is_cached_under_resolved_name(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        media_cache, "MEDIA_CACHE", MediaCache(tmp_path / "cache.sqlite3")
+    )
+    monkeypatch.setattr(
+        wp_service, "CONFIG", {"wordpress": {"accounts": {"blog": {"site": "s"}}}}
+    )
+    keys = []
+    monkeypatch.setattr(
+        media_cache.MEDIA_CACHE, "fetch", lambda p, a, *rest: keys.append(a) or {"id": 1}
+    )
+
+    class Client:
+        def create_post(self, *args, **kwargs):
+            return {"id": 1, "link": "l"}
+
+    monkeypatch.setattr(wp_service, "create_wp_client", lambda account=None: Client())
+    wp_service.post_to_wordpress("t", "c", [(b"img", "a.png")])
+    assert keys == ["blog"]
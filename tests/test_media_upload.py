@@ -0,0 +1,230 @@
+import base64
+import threading
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+
+import governor
+import server
+import services.media_upload as media_upload
+from services.media_upload import upload_concurrently
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def test_results_keep_input_order():
+    def upload(index, item):
+        time.sleep(0.01 * (4 - index))
+        return (index, item)
+
+    result = upload_concurrently("mastodon", ["a", "b", "c", "d"], upload)
+    assert result == [(1, "a"), (2, "b"), (3, "c"), (4, "d")]
+
+
+def test_uploads_overlap_up_to_platform_limit():
+    barrier = threading.Barrier(4, timeout=2)
+    active = []
+    lock = threading.Lock()
+
+    def upload(index, item):
+        with lock:
+            active.append(index)
+        barrier.wait()
+        return item
+
+    assert upload_concurrently("twitter", list("abcd"), upload) == list("abcd")
+    assert sorted(active) == [1, 2, 3, 4]
+
+
+def test_first_failure_cancels_pending_uploads():
+    started = []
+
+    def upload(index, item):
+        started.append(index)
+        if index == 1:
+            raise RuntimeError("boom")
+        time.sleep(0.05)
+        return item
+
+    with pytest.raises(RuntimeError, match="boom"):
+        upload_concurrently("unknown", list(range(20)), upload)
+    assert len(started) < 20
+
+
+def test_mastodon_attaches_media_in_request_order(monkeypatch):
+    class DummyMasto:
+        def __init__(self):
+            self.media_ids = None
+
+        def media_post(self, fh, mime_type=None):
+            data = fh.read()
+            time.sleep(0.01 * (4 - int(data)))
+            return {"id": f"m{data.decode()}"}
+
+        def status_post(self, text, media_ids=None):
+            self.media_ids = media_ids
+            return {"id": 1, "url": "http://masto/1"}
+
+    masto = DummyMasto()
+    monkeypatch.setattr(server, "MASTODON_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(server, "MASTODON_CLIENTS", {"acc": masto})
+    result = server.post_to_mastodon(
+        "acc", "hi", [_b64(str(i).encode()) for i in range(1, 5)]
+    )
+    assert result["id"] == 1
+    assert masto.media_ids == ["m1", "m2", "m3", "m4"]
+
+
+def test_twitter_reports_failed_upload(monkeypatch):
+    class DummyAPI:
+        def media_upload(self, filename, file):
+            if file.read() == b"2":
+                raise RuntimeError("too large")
+            return SimpleNamespace(media_id="m")
+
+    class DummyClient:
+        def create_tweet(self, text, media_ids=None):
+            raise AssertionError("tweet must not be sent")
+
+    monkeypatch.setattr(server, "TWITTER_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(
+        server,
+        "TWITTER_CLIENTS",
+        {"acc": {"client": DummyClient(), "api": DummyAPI(), "screen_name": "me"}},
+    )
+    result = server.post_to_twitter("acc", "hi", [_b64(b"1"), _b64(b"2")])
+    assert result == {"error": "Media upload failed: too large"}
+
+
+class Unavailable(Exception):
+    def __init__(self):
+        super().__init__("503 Service Unavailable")
+        self.response = SimpleNamespace(status_code=503, headers={})
+
+
+class ChunkedAPI:
+    """In-memory stand-in for Twitter's chunked media endpoints."""
+
+    def __init__(self, fail_segments=(), states=()):
+        self.fail_segments = set(fail_segments)
+        self.states = list(states)
+        self.segments = {}
+        self.appends = []
+        self.inits = 0
+        self.lock = threading.Lock()
+
+    def chunked_upload_init(self, total_bytes, media_type, media_category=None):
+        self.inits += 1
+        self.total = total_bytes
+        self.category = media_category
+        return SimpleNamespace(media_id="v1")
+
+    def chunked_upload_append(self, media_id, media, segment_index):
+        with self.lock:
+            self.appends.append(segment_index)
+            if segment_index in self.fail_segments:
+                self.fail_segments.discard(segment_index)
+                raise Unavailable()
+            self.segments[segment_index] = media
+
+    def _info(self):
+        state = self.states.pop(0) if self.states else "succeeded"
+        return {"state": state, "check_after_secs": 0}
+
+    def chunked_upload_finalize(self, media_id):
+        assert b"".join(self.segments[i] for i in sorted(self.segments)) == self.data
+        return SimpleNamespace(media_id=media_id, processing_info=self._info())
+
+    def get_media_upload_status(self, media_id):
+        return SimpleNamespace(media_id=media_id, processing_info=self._info())
+
+
+@pytest.fixture
+def strict_governor(monkeypatch):
+    # No retries inside the governor, so resuming is what recovers.
+    monkeypatch.setattr(
+        governor, "GOVERNOR", governor.Governor(max_retries=0, sleep=lambda s: None)
+    )
+
+
+def test_chunked_upload_resumes_missing_segments(strict_governor):
+    data = bytes(range(256)) * 40
+    api = ChunkedAPI(fail_segments={3}, states=["pending", "in_progress"])
+    api.data = data
+    upload = media_upload.ChunkedUpload(
+        api, BytesIO(data), "video/mp4", "upload.test", segment_size=1000,
+        sleep=lambda s: None,
+    )
+    assert upload.run() == "v1"
+    assert api.inits == 1
+    assert api.category == "tweet_video"
+    assert api.total == len(data)
+    assert sorted(api.appends) == sorted(list(range(11)) + [3])
+    assert not api.states
+
+
+def test_chunked_upload_gives_up_on_permanent_errors(strict_governor):
+    api = ChunkedAPI(states=["failed"])
+    api.data = b"gif"
+    upload = media_upload.ChunkedUpload(
+        api, b"gif", "image/gif", "upload.test", sleep=lambda s: None
+    )
+    with pytest.raises(RuntimeError, match="Media processing failed"):
+        upload.run()
+
+
+def test_twitter_chunks_videos(monkeypatch, strict_governor):
+    video = b"\x00\x00\x00\x18ftypmp42" + b"x" * 5000
+    api = ChunkedAPI()
+    api.data = video
+    tweets = []
+
+    class DummyClient:
+        def create_tweet(self, text, media_ids=None):
+            tweets.append(media_ids)
+            return SimpleNamespace(data={"id": "9"})
+
+    monkeypatch.setattr(media_upload, "SEGMENT_SIZE", 1024)
+    monkeypatch.setattr(server, "TWITTER_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(
+        server,
+        "TWITTER_CLIENTS",
+        {"acc": {"client": DummyClient(), "api": api, "screen_name": "me"}},
+    )
+    result = server.post_to_twitter("acc", "clip", files=[(BytesIO(video), "a.mp4")])
+    assert result["id"] == "9"
+    assert tweets == [["v1"]]
+    assert sorted(api.appends) == [0, 1, 2, 3, 4]
+
+
+def test_mastodon_waits_for_processing(monkeypatch, strict_governor):
+    class DummyMasto:
+        def __init__(self):
+            self.polls = {"a": 2, "b": 1}
+            self.media_ids = None
+
+        def media_post(self, fh, mime_type=None):
+            media_id = fh.read().decode()
+            return {"id": media_id, "url": None}
+
+        def media(self, media_id):
+            self.polls[media_id] -= 1
+            url = None if self.polls[media_id] else f"http://masto/{media_id}"
+            return {"id": media_id, "url": url}
+
+        def status_post(self, text, media_ids=None):
+            assert not any(self.polls.values())
+            self.media_ids = media_ids
+            return {"id": 1, "url": "http://masto/1"}
+
+    masto = DummyMasto()
+    monkeypatch.setattr(media_upload, "POLL_INTERVAL", 0)
+    monkeypatch.setattr(server, "MASTODON_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(server, "MASTODON_CLIENTS", {"acc": masto})
+    result = server.post_to_mastodon("acc", "hi", [_b64(b"a"), _b64(b"b")])
+    assert result["id"] == 1
+    assert masto.media_ids == ["a", "b"]
@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import server
+import services.image_prep as image_prep
+
+
+def test_mastodon_post_multipart(monkeypatch):
+    uploads = []
+
+    class DummyMastodon:
+        def media_post(self, fh, mime_type=None):
+            uploads.append((fh.read(), mime_type))
+            return {"id": len(uploads)}
+
+        def status_post(self, text, media_ids=None):
+            return {"id": "s1", "url": "http://toot", "media_ids": media_ids}
+
+    monkeypatch.setattr(server, "MASTODON_ACCOUNT_ERRORS", set(), raising=False)
+    monkeypatch.setattr(
+        server, "MASTODON_CLIENTS", {"acc": DummyMastodon()}, raising=False
+    )
+    client = TestClient(server.app)
+    resp = client.post(
+        "/mastodon/post/multipart",
+        data={"account": "acc", "text": "hi"},
+        files=[
+            ("media", ("a.png", b"one", "image/png")),
+            ("media", ("b.mp4", b"two", "video/mp4")),
+        ],
+    )
+    assert resp.json() == {"id": "s1", "link": "http://toot", "site": "mastodon"}
+    assert uploads == [(b"one", "image/png"), (b"two", "video/mp4")]
+
+
+def test_twitter_post_multipart(monkeypatch):
+    uploads = []
+
+    class DummyApi:
+        def media_upload(self, filename, file):
+            uploads.append((filename, file.read()))
+            return SimpleNamespace(media_id=len(uploads))
+
+        def verify_credentials(self):
+            return SimpleNamespace(screen_name="me")
+
+    class DummyClient:
+        def create_tweet(self, text, media_ids=None):
+            return SimpleNamespace(data={"id": "t1"})
+
+    monkeypatch.setattr(server, "TWITTER_ACCOUNT_ERRORS", set(), raising=False)
+    monkeypatch.setattr(
+        server,
+        "TWITTER_CLIENTS",
+        {"acc": {"client": DummyClient(), "api": DummyApi()}},
+        raising=False,
+    )
+    client = TestClient(server.app)
+    resp = client.post(
+        "/twitter/post/multipart",
+        data={"account": "acc", "text": "hi"},
+        files=[("media", ("a.png", b"one", "image/png"))],
+    )
+    assert resp.json()["link"] == "https://twitter.com/me/status/t1"
+    assert uploads == [("a.png", b"one")]
+
+    # Media is optional.
+    resp = client.post(
+        "/twitter/post/multipart", data={"account": "acc", "text": "plain"}
+    )
+    assert resp.json()["id"] == "t1"
+
+
+def test_wordpress_post_multipart(monkeypatch):
+    calls = []
+
+    def fake_post(title, content, images, account, **kwargs):
+        # File parts are handed on as spooled files, not read into bytes.
+        calls.append(
+            (title, [(fh.read(), name, alt) for fh, name, alt in images], kwargs)
+        )
+        return {"id": 1, "link": "http://post", "site": "wordpress"}
+
+    monkeypatch.setattr(image_prep, "IMAGE_PREP", None)
+    monkeypatch.setattr(server, "WORDPRESS_ACCOUNT_ERRORS", set(), raising=False)
+    monkeypatch.setattr(server, "WORDPRESS_CLIENTS", {"acc": object()}, raising=False)
+    monkeypatch.setattr(server, "service_post_to_wordpress", fake_post)
+    client = TestClient(server.app)
+    resp = client.post(
+        "/wordpress/post/multipart",
+        data={
+            "account": "acc",
+            "title": "T",
+            "content": "body",
+            "alt": ["first"],
+            "tags": ["a", "b"],
+            "json_ld": '{"@type": "Article"}',
+        },
+        files=[
+            ("media", ("a.png", b"one", "image/png")),
+            ("media", ("b.png", b"two", "image/png")),
+        ],
+    )
+    assert resp.json() == {"id": 1, "link": "http://post", "site": "wordpress"}
+    title, images, kwargs = calls[0]
+    assert title == "T"
+    assert images == [(b"one", "a.png", "first"), (b"two", "b.png", None)]
+    assert kwargs["tags"] == ["a", "b"]
+    assert kwargs["categories"] is None
+    assert kwargs["json_ld"] == {"@type": "Article"}
+
+    resp = client.post(
+        "/wordpress/post/multipart",
+        data={"account": "acc", "title": "T", "content": "c", "json_ld": "{"},
+    )
+    assert "Invalid json_ld" in resp.json()["error"]
+    assert len(calls) == 1
@@ -0,0 +1,59 @@
+import io
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from multipart_stream import MultipartStream
+
+
+def test_stream_matches_requests_encoding_in_small_chunks():
+    data = bytes(range(256)) * 100
+    fh = io.BytesIO(b"skip" + data)
+    fh.seek(4)
+    stream = MultipartStream(
+        {"attrs[0][alt]": "Alt"},
+        {"media[]": ("a.png", fh, "image/png")},
+        boundary="xyz",
+    )
+    chunks = list(iter(lambda: stream.read(1000), b""))
+    assert max(len(c) for c in chunks) <= 1000
+    body = b"".join(chunks)
+    assert len(body) == len(stream)
+
+    expected = (
+        b'--xyz\r\nContent-Disposition: form-data; name="attrs[0][alt]"\r\n\r\n'
+        b"Alt\r\n"
+        b'--xyz\r\nContent-Disposition: form-data; name="media[]"; '
+        b'filename="a.png"\r\nContent-Type: image/png\r\n\r\n'
+        + data
+        + b"\r\n--xyz--\r\n"
+    )
+    assert body == expected
+
+    # Rewinding replays the same body, e.g. after a 401 retry.
+    stream.seek(0)
+    assert b"".join(iter(lambda: stream.read(4096), b"")) == expected
+    stream.seek(0)
+    assert stream.read() == expected
+
+
+def test_header_parameters_are_escaped():
+    stream = MultipartStream(
+        files={"f": ('a"b\r\nc.png', io.BytesIO(b"x"), "image/png")},
+        boundary="xyz",
+    )
+    assert b'filename="a%22b%0D%0Ac.png"' in stream.read()
+
+
+def test_requests_sends_content_length():
+    stream = MultipartStream(files={"f": ("a", io.BytesIO(b"abc"), "text/plain")})
+    prepared = requests.Request(
+        "POST",
+        "http://example",
+        data=stream,
+        headers={"Content-Type": stream.content_type},
+    ).prepare()
+    assert prepared.headers["Content-Length"] == str(len(stream))
+    assert prepared.body is stream
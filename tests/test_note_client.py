@@ -1,4 +1,5 @@
 import sys
+import threading
 from pathlib import Path
 
 import requests
@@ -85,6 +86,34 @@ def test_upload_image_success(tmp_path):
     assert 'file' in session.post_args[0][2]
 
 
+def test_upload_image_from_bytes():
+    cfg = {'note': {'base_url': 'http://host'}}
+    session = DummySession(200, json_data={'data': {'cdn_url': 'http://cdn/y.png'}})
+    client = NoteClient(cfg, session=session)
+    url = client.upload_image(b'data', filename='y.png')
+    assert url == 'http://cdn/y.png'
+    assert session.post_args[0][2] == {'file': ('y.png', b'data', 'image/png')}
+
+
+def test_upload_image_from_bytes_without_known_type():
+    cfg = {'note': {'base_url': 'http://host'}}
+    session = DummySession(200, json_data={'url': 'http://cdn/z'})
+    client = NoteClient(cfg, session=session)
+    client.upload_image(b'data')
+    assert session.post_args[0][2] == {'file': ('image', b'data')}
+
+
+def test_post_to_note_sends_named_bytes(monkeypatch):
+    import services.post_to_note as mod
+    session = DummySession(200, json_data={'url': 'http://cdn/m.jpg'})
+    client = NoteClient({'note': {'base_url': 'http://host'}}, session=session)
+    monkeypatch.setattr(mod, 'create_note_client', lambda account=None: client)
+    monkeypatch.setattr(client, 'create_draft_shell', lambda title: {'note_id': 1})
+    monkeypatch.setattr(client, 'update_draft', lambda *args: None)
+    mod.post_to_note('hi', [(b'jpeg', 'media1.jpg')], 'acc')
+    assert session.post_args[0][2] == {'file': ('media1.jpg', b'jpeg', 'image/jpeg')}
+
+
 def test_upload_image_failure(tmp_path):
     cfg = {'note': {'base_url': 'http://host'}}
     session = DummySession(500)
@@ -171,3 +200,74 @@ def test_create_note_client_no_accounts(monkeypatch):
     monkeypatch.setattr(mod, 'NoteClient', DummyNoteClient)
     client = mod.create_note_client()
     assert client is None
+
+
+def test_create_draft_shell_and_update():
+    cfg = {'note': {'base_url': 'http://host'}}
+    session = DummySession(200, json_data={'id': 1, 'key': 'k', 'draft_url': 'u'})
+    client = NoteClient(cfg, session=session)
+    assert client.create_draft_shell('t') == {
+        'note_id': 1, 'note_key': 'k', 'draft_url': 'u'
+    }
+    client.update_draft(1, 't', '<p>x</p>')
+    assert session.post_args[0][1]['body'] == ''
+    assert session.put_args[0][0] == 'http://host/api/v1/text_notes/1'
+
+
+class PipelineNoteClient:
+    def __init__(self):
+        self.shell_started = threading.Event()
+        self.shells = 0
+        self.updates = []
+
+    def upload_image(self, img):
+        if img in (b'first', b'late-bad'):
+            # Finishes only once the draft shell is being created.
+            assert self.shell_started.wait(2)
+        if img.endswith(b'bad'):
+            raise RuntimeError('rejected')
+        return f'http://cdn/{img.decode()}.png'
+
+    def create_draft_shell(self, title):
+        self.shells += 1
+        self.shell_started.set()
+        return {'note_id': 9, 'note_key': 'k', 'draft_url': 'http://note/9'}
+
+    def update_draft(self, note_id, title, body_html):
+        self.updates.append((note_id, body_html))
+
+
+def _pipeline(monkeypatch):
+    import services.post_to_note as mod
+    client = PipelineNoteClient()
+    monkeypatch.setattr(mod, 'create_note_client', lambda account=None: client)
+    return mod, client
+
+
+def test_post_to_note_uploads_while_creating_draft(monkeypatch):
+    mod, client = _pipeline(monkeypatch)
+    result = mod.post_to_note('hi', [b'first', b'second'], 'acc')
+    assert result == {'id': 9, 'link': 'http://note/9', 'site': 'note'}
+    assert client.updates == [(
+        9,
+        '<p>hi</p><img src="http://cdn/first.png" />'
+        '<img src="http://cdn/second.png" />',
+    )]
+
+
+def test_post_to_note_creates_no_draft_when_uploads_fail(monkeypatch):
+    mod, client = _pipeline(monkeypatch)
+    result = mod.post_to_note('hi', [b'bad'], 'acc')
+    assert result == {'error': 'Image upload failed: rejected'}
+    assert client.shells == 0
+
+
+def test_post_to_note_reports_draft_left_by_late_failure(monkeypatch):
+    mod, client = _pipeline(monkeypatch)
+    result = mod.post_to_note('hi', [b'ok', b'late-bad'], 'acc')
+    assert result == {
+        'error': 'Image upload failed: rejected',
+        'id': 9,
+        'link': 'http://note/9',
+    }
+    assert client.updates == []
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+import requests
+
+import services.note_pool as note_pool
+from note_client import NoteClient
+from services.note_pool import NoteSessionPool, SessionStore, create_note_pool
+
+CFG = {"note": {"username": "u", "password": "p", "base_url": "http://host"}}
+
+
+class FakeNoteClient(NoteClient):
+    logins = 0
+
+    def login(self):
+        FakeNoteClient.logins += 1
+        self.session.cookies.set(
+            "sid",
+            f"secret{FakeNoteClient.logins}",
+            domain="host",
+            expires=int(time.time()) + 3600,
+        )
+        self.on_login()
+
+
+@pytest.fixture(autouse=True)
+def reset_logins():
+    FakeNoteClient.logins = 0
+
+
+def test_pool_reuses_sessions_until_config_changes():
+    pool = NoteSessionPool()
+    first = pool.get("acc", CFG, FakeNoteClient)
+    assert pool.get("acc", CFG, FakeNoteClient) is first
+    changed = {"note": {**CFG["note"], "password": "new"}}
+    assert pool.get("acc", changed, FakeNoteClient) is not first
+    assert FakeNoteClient.logins == 2
+    assert pool.stats()["hits"] == 1
+
+
+def test_restart_restores_encrypted_cookies(tmp_path):
+    pytest.importorskip("cryptography")
+    path = tmp_path / "sessions.bin"
+    NoteSessionPool(SessionStore(path)).get("acc", CFG, FakeNoteClient)
+    assert b"secret1" not in path.read_bytes()
+    assert (tmp_path / "sessions.key").stat().st_mode & 0o077 == 0
+
+    pool = NoteSessionPool(SessionStore(path))
+    client = pool.get("acc", CFG, FakeNoteClient)
+    assert FakeNoteClient.logins == 1
+    assert client.session.cookies.get("sid") == "secret1"
+    assert pool.stats()["restored"] == 1
+
+
+def test_expired_or_foreign_sessions_log_in(tmp_path):
+    pytest.importorskip("cryptography")
+    store = SessionStore(tmp_path / "sessions.bin")
+    store.save(
+        "acc",
+        {
+            "fingerprint": note_pool._fingerprint(CFG),
+            "cookies": [{"name": "sid", "value": "old", "expires": time.time() - 1}],
+        },
+    )
+    store.save(
+        "other",
+        {"fingerprint": "elsewhere", "cookies": [{"name": "sid", "value": "x"}]},
+    )
+    pool = NoteSessionPool(store)
+    pool.get("acc", CFG, FakeNoteClient)
+    pool.get("other", CFG, FakeNoteClient)
+    assert FakeNoteClient.logins == 2
+
+
+def test_wrong_key_only_costs_a_login(tmp_path):
+    pytest.importorskip("cryptography")
+    path = tmp_path / "sessions.bin"
+    NoteSessionPool(SessionStore(path)).get("acc", CFG, FakeNoteClient)
+    other_key = note_pool.Fernet.generate_key()
+    NoteSessionPool(SessionStore(path, other_key)).get("acc", CFG, FakeNoteClient)
+    assert FakeNoteClient.logins == 2
+
+
+def test_expired_session_logs_in_again():
+    class Session:
+        def __init__(self):
+            self.cookies = requests.cookies.RequestsCookieJar()
+            self.calls = []
+
+        def post(self, url, **kwargs):
+            self.calls.append(url)
+            resp = requests.Response()
+            if url.endswith("sign_in"):
+                resp.status_code = 200
+                resp.cookies.set("sid", "fresh")
+            else:
+                resp.status_code = 200 if self.cookies.get("sid") == "fresh" else 401
+                resp._content = b'{"url": "http://cdn/x.png"}'
+            return resp
+
+    session = Session()
+    client = NoteClient(CFG, session=session)
+    saved = []
+    client.on_login = lambda: saved.append(True)
+    assert client.upload_image(b"img") == "http://cdn/x.png"
+    assert [url.rsplit("/", 1)[1] for url in session.calls] == [
+        "upload_image",
+        "sign_in",
+        "upload_image",
+    ]
+    assert saved == [True]
+
+
+def test_create_note_pool_without_section_keeps_sessions_in_memory(tmp_path):
+    assert not create_note_pool(None, tmp_path / "s.bin").stats()["persistent"]
+    pytest.importorskip("cryptography")
+    key = note_pool.Fernet.generate_key().decode()
+    pool = create_note_pool({"key": key}, tmp_path / "s.bin")
+    assert pool.stats()["persistent"]
+    assert not (tmp_path / "s.key").exists()
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from services.pv_store import DailyViewsStore
+
+
+def test_store_round_trip(tmp_path):
+    store = DailyViewsStore(tmp_path / "sub" / "views.sqlite3")
+    store.put("site", "2024-01-01", {1: 3, 2: 0})
+    store.put("site", "2024-01-01", {1: 4})
+    store.put("other", "2024-01-01", {1: 9})
+    assert store.get("site", "2024-01-01", [1, 2, 3]) == {1: 4, 2: 0}
+    assert store.get("site", "2024-01-02", [1]) == {}
+    store.close()
+
+    reopened = DailyViewsStore(tmp_path / "sub" / "views.sqlite3")
+    assert reopened.get("other", "2024-01-01", [1]) == {1: 9}
+    reopened.close()
@@ -0,0 +1,85 @@
+import gzip
+import json
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from services.pv_writers import CsvWriter, PvWriter, get_writer
+
+DAYS = ["2024-01-02", "2024-01-01"]
+POSTS = [{"id": 1, "title": "A"}, {"id": 2, "title": "B"}]
+COUNTS = array("I", [5, 3, 0, 7])
+
+
+def _write(fmt, tmp_path):
+    cls = get_writer(fmt)
+    path = tmp_path / f"out{cls.extension}"
+    writer = cls(path, DAYS)
+    writer.write_chunk("acc", "site", POSTS, COUNTS)
+    writer.close()
+    return path
+
+
+def test_get_writer_unknown_format():
+    assert get_writer("csv") is CsvWriter
+    with pytest.raises(ValueError):
+        get_writer("xlsx")
+
+
+def test_csv_writer_wide_rows(tmp_path):
+    path = _write("csv", tmp_path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines == [
+        "account,site,post_id,title,pv_day1,pv_day2",
+        "acc,site,1,A,5,3",
+        "acc,site,2,B,0,7",
+    ]
+
+
+def test_ndjson_writer_long_rows(tmp_path):
+    path = _write("ndjson", tmp_path)
+    assert path.name.endswith(".ndjson.gz")
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert rows[0] == {
+        "account": "acc",
+        "site": "site",
+        "post_id": 1,
+        "title": "A",
+        "day": "2024-01-02",
+        "views": 5,
+    }
+    assert [(r["post_id"], r["day"], r["views"]) for r in rows[1:]] == [
+        (1, "2024-01-01", 3),
+        (2, "2024-01-02", 0),
+        (2, "2024-01-01", 7),
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_arrow_writers_long_rows(tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    path = _write(fmt, tmp_path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+    else:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+    assert table.column("post_id").to_pylist() == [1, 1, 2, 2]
+    assert table.column("views").to_pylist() == [5, 3, 0, 7]
+    assert str(table.column("day")[1]) == "2024-01-01"
+    assert table.schema.field("views").type == pa.uint32()
+
+
+def test_incomplete_writer_fails_at_construction(tmp_path):
+    class NoClose(PvWriter):
+        def write_chunk(self, account, site, posts, counts):
+            pass
+
+    with pytest.raises(TypeError):
+        NoClose(tmp_path / "x", ["2024-01-01"])
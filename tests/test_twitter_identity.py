@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import server
+
+
+class DummyAPI:
+    def __init__(self):
+        self.lookups = 0
+
+    def verify_credentials(self):
+        self.lookups += 1
+        return SimpleNamespace(screen_name=f"me{self.lookups}", id_str="42")
+
+
+class DummyClient:
+    def create_tweet(self, text, media_ids=None):
+        return SimpleNamespace(data={"id": "7"})
+
+
+def _setup(monkeypatch):
+    api = DummyAPI()
+    entry = {"client": DummyClient(), "api": api}
+    monkeypatch.setattr(server, "TWITTER_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(server, "TWITTER_CLIENTS", {"acc": entry})
+    return api, entry
+
+
+def test_screen_name_is_resolved_once_per_account(monkeypatch):
+    api, entry = _setup(monkeypatch)
+    first = server.post_to_twitter("acc", "one")
+    second = server.post_to_twitter("acc", "two")
+    assert first["link"] == second["link"] == "https://twitter.com/me1/status/7"
+    assert api.lookups == 1
+    assert entry["user_id"] == "42"
+
+
+def test_identity_refreshes_after_ttl_and_on_request(monkeypatch):
+    api, entry = _setup(monkeypatch)
+    server.twitter_identity(entry)
+    entry["identity_at"] -= server.TWITTER_IDENTITY_TTL + 1
+    assert server.twitter_identity(entry)["screen_name"] == "me2"
+
+    client = TestClient(server.app)
+    resp = client.get("/twitter/identity", params={"account": "acc"})
+    assert resp.json() == {"screen_name": "me2", "user_id": "42"}
+    resp = client.get("/twitter/identity", params={"account": "acc", "refresh": True})
+    assert resp.json()["screen_name"] == "me3"
+
+
+def test_failed_lookup_keeps_posting(monkeypatch):
+    api, entry = _setup(monkeypatch)
+
+    def broken():
+        raise RuntimeError("down")
+
+    api.verify_credentials = broken
+    result = server.post_to_twitter("acc", "hi")
+    assert result == {"id": "7", "link": None, "site": "twitter"}
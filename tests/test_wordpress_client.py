@@ -29,7 +29,7 @@ def _make_client():
 def test_upload_media_uses_media(monkeypatch):
     client = _make_client()
 
-    def fake_post(url, files):
+    def fake_post(url, data=None, headers=None):
         return DummyResp({"media": [{"id": 1, "URL": "http://example/img.jpg"}]})
 
     monkeypatch.setattr(client.session, "post", fake_post)
@@ -37,10 +37,29 @@ def test_upload_media_uses_media(monkeypatch):
     assert res == {"id": 1, "url": "http://example/img.jpg"}
 
 
+def test_upload_media_streams_bytes(monkeypatch):
+    client = _make_client()
+    captured = {}
+
+    def fake_post(url, data=None, headers=None):
+        captured["stream"] = data
+        captured["headers"] = headers
+        captured["body"] = b"".join(iter(lambda: data.read(3), b""))
+        return DummyResp({"media": [{"id": 1, "URL": "http://i"}]})
+
+    monkeypatch.setattr(client.session, "post", fake_post)
+    client.upload_media(memoryview(b"pixels"), "a.png")
+    # The body is read from the stream in chunks instead of being built
+    # by requests in memory.
+    assert isinstance(captured["stream"], wordpress_client.MultipartStream)
+    assert captured["headers"]["Content-Type"] == captured["stream"].content_type
+    assert b"Content-Type: image/png\r\n\r\npixels\r\n" in captured["body"]
+
+
 def test_upload_media_source_url(monkeypatch):
     client = _make_client()
 
-    def fake_post(url, files):
+    def fake_post(url, data=None, headers=None):
         return DummyResp({"media": [{"id": 3, "source_url": "http://example/img2.jpg"}]})
 
     monkeypatch.setattr(client.session, "post", fake_post)
@@ -51,7 +70,7 @@ def test_upload_media_source_url(monkeypatch):
 def test_upload_media_fallback_link(monkeypatch):
     client = _make_client()
 
-    def fake_post(url, files):
+    def fake_post(url, data=None, headers=None):
         return DummyResp({"media": [{"id": 2, "link": "http://page"}]})
 
     monkeypatch.setattr(client.session, "post", fake_post)
@@ -59,6 +78,20 @@ def test_upload_media_fallback_link(monkeypatch):
     assert res == {"id": 2, "url": "http://page"}
 
 
+def test_upload_media_sends_alt(monkeypatch):
+    client = _make_client()
+    captured = {}
+
+    def fake_post(url, data=None, headers=None):
+        captured["body"] = data.read()
+        return DummyResp({"media": [{"id": 4, "URL": "http://i", "alt": "Cat"}]})
+
+    monkeypatch.setattr(client.session, "post", fake_post)
+    res = client.upload_media(b"x", "a.jpg", alt="Cat")
+    assert b'name="attrs[0][alt]"\r\n\r\nCat\r\n' in captured["body"]
+    assert res == {"id": 4, "url": "http://i", "alt": "Cat"}
+
+
 def test_plan_id_from_config():
     client = WordpressClient({"wordpress": {"site": "s", "plan_id": "p1"}})
     assert client.plan_id == "p1"
@@ -187,15 +220,39 @@ def test_get_daily_views_batches(monkeypatch):
         return DummyResp({"views": {ids[0]: 2}})
 
     monkeypatch.setattr(client.session, "get", fake_get)
-    sleeps: list[float] = []
-    monkeypatch.setattr(wordpress_client.time, "sleep", lambda s: sleeps.append(s))
+    paced: list[str] = []
+
+    class Governor:
+        def request(self, send, url, method="GET", idempotent=None):
+            paced.append(url)
+            return send()
+
+    client.governor = Governor()
     res = client.get_daily_views(list(range(1, 102)), "2024-01-01")
     assert res[1] == 1
     assert res[100] == 1
     assert res[101] == 2
     assert len(captured) == 2
-    assert len(sleeps) == 2
+    # Batches are paced by the governor instead of a fixed sleep.
+    assert len(paced) == 2
     assert captured[0]["day"] == "2024-01-01"
     assert captured[1]["day"] == "2024-01-01"
     assert len(captured[0]["post_ids"].split(",")) == 100
     assert captured[1]["post_ids"] == "101"
+
+
+def test_requests_are_retried_by_governor(monkeypatch):
+    from governor import Governor
+
+    client = _make_client()
+    client.governor = Governor(sleep=lambda s: None)
+    statuses = [503, 200]
+
+    def fake_get(url, params=None, timeout=None):
+        resp = DummyResp({"media": [{"ID": 1}]})
+        resp.status_code = statuses.pop(0)
+        return resp
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    assert client.list_media() == [{"ID": 1}]
+    assert statuses == []
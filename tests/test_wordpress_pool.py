@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from fastapi.testclient import TestClient
+
+import server
+import services.post_to_wordpress as wp_service
+from services.wordpress_pool import WordpressClientPool
+from wordpress_client import WordpressClient
+
+
+class DummyResp:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.text = "ok"
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"status {self.status_code}")
+
+
+class CountingClient:
+    instances = 0
+
+    def __init__(self, config):
+        CountingClient.instances += 1
+        self.config = config
+        self.auth_calls = 0
+
+    def authenticate(self):
+        self.auth_calls += 1
+
+
+def test_pool_reuses_clients_and_counts():
+    CountingClient.instances = 0
+    pool = WordpressClientPool()
+    acct = {"site": "s1"}
+    c1 = pool.get("acc", acct, client_cls=CountingClient)
+    c2 = pool.get("acc", dict(acct), client_cls=CountingClient)
+    assert c1 is c2
+    assert c1.auth_calls == 1
+    assert CountingClient.instances == 1
+    assert pool.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_pool_rebuilds_on_config_change_and_invalidate():
+    pool = WordpressClientPool()
+    c1 = pool.get("acc", {"site": "s1"}, client_cls=CountingClient)
+    c2 = pool.get("acc", {"site": "s2"}, client_cls=CountingClient)
+    assert c1 is not c2
+    assert c2.config["wordpress"]["accounts"]["default"]["site"] == "s2"
+    pool.invalidate("acc")
+    c3 = pool.get("acc", {"site": "s2"}, client_cls=CountingClient)
+    assert c3 is not c2
+    assert pool.stats()["misses"] == 3
+
+
+def test_pool_does_not_cache_failed_auth():
+    class FailingClient(CountingClient):
+        def authenticate(self):
+            raise RuntimeError("bad credentials")
+
+    pool = WordpressClientPool()
+    try:
+        pool.get("acc", {"site": "s"}, client_cls=FailingClient)
+    except RuntimeError:
+        pass
+    assert pool.clients == {}
+
+
+def test_client_reauthenticates_on_401(monkeypatch):
+    client = WordpressClient({"wordpress": {"site": "s"}})
+    tokens = iter(["tok1", "tok2"])
+    calls: list[str] = []
+
+    def fake_post(url, **kwargs):
+        calls.append(url)
+        return DummyResp({"access_token": next(tokens)})
+
+    def fake_get(url, headers=None, params=None, **kwargs):
+        calls.append(url)
+        if client.access_token == "tok1":
+            return DummyResp({}, status_code=401)
+        return DummyResp({"search_terms": [["foo", 1]]})
+
+    monkeypatch.setattr(client.session, "post", fake_post)
+    monkeypatch.setattr(client.session, "get", fake_get)
+    client.authenticate()
+    terms = client.get_search_terms(1)
+    assert terms == [{"term": "foo", "views": 1}]
+    assert client.access_token == "tok2"
+    assert client.session.headers["Authorization"] == "Bearer tok2"
+    assert sum(url == client.TOKEN_URL for url in calls) == 2
+
+
+def test_client_refreshes_expired_token(monkeypatch):
+    client = WordpressClient({"wordpress": {"site": "s"}})
+    tokens = iter(["tok1", "tok2"])
+
+    def fake_post(url, **kwargs):
+        return DummyResp({"access_token": next(tokens), "expires_in": 3600})
+
+    def fake_get(url, headers=None, params=None, **kwargs):
+        return DummyResp({"search_terms": []})
+
+    monkeypatch.setattr(client.session, "post", fake_post)
+    monkeypatch.setattr(client.session, "get", fake_get)
+    client.authenticate()
+    assert not client.token_expired()
+    client.get_search_terms(1)
+    assert client.access_token == "tok1"
+    client.token_expires_at = 0
+    client.get_search_terms(1)
+    assert client.access_token == "tok2"
+
+
+def test_create_wp_client_shares_pool_with_server(monkeypatch):
+    cfg = {"wordpress": {"accounts": {"acc": {"site": "shared"}}}}
+    monkeypatch.setattr(wp_service, "CONFIG", cfg)
+    monkeypatch.setattr(server, "CONFIG", cfg)
+    monkeypatch.setattr(server, "WORDPRESS_ACCOUNT_ERRORS", {})
+    monkeypatch.setattr(WordpressClient, "authenticate", lambda self: None)
+    wp_service.WP_POOL.invalidate("acc")
+
+    clients = server.create_wordpress_clients()
+    # Nothing is created until the account is first used.
+    assert "acc" not in wp_service.WP_POOL.clients
+    client = clients["acc"]
+    assert wp_service.WP_POOL.clients["acc"] is client
+    before = wp_service.WP_POOL.stats()["hits"]
+    assert wp_service.create_wp_client("acc") is client
+    assert wp_service.WP_POOL.stats()["hits"] == before + 1
+
+    resp = TestClient(server.app).get("/metrics")
+    assert resp.status_code == 200
+    assert resp.json()["wordpress_pool"]["hits"] == before + 1
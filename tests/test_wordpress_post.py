@@ -8,7 +8,6 @@ import requests
 import server
 import services.post_to_wordpress as wp_service
 import tempfile
-from pathlib import Path
 
 
 class DummyResponse:
@@ -33,7 +32,14 @@ def make_client(monkeypatch, config):
         if url.endswith("oauth2/token"):
             return DummyResponse({"access_token": "tok"})
         if url.endswith("/media/new"):
-            calls["uploads"].append(kwargs["files"]["media[]"])
+            if "files" in kwargs:
+                calls["uploads"].append(kwargs["files"]["media[]"])
+            else:
+                stream = kwargs["data"]
+                chunks = iter(lambda: stream.read(8192), b"")
+                calls["uploads"].append(
+                    (kwargs["headers"]["Content-Type"], b"".join(chunks))
+                )
             return DummyResponse({"media": [{"id": 1, "source_url": "http://img"}]})
         if "/media/1" in url:
             calls["alt_updates"].append(kwargs.get("json"))
@@ -48,7 +54,6 @@ def make_client(monkeypatch, config):
 
     monkeypatch.setattr(server, "CONFIG", config, raising=False)
     monkeypatch.setattr(wp_service, "CONFIG", config, raising=False)
-    monkeypatch.setattr(wp_service, "WP_CLIENT", None, raising=False)
 
     monkeypatch.setattr(
         server,
@@ -97,9 +102,11 @@ def test_wordpress_post_success(monkeypatch):
     assert resp.status_code == 200
     assert resp.json() == {"id": 10, "link": "http://post", "site": "wordpress"}
     assert len(calls["uploads"]) == 1
-    filename, content = calls["uploads"][0]
-    assert filename == "img.png"
-    assert content == data
+    # Decoded bytes are streamed like files.
+    content_type, body = calls["uploads"][0]
+    assert content_type.startswith("multipart/form-data")
+    assert b'filename="img.png"' in body
+    assert data in body
     payload = calls["post"]
     assert payload["featured_image"] == 1
     assert "http://img" in payload["content"]
@@ -248,33 +255,81 @@ def test_wordpress_post_misconfigured(monkeypatch):
     assert calls["post"] is None
 
 
-def test_wordpress_post_cleans_temp_files_on_service_exception(monkeypatch, tmp_path):
+def test_wordpress_post_passes_decoded_bytes_without_temp_files(monkeypatch):
     monkeypatch.setattr(server, "WORDPRESS_ACCOUNT_ERRORS", set(), raising=False)
     monkeypatch.setattr(server, "WORDPRESS_CLIENTS", {"acc": object()}, raising=False)
 
-    def boom(*args, **kwargs):
-        raise RuntimeError("boom")
+    def no_temp_files(*args, **kwargs):
+        raise AssertionError("temporary file created")
 
-    monkeypatch.setattr(server, "service_post_to_wordpress", boom)
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", no_temp_files)
+    received = {}
+
+    def fake_service(title, content, images, account, **kwargs):
+        received["images"] = images
+        return {"id": 1}
+
+    monkeypatch.setattr(server, "service_post_to_wordpress", fake_service)
 
-    created: list[Path] = []
-    original_ntf = tempfile.NamedTemporaryFile
+    data = base64.b64encode(b"png-bytes").decode()
+    media_item = server.WordpressMediaItem(filename="img.png", data=data, alt="A")
 
-    def fake_ntf(*args, **kwargs):
-        kwargs.setdefault("delete", False)
-        kwargs["dir"] = tmp_path
-        tmp = original_ntf(*args, **kwargs)
-        created.append(Path(tmp.name))
-        return tmp
+    assert server.post_to_wordpress("acc", "T", "C", media=[media_item]) == {"id": 1}
+    assert received["images"] == [(b"png-bytes", "img.png", "A")]
 
-    monkeypatch.setattr(tempfile, "NamedTemporaryFile", fake_ntf)
+    bad = server.WordpressMediaItem(filename="img.png", data="@@not-base64")
+    result = server.post_to_wordpress("acc", "T", "C", media=[bad])
+    assert result["error"].startswith("Media upload failed")
 
+
+def test_wordpress_post_propagates_service_exception(monkeypatch):
+    monkeypatch.setattr(server, "WORDPRESS_ACCOUNT_ERRORS", set(), raising=False)
+    monkeypatch.setattr(server, "WORDPRESS_CLIENTS", {"acc": object()}, raising=False)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server, "service_post_to_wordpress", boom)
     data = base64.b64encode(b"x").decode()
     media_item = server.WordpressMediaItem(filename="img.png", data=data)
 
     with pytest.raises(RuntimeError):
         server.post_to_wordpress("acc", "T", "C", media=[media_item])
 
-    assert created, "temporary file was not created"
-    for p in created:
-        assert not p.exists()
+
+def test_wordpress_post_multipart_streams_files(monkeypatch):
+    cfg = {
+        "wordpress": {
+            "accounts": {
+                "acc": {
+                    "site": "mysite", "client_id": "id", "client_secret": "sec",
+                    "username": "user", "password": "pwd",
+                }
+            }
+        }
+    }
+    client, calls = make_client(monkeypatch, cfg)
+    resp = client.post(
+        "/wordpress/post/multipart",
+        data={
+            "account": "acc",
+            "title": "T",
+            "content": "C",
+            "tags": ["a", "b"],
+            "alt": ["ALT"],
+            "json_ld": '{"@type": "NewsArticle"}',
+        },
+        files=[("media", ("img.png", b"imgdata", "image/png"))],
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"id": 10, "link": "http://post", "site": "wordpress"}
+    content_type, body = calls["uploads"][0]
+    boundary = content_type.split("boundary=")[1]
+    assert f"--{boundary}--".encode() in body
+    assert b'name="attrs[0][alt]"\r\n\r\nALT\r\n' in body
+    assert b'filename="img.png"\r\nContent-Type: image/png\r\n\r\nimgdata\r\n' in body
+    payload = calls["post"]
+    assert payload["featured_image"] == 1
+    assert payload["tags"] == "a,b"
+    assert 'alt="ALT"' in payload["content"]
+    assert '"@type": "NewsArticle"' in payload["content"]
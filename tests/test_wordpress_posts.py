@@ -100,7 +100,6 @@ def test_wordpress_posts_endpoint(monkeypatch):
     client.session.headers.update({"Authorization": "Bearer tok"})
     monkeypatch.setattr(client.session, "get", fake_get)
 
-    monkeypatch.setattr(wp_posts, "WP_CLIENT", client)
     monkeypatch.setattr(wp_posts, "create_wp_client", lambda account=None: client)
 
     app = TestClient(server.app)
@@ -126,13 +125,80 @@ def test_wordpress_posts_endpoint(monkeypatch):
     assert captured["params"] == {"page": 2, "number": 5}
 
 
+def test_iter_all_posts_requests_fields_and_pages_concurrently(monkeypatch):
+    import threading
+
+    client = wordpress_client.WordpressClient({"wordpress": {"site": "mysite"}})
+    captured = []
+    # Pages 2-4 are only answered once all three are in flight.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_get(url, headers=None, params=None):
+        captured.append(params)
+        page = params["page"]
+        if page > 1:
+            barrier.wait()
+        ids = range((page - 1) * 2 + 1, min(page * 2, 7) + 1)
+        return DummyResp({"found": 7, "posts": [{"ID": i} for i in ids]})
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    posts = list(client.iter_all_posts(number=2))
+    assert sorted(p["id"] for p in posts) == [1, 2, 3, 4, 5, 6, 7]
+    assert sorted(p["page"] for p in captured) == [1, 2, 3, 4]
+    assert all(p["fields"] == wordpress_client.POST_FIELDS for p in captured)
+
+
+def test_iter_post_pages_bounds_pages_in_flight_and_keeps_order():
+    import threading
+    import time
+
+    lock = threading.Lock()
+    requested = []
+
+    class Site:
+        def list_posts_page(self, page, number, status, fields):
+            with lock:
+                requested.append(page)
+            # Later pages answer first.
+            time.sleep(0.002 * (12 - page))
+            return [{"id": page}], 12
+
+    pages = wordpress_client.iter_post_pages(Site(), number=1, workers=3)
+    assert next(pages) == [{"id": 1}]
+    assert next(pages) == [{"id": 2}]
+    time.sleep(0.05)
+    # Page 2 was consumed, so pages 3-5 are the only ones requested ahead.
+    assert sorted(requested) == [1, 2, 3, 4, 5]
+    assert [items[0]["id"] for items in pages] == list(range(3, 13))
+
+
+def test_iter_post_pages_falls_back_to_sequential_paging():
+    class Paged:
+        def __init__(self):
+            self.pages = []
+
+        def list_posts(self, page=1, number=100):
+            self.pages.append(page)
+            return [{"id": page}] * (number if page < 3 else 1)
+
+    client = Paged()
+    pages = list(wordpress_client.iter_post_pages(client, number=2))
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert client.pages == [1, 2, 3]
+
+    class NoTotal:
+        def list_posts_page(self, page, number, status, fields):
+            return ([{"id": page}] * (number if page < 2 else 0)), None
+
+    assert len(list(wordpress_client.iter_all_posts(NoTotal(), number=3))) == 3
+
+
 def test_service_list_posts(monkeypatch):
     class DummyClient:
         def list_posts(self, page=1, number=10):
             return [{"id": 1}]
 
     dummy = DummyClient()
-    monkeypatch.setattr(wp_posts, "WP_CLIENT", dummy)
     monkeypatch.setattr(wp_posts, "create_wp_client", lambda account=None: dummy)
     res = wp_posts.list_posts(None, 1, 10)
     assert res == {"posts": [{"id": 1}]}
@@ -74,12 +74,11 @@ def test_service_delete_posts(monkeypatch):
             return pid
 
     dummy = DummyClient()
-    monkeypatch.setattr(wp_posts, "WP_CLIENT", dummy)
     monkeypatch.setattr(wp_posts, "create_wp_client", lambda account=None: dummy)
 
     res = wp_posts.delete_posts(None, [1, 2, 3])
     assert res == {"deleted": [1, 3], "errors": {"2": "nope"}}
-    assert dummy.called == [1, 3]
+    assert sorted(dummy.called) == [1, 3]
 
 
 def test_delete_posts_endpoint(monkeypatch):
@@ -92,7 +91,6 @@ def test_delete_posts_endpoint(monkeypatch):
             return pid
 
     dummy = DummyClient()
-    monkeypatch.setattr(wp_posts, "WP_CLIENT", dummy)
     monkeypatch.setattr(wp_posts, "create_wp_client", lambda account=None: dummy)
 
     app = TestClient(server.app)
@@ -101,7 +99,7 @@ def test_delete_posts_endpoint(monkeypatch):
     )
     assert resp.status_code == 200
     assert resp.json() == {"deleted": [1, 2], "errors": {}, "success": 2, "failed": 0}
-    assert dummy.deleted == [1, 2]
+    assert sorted(dummy.deleted) == [1, 2]
 
 
 def test_client_empty_trash(monkeypatch):
@@ -123,5 +121,8 @@ def test_client_empty_trash(monkeypatch):
     monkeypatch.setattr(client, "delete_post", fake_delete_post)
     res = client.empty_trash()
     assert calls["list"] == [{"page": 1, "number": 100, "status": "trash"}]
-    assert calls["deleted"] == [{"id": 1, "permanent": True}, {"id": 2, "permanent": True}]
+    assert sorted(calls["deleted"], key=lambda c: c["id"]) == [
+        {"id": 1, "permanent": True},
+        {"id": 2, "permanent": True},
+    ]
     assert res == [1, 2]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+import json
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -17,13 +18,13 @@ import services.wordpress_pv_csv as wp_pv_csv
 def test_export_views_generates_csv(monkeypatch, tmp_path):
     posts = [{"id": 1, "title": "Post 1"}, {"id": 2, "title": "Post 2"}]
 
-    def fake_list_posts(self, page=1, number=100):
-        return posts if page == 1 else []
+    def fake_list_posts_page(self, page=1, number=100, status=None, fields=None):
+        return (posts if page == 1 else []), len(posts)
 
     def fake_get_daily_views(self, post_ids, day):  # noqa: ARG001
         return {1: 3, 2: 5}
 
-    monkeypatch.setattr(WordpressClient, "list_posts", fake_list_posts)
+    monkeypatch.setattr(WordpressClient, "list_posts_page", fake_list_posts_page)
     monkeypatch.setattr(WordpressClient, "get_daily_views", fake_get_daily_views)
 
     def fake_create_wp_client(account):  # noqa: ARG001
@@ -57,27 +58,180 @@ def test_export_views_generates_csv(monkeypatch, tmp_path):
     assert rows[2] == ["dummy", "mysite", "2", "Post 2", "5"]
 
 
-def test_wordpress_pv_csv_endpoint(monkeypatch):
+def test_wordpress_pv_csv_endpoint(monkeypatch, tmp_path):
     called: dict[str, object] = {}
 
-    def fake_add_task(self, func, *args, **kwargs):  # noqa: ARG001
-        called["func"] = func
-        called["args"] = args
+    def fake_export(accounts, days, out_dir, **kwargs):
+        called["args"] = (accounts, days, out_dir)
         called["kwargs"] = kwargs
-
-    monkeypatch.setattr(server.BackgroundTasks, "add_task", fake_add_task)
-
-    def fake_export(accounts, days, out_dir):  # noqa: ARG001
-        return None
+        return {"file": str(out_dir / "pv.csv")}
 
     monkeypatch.setattr(server, "service_export_views", fake_export)
     cfg = {"wordpress": {"accounts": {"acc1": {}, "acc2": {}}}}
     monkeypatch.setattr(server, "CONFIG", cfg, raising=False)
+    jobs = server.create_job_queue({"path": str(tmp_path / "jobs.sqlite3")})
+    jobs.handlers = server.JOBS.handlers
+    monkeypatch.setattr(server, "JOBS", jobs)
 
     client = TestClient(server.app)
     resp = client.post("/wordpress/stats/pv-csv", params={"days": 5})
     assert resp.status_code == 200
-    assert resp.json() == {"status": "accepted"}
-    assert called["func"] is fake_export
+    body = resp.json()
+    assert body["status"] == "accepted"
+    job = jobs.wait(body["job"], timeout=5)
+    assert job["status"] == "succeeded"
     expected_dir = Path(server.__file__).resolve().parent / "csv"
     assert called["args"] == (cfg["wordpress"]["accounts"], 5, expected_dir)
+    assert called["kwargs"] == {"fmt": "csv"}
+    assert job["result"] == {"file": str(expected_dir / "pv.csv")}
+    # Account secrets are resolved at run time and never stored in the queue.
+    assert "acc1" not in json.dumps(job["params"])
+
+    resp = client.post(
+        "/wordpress/stats/pv-csv", params={"days": 5, "format": "parquet"}
+    )
+    assert resp.status_code == 200
+    jobs.wait(resp.json()["job"], timeout=5)
+    assert called["kwargs"] == {"fmt": "parquet"}
+    resp = client.post("/wordpress/stats/pv-csv", params={"format": "xlsx"})
+    assert resp.status_code == 422
+    jobs.stop()
+
+
+def test_export_views_multiple_accounts_and_batches(monkeypatch, tmp_path):
+    posts = {
+        "a1": [{"id": i, "title": f"A{i}"} for i in range(1, 151)],
+        "a2": [{"id": 1000, "title": "B"}],
+    }
+    calls: list[tuple[str, int, str]] = []
+
+    class FakeClient:
+        def __init__(self, account):
+            self.account = account
+            self.site = f"{account}.site"
+
+        def list_posts(self, page=1, number=100):
+            items = posts[self.account]
+            return items[(page - 1) * number : page * number]
+
+        def get_daily_views(self, post_ids, day):
+            calls.append((self.account, len(post_ids), day))
+            return {pid: pid for pid in post_ids}
+
+    clients = {name: FakeClient(name) for name in posts}
+    monkeypatch.setattr(wp_pv_csv, "create_wp_client", lambda account: clients[account])
+    acquired: list[float] = []
+
+    class Bucket:
+        def __init__(self, rate):
+            self.rate = rate
+
+        def acquire(self):
+            acquired.append(self.rate)
+
+    monkeypatch.setattr(wp_pv_csv, "TokenBucket", Bucket)
+
+    result = wp_pv_csv.export_views({"a1": {}, "a2": {}}, 2, tmp_path)
+
+    with open(result["file"], encoding="utf-8") as fh:
+        rows = list(csv.reader(fh))
+    assert rows[0] == ["account", "site", "post_id", "title", "pv_day1", "pv_day2"]
+    assert [r[0] for r in rows[1:]] == ["a1"] * 150 + ["a2"]
+    assert rows[1] == ["a1", "a1.site", "1", "A1", "1", "1"]
+    assert rows[150] == ["a1", "a1.site", "150", "A150", "150", "150"]
+    assert rows[151] == ["a2", "a2.site", "1000", "B", "1000", "1000"]
+    # Each request covers at most one batch of 100 IDs.
+    assert sorted(n for acc, n, _ in calls if acc == "a1") == [50, 50, 100, 100]
+    # Every request is paced by the export's own bucket.
+    assert acquired == [5.0] * len(calls)
+
+
+def test_export_views_reuses_closed_days_from_store(monkeypatch, tmp_path):
+    calls: list[tuple[str, tuple[int, ...]]] = []
+
+    class FakeClient:
+        site = "mysite"
+
+        def list_posts(self, page=1, number=100):
+            return [{"id": 1, "title": "P1"}, {"id": 2, "title": "P2"}] if page == 1 else []
+
+        def get_daily_views(self, post_ids, day):
+            calls.append((day, tuple(post_ids)))
+            return {1: 7}  # post 2 omitted -> zero views
+
+    client = FakeClient()
+    monkeypatch.setattr(wp_pv_csv, "create_wp_client", lambda account: client)
+
+    first = wp_pv_csv.export_views({"acc": {}}, 4, tmp_path / "one")
+    assert len(calls) == 4
+    store_path = tmp_path / "one" / wp_pv_csv.STORE_NAME
+    assert store_path.exists()
+
+    calls.clear()
+    second = wp_pv_csv.export_views(
+        {"acc": {}}, 4, tmp_path / "two", store_path=store_path
+    )
+    # Only today and yesterday are requested again.
+    assert len(calls) == 2
+    with open(first["file"], encoding="utf-8") as fh:
+        rows_first = list(csv.reader(fh))
+    with open(second["file"], encoding="utf-8") as fh:
+        rows_second = list(csv.reader(fh))
+    assert rows_first == rows_second
+    assert rows_second[2] == ["acc", "mysite", "2", "P2", "0", "0", "0", "0"]
+
+    calls.clear()
+    wp_pv_csv.export_views({"acc": {}}, 4, tmp_path / "three", incremental=False)
+    assert len(calls) == 4
+    assert not (tmp_path / "three" / wp_pv_csv.STORE_NAME).exists()
+
+
+def test_export_views_streams_rows_per_page(monkeypatch, tmp_path):
+    import time
+
+    pages = [
+        [{"id": i, "title": f"P{i}"} for i in range(1, 101)],
+        [{"id": 101, "title": "P101"}],
+    ]
+    out_dir = tmp_path / "out"
+    seen_before_last_page: list[int] = []
+
+    class FakeClient:
+        site = "mysite"
+
+        def list_posts(self, page=1, number=100):
+            return pages[page - 1] if page <= len(pages) else []
+
+        def get_daily_views(self, post_ids, day):
+            if post_ids == [101]:
+                # The first page must already be on disk before the second
+                # page is resolved.
+                deadline = time.monotonic() + 2
+                while time.monotonic() < deadline:
+                    files = list(out_dir.glob("pv_*.csv"))
+                    if files:
+                        lines = files[0].read_text(encoding="utf-8").splitlines()
+                        if len(lines) > 100:
+                            seen_before_last_page.append(len(lines))
+                            break
+                    time.sleep(0.01)
+            return {pid: 1 for pid in post_ids}
+
+    monkeypatch.setattr(wp_pv_csv, "create_wp_client", lambda account: FakeClient())
+    result = wp_pv_csv.export_views({"acc": {}}, 1, out_dir, incremental=False)
+    assert seen_before_last_page == [101]
+    with open(result["file"], encoding="utf-8") as fh:
+        rows = list(csv.reader(fh))
+    assert len(rows) == 102
+    assert rows[-1] == ["acc", "mysite", "101", "P101", "1"]
+
+
+def test_export_views_propagates_producer_errors(monkeypatch, tmp_path):
+    import pytest
+
+    def broken_client(account):
+        raise ValueError(f"bad account {account}")
+
+    monkeypatch.setattr(wp_pv_csv, "create_wp_client", broken_client)
+    with pytest.raises(ValueError):
+        wp_pv_csv.export_views({"a": {}, "b": {}}, 1, tmp_path, incremental=False)
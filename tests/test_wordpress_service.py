@@ -23,9 +23,10 @@ class DummyClient:
     def authenticate(self):
         self.authenticated = True
 
-    def upload_media(self, content, filename):
+    def upload_media(self, content, filename, alt=None):
+        # IDs come from the file name since uploads may finish in any order.
         self.uploaded.append((filename, content))
-        idx = len(self.uploaded)
+        idx = int("".join(c for c in filename if c.isdigit()) or 1)
         return {"id": idx, "url": f"http://img{idx}"}
 
     def create_post(
@@ -102,10 +103,9 @@ def test_post_to_wordpress_uploads_and_creates(monkeypatch, tmp_path):
     assert resp["link"] == "http://post"
     assert resp["site"] == "wordpress"
     # Uploaded both images
-    assert dummy.uploaded[0][0] == "x1.jpg"
-    assert dummy.uploaded[1][0] == "x2.jpg"
+    assert sorted(name for name, _ in dummy.uploaded) == ["x1.jpg", "x2.jpg"]
     # Alt text updated for each image
-    assert dummy.updated_alt_text == [(1, "alt1"), (2, "alt2")]
+    assert sorted(dummy.updated_alt_text) == [(1, "alt1"), (2, "alt2")]
     # HTML contains image tags
     html = dummy.created["html"]
     assert '<img src="http://img1" alt="alt1"' in html
@@ -205,7 +205,7 @@ def test_post_to_wordpress_skips_image_without_url(monkeypatch, tmp_path):
     """No <img> tag should be added when upload provides no URL."""
 
     class DummyNoURLClient(DummyClient):
-        def upload_media(self, content, filename):
+        def upload_media(self, content, filename, alt=None):
             self.uploaded.append((filename, content))
             return {"id": 1}  # no URL returned
 
@@ -260,3 +260,61 @@ def test_post_to_wordpress_appends_json_ld(monkeypatch):
     html = dummy.created["html"]
     assert '<script type="application/ld+json">' in html
     assert '"@type": "NewsArticle"' in html
+
+
+def test_post_to_wordpress_uploads_concurrently_in_order(monkeypatch, tmp_path):
+    import threading
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    class DummyAltClient(DummyClient):
+        def upload_media(self, content, filename, alt=None):
+            # Every upload waits for the others, so they must run in parallel.
+            barrier.wait()
+            res = super().upload_media(content, filename, alt)
+            if alt:
+                res["alt"] = alt
+            return res
+
+    dummy = DummyAltClient({})
+    monkeypatch.setattr(wp_service, "create_wp_client", lambda account=None: dummy)
+
+    images = []
+    for i in (3, 1, 2):
+        img = tmp_path / f"{i}.jpg"
+        img.write_bytes(b"x")
+        images.append((img, f"x{i}.jpg", "given" if i != 2 else None))
+
+    wp_service.post_to_wordpress("Title", "Body", images, account="acc")
+    html = dummy.created["html"]
+    assert html.index("http://img3") < html.index("http://img1") < html.index(
+        "http://img2"
+    )
+    assert dummy.created["featured_id"] == 3
+    # Alt text stored by the upload is not sent again.
+    assert dummy.updated_alt_text == [(2, "x2")]
+
+
+def test_post_to_wordpress_accepts_in_memory_sources(monkeypatch, tmp_path):
+    import io
+
+    dummy = DummyClient({})
+    monkeypatch.setattr(wp_service, "create_wp_client", lambda account=None: dummy)
+    raw = bytearray(b"abc")
+    view = memoryview(raw)
+    img = tmp_path / "c.jpg"
+    img.write_bytes(b"file")
+
+    resp = wp_service.post_to_wordpress(
+        "Title",
+        "Body",
+        [(view, "x1.jpg", "a"), (io.BytesIO(b"stream"), "x2.jpg"), (img, "x3.jpg")],
+        account="acc",
+    )
+    assert resp["id"] == 10
+    sources = dict(dummy.uploaded)
+    # Buffers are passed through untouched; paths are opened as file objects.
+    assert sources["x1.jpg"] is view
+    assert hasattr(sources["x2.jpg"], "read")
+    assert hasattr(sources["x3.jpg"], "read")
+    assert '<img src="http://img3" alt="x3"' in dummy.created["html"]
@@ -29,7 +29,6 @@ def test_wordpress_views_endpoint(monkeypatch):
     client.session.headers.update({"Authorization": "Bearer tok"})
     monkeypatch.setattr(client.session, "get", fake_get)
 
-    monkeypatch.setattr(wp_stats, "WP_CLIENT", client)
     monkeypatch.setattr(wp_stats, "create_wp_client", lambda account=None: client)
 
     app = TestClient(server.app)
@@ -69,7 +68,6 @@ def test_wordpress_views_no_data(monkeypatch):
     client.session.headers.update({"Authorization": "Bearer tok"})
     monkeypatch.setattr(client.session, "get", fake_get)
 
-    monkeypatch.setattr(wp_stats, "WP_CLIENT", client)
     monkeypatch.setattr(wp_stats, "create_wp_client", lambda account=None: client)
 
     app = TestClient(server.app)
@@ -104,7 +102,6 @@ def test_wordpress_search_terms_endpoint(monkeypatch):
     client.session.headers.update({"Authorization": "Bearer tok"})
     monkeypatch.setattr(client.session, "get", fake_get)
 
-    monkeypatch.setattr(wp_stats, "WP_CLIENT", client)
     monkeypatch.setattr(wp_stats, "create_wp_client", lambda account=None: client)
 
     app = TestClient(server.app)
@@ -1,7 +1,18 @@
+import io
 import logging
+import math
+import mimetypes
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterator
+
 import requests
 
+import governor
+from bulk_delete import bulk_delete
+from multipart_stream import MultipartStream
+
 
 class WordpressAuthError(Exception):
     """Raised when authentication with WordPress fails."""
@@ -10,6 +21,190 @@ class WordpressAuthError(Exception):
 logger = logging.getLogger(__name__)
 
 
+def select_account(config: dict) -> dict:
+    """Return the account section a client should use from ``config``."""
+    wp_cfg = (config or {}).get("wordpress", {})
+    accounts = wp_cfg.get("accounts")
+    if accounts:
+        return accounts.get("default") or next(iter(accounts.values()))
+    return wp_cfg
+
+
+def parse_media_response(data: dict) -> dict:
+    """Extract media ID and URL from a ``media/new`` response.
+
+    The stored ``alt`` text is included when the response carries one.
+    """
+    media = data.get("media")
+    item = media[0] if media else data
+    media_id = item.get("id")
+    media_url = item.get("source_url") or item.get("URL") or item.get("link")
+    result = {"id": media_id, "url": media_url}
+    alt = item.get("alt") if isinstance(item.get("alt"), str) else None
+    if alt:
+        result["alt"] = alt
+    return result
+
+
+def _seekable(fh) -> bool:
+    try:
+        return bool(fh.seekable())
+    except Exception:
+        return False
+
+
+def media_upload_fields(alt: str | None) -> dict | None:
+    """Return extra ``media/new`` form fields setting the alt text."""
+    return {"attrs[0][alt]": alt} if alt else None
+
+
+def build_post_payload(
+    title: str,
+    html: str,
+    featured_id: int | None = None,
+    paid_content: str | None = None,
+    categories: list[str] | None = None,
+    tags: list[str] | None = None,
+    slug: str | None = None,
+    excerpt: str | None = None,
+) -> dict:
+    """Return the JSON payload for ``posts/new``."""
+    payload = {"title": title, "content": html, "status": "publish"}
+    if featured_id:
+        payload["featured_image"] = featured_id
+    if paid_content is not None:
+        payload["paid_content"] = paid_content
+    if categories:
+        payload["categories"] = ",".join(categories)
+    if tags:
+        payload["tags"] = ",".join(tags)
+    if slug:
+        payload["slug"] = slug
+    if excerpt:
+        payload["excerpt"] = excerpt
+    return payload
+
+
+def parse_posts(data: dict) -> list[dict]:
+    """Reduce a ``posts`` response to id, title, date and URL."""
+    posts: list[dict] = []
+    for item in data.get("posts", []):
+        posts.append(
+            {
+                "id": item.get("ID"),
+                "title": item.get("title"),
+                "date": item.get("date"),
+                "url": item.get("URL"),
+            }
+        )
+    return posts
+
+
+# Post fields read by :func:`parse_posts`; requesting only these keeps
+# rendered content out of listing responses.
+POST_FIELDS = "ID,title,date,URL"
+# Pages fetched concurrently once the total post count is known.
+PAGE_WORKERS = 4
+
+
+def iter_post_pages(
+    client,
+    number: int = 100,
+    status: str | None = None,
+    fields: str | None = POST_FIELDS,
+    workers: int = PAGE_WORKERS,
+) -> Iterator[list[dict]]:
+    """Yield every page of the client's posts in page order.
+
+    The first page reports the total (``found``), so the remaining pages are
+    fetched ahead on ``workers`` threads, at most ``workers`` at a time, and
+    yielded in page order. Clients without :meth:`WordpressClient.list_posts_page` are paged
+    sequentially through ``list_posts``.
+    """
+    list_page = getattr(client, "list_posts_page", None)
+    if list_page is None:
+        page = 1
+        while True:
+            items = client.list_posts(page=page, number=number)
+            if not items:
+                return
+            yield items
+            if len(items) < number:
+                return
+            page += 1
+
+    items, found = list_page(1, number, status, fields)
+    if not items:
+        return
+    yield items
+    if found is None:
+        # Without a total, fall back to reading page after page.
+        page = 1
+        while len(items) == number:
+            page += 1
+            items, _ = list_page(page, number, status, fields)
+            if not items:
+                return
+            yield items
+        return
+
+    pages = math.ceil(found / number)
+    if pages <= 1:
+        return
+    workers = max(1, min(workers, pages - 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wp-pages") as pool:
+        # At most ``workers`` pages are in flight; the next page is requested
+        # as each one is consumed, so slow consumers never buffer the site.
+        pending = deque(
+            pool.submit(list_page, page, number, status, fields)
+            for page in range(2, min(pages, workers + 1) + 1)
+        )
+        next_page = len(pending) + 2
+        try:
+            while pending:
+                items, _ = pending.popleft().result()
+                if next_page <= pages:
+                    pending.append(
+                        pool.submit(list_page, next_page, number, status, fields)
+                    )
+                    next_page += 1
+                if items:
+                    yield items
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_all_posts(client, **kwargs) -> Iterator[dict]:
+    """Yield every post of the client, page by page.
+
+    Accepts the keyword arguments of :func:`iter_post_pages`.
+    """
+    for items in iter_post_pages(client, **kwargs):
+        yield from items
+
+
+def parse_daily_views(data: dict | None) -> dict[int, int]:
+    """Return ``{post_id: views}`` from a ``stats/views/posts`` response."""
+    results: dict[int, int] = {}
+    views = (data or {}).get("views") or {}
+    for pid_str, count in views.items():
+        try:
+            results[int(pid_str)] = int(count)
+        except (ValueError, TypeError):
+            continue
+    return results
+
+
+def parse_search_terms(data: dict) -> list[dict]:
+    """Return ``[{"term", "views"}]`` from a ``stats/search-terms`` response."""
+    parsed: list[dict] = []
+    for item in data.get("search_terms", []):
+        if isinstance(item, (list, tuple)) and len(item) >= 2:
+            parsed.append({"term": item[0], "views": item[1]})
+    return parsed
+
+
 class WordpressClient:
     """Simple client for WordPress.com API."""
 
@@ -25,12 +220,7 @@ class WordpressClient:
         self.config = config or {}
         self.session = session or requests.Session()
         self.timeout = timeout
-        wp_cfg = self.config.get("wordpress", {})
-        accounts = wp_cfg.get("accounts")
-        if accounts:
-            acct = accounts.get("default") or next(iter(accounts.values()))
-        else:
-            acct = wp_cfg
+        acct = select_account(self.config)
         self.site = acct.get("site")
         self.client_id = acct.get("client_id")
         self.client_secret = acct.get("client_secret")
@@ -38,24 +228,61 @@ class WordpressClient:
         self.password = acct.get("password")
         self.plan_id: str | None = acct.get("plan_id")
         self.access_token: str | None = None
+        self.token_expires_at: float | None = None
+        # Retry and rate-limit policy; ``None`` uses the shared governor.
+        self.governor: governor.Governor | None = None
+
+    def _request(
+        self, method: str, url: str, idempotent: bool | None = None, **kwargs
+    ) -> requests.Response:
+        """Send a request through the session applying default timeout.
+
+        Requests go through the :mod:`governor`, which paces the API host,
+        honours ``Retry-After`` and retries rate-limited and failed
+        idempotent requests; ``idempotent`` marks a ``POST`` as safe to
+        repeat. The access token is refreshed lazily: once it
+        has expired, or when the API rejects it with ``401``, the client
+        re-authenticates and retries the request a single time.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        session_send = getattr(self.session, method)
+        gov = self.governor or governor.GOVERNOR
+        refresh = url != self.TOKEN_URL and self.access_token is not None
+        if refresh and self.token_expired():
+            logger.debug("Access token expired, re-authenticating")
+            self.authenticate()
+
+        def send():
+            body = kwargs.get("data")
+            if hasattr(body, "seek") and hasattr(body, "tell") and body.tell():
+                # Streamed bodies were consumed by the previous attempt.
+                body.seek(0)
+            try:
+                return session_send(url, **kwargs)
+            except TypeError:
+                kwargs.pop("timeout", None)
+                return session_send(url, **kwargs)
+
+        resp = gov.request(send, url, method, idempotent)
+        if refresh and getattr(resp, "status_code", None) == 401:
+            logger.debug("Access token rejected, re-authenticating")
+            self.authenticate()
+            resp = gov.request(send, url, method, idempotent)
+        return resp
 
     def _get(self, url: str, **kwargs) -> requests.Response:
         """Wrapper around ``session.get`` applying default timeout."""
-        kwargs.setdefault("timeout", self.timeout)
-        try:
-            return self.session.get(url, **kwargs)
-        except TypeError:
-            kwargs.pop("timeout", None)
-            return self.session.get(url, **kwargs)
+        return self._request("get", url, **kwargs)
 
     def _post(self, url: str, **kwargs) -> requests.Response:
         """Wrapper around ``session.post`` applying default timeout."""
-        kwargs.setdefault("timeout", self.timeout)
-        try:
-            return self.session.post(url, **kwargs)
-        except TypeError:
-            kwargs.pop("timeout", None)
-            return self.session.post(url, **kwargs)
+        return self._request("post", url, **kwargs)
+
+    def token_expired(self) -> bool:
+        """Return ``True`` when the access token is known to have expired."""
+        if self.token_expires_at is None:
+            return False
+        return time.monotonic() >= self.token_expires_at
 
     def authenticate(self) -> None:
         """Authenticate and store access token in headers."""
@@ -74,10 +301,15 @@ class WordpressClient:
                 "Auth response status: %s, body: [redacted]", resp.status_code
             )
             resp.raise_for_status()
-            token = resp.json().get("access_token")
+            body = resp.json()
+            token = body.get("access_token")
             if not token:
                 raise WordpressAuthError("No access_token in response")
             self.access_token = token
+            expires_in = body.get("expires_in")
+            self.token_expires_at = (
+                time.monotonic() + float(expires_in) if expires_in else None
+            )
             self.session.headers.update({"Authorization": f"Bearer {token}"})
         except Exception as exc:
             if resp is not None:
@@ -86,29 +318,51 @@ class WordpressClient:
                 )
             raise WordpressAuthError(f"Authentication failed: {exc}") from exc
 
-    def upload_media(self, content: bytes, filename: str) -> dict:
-        """Upload media bytes and return media ID and URL."""
+    def upload_media(
+        self,
+        content: bytes | memoryview | BinaryIO,
+        filename: str,
+        alt: str | None = None,
+    ) -> dict:
+        """Upload media and return media ID and URL.
+
+        ``content`` may be bytes, a memoryview or a binary file object.
+        In-memory content and seekable file objects are streamed in chunks
+        through a :class:`multipart_stream.MultipartStream`, so no second
+        copy of the body is built; other file objects are passed to the
+        HTTP layer as is.
+        When ``alt`` is given it is sent with the upload, and the returned
+        dict includes ``alt`` if the API stored it.
+        """
         url = f"{self.API_BASE.format(site=self.site)}/media/new"
-        files = {"media[]": (filename, content)}
+        fields = media_upload_fields(alt)
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            content = io.BytesIO(content)
+        if hasattr(content, "read") and _seekable(content):
+            content_type = (
+                mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            )
+            stream = MultipartStream(
+                fields, {"media[]": (filename, content, content_type)}
+            )
+            kwargs = {
+                "data": stream,
+                "headers": {"Content-Type": stream.content_type},
+            }
+            size = len(stream)
+        else:
+            kwargs = {"files": {"media[]": (filename, content)}}
+            if fields:
+                kwargs["data"] = fields
+            size = "unknown"
         resp: requests.Response | None = None
         try:
-            print(f"POST {url} with {filename}, {len(content)} bytes")
-            resp = self._post(url, files=files)
+            print(f"POST {url} with {filename}, {size} bytes")
+            resp = self._post(url, **kwargs)
             print(resp.status_code, resp.text)
             print(getattr(resp, "headers", None))
             resp.raise_for_status()
-            data = resp.json()
-            media = data.get("media")
-            if media:
-                item = media[0]
-                media_id = item.get("id")
-                media_url = item.get("source_url") or item.get("URL") or item.get("link")
-            else:
-                media_id = data.get("id")
-                media_url = (
-                    data.get("source_url") or data.get("URL") or data.get("link")
-                )
-            return {"id": media_id, "url": media_url}
+            return parse_media_response(resp.json())
         except Exception as exc:
             if resp is not None:
                 print(resp.status_code, resp.text)
@@ -128,19 +382,16 @@ class WordpressClient:
     ) -> dict:
         """Create and publish a post with optional featured image."""
         url = f"{self.API_BASE.format(site=self.site)}/posts/new"
-        payload = {"title": title, "content": html, "status": "publish"}
-        if featured_id:
-            payload["featured_image"] = featured_id
-        if paid_content is not None:
-            payload["paid_content"] = paid_content
-        if categories:
-            payload["categories"] = ",".join(categories)
-        if tags:
-            payload["tags"] = ",".join(tags)
-        if slug:
-            payload["slug"] = slug
-        if excerpt:
-            payload["excerpt"] = excerpt
+        payload = build_post_payload(
+            title,
+            html,
+            featured_id,
+            paid_content=paid_content,
+            categories=categories,
+            tags=tags,
+            slug=slug,
+            excerpt=excerpt,
+        )
         resp: requests.Response | None = None
         try:
             print(f"POST {url} payload: {payload}")
@@ -158,7 +409,11 @@ class WordpressClient:
             raise RuntimeError(f"Post creation failed: {exc}") from exc
 
     def list_posts(
-        self, page: int = 1, number: int = 10, status: str | None = None
+        self,
+        page: int = 1,
+        number: int = 10,
+        status: str | None = None,
+        fields: str | None = None,
     ) -> list[dict]:
         """Return posts with basic information.
 
@@ -170,32 +425,40 @@ class WordpressClient:
             Number of posts per page.
         status: str | None
             Optional status filter such as ``"trash"`` to list trashed posts.
+        fields: str | None
+            Comma-separated post fields to request, e.g. :data:`POST_FIELDS`.
         """
+        return self.list_posts_page(page, number, status, fields)[0]
+
+    def list_posts_page(
+        self,
+        page: int = 1,
+        number: int = 10,
+        status: str | None = None,
+        fields: str | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """Return one page of posts and the total number of matching posts."""
         url = f"{self.API_BASE.format(site=self.site)}/posts"
         params = {"page": page, "number": number}
         if status is not None:
             params["status"] = status
+        if fields is not None:
+            params["fields"] = fields
         resp: requests.Response | None = None
         try:
             resp = self._get(url, headers=self.session.headers, params=params)
             resp.raise_for_status()
             data = resp.json()
-            posts: list[dict] = []
-            for item in data.get("posts", []):
-                posts.append(
-                    {
-                        "id": item.get("ID"),
-                        "title": item.get("title"),
-                        "date": item.get("date"),
-                        "url": item.get("URL"),
-                    }
-                )
-            return posts
+            return parse_posts(data), data.get("found")
         except Exception as exc:
             if resp is not None:
                 print(resp.status_code, resp.text)
             raise RuntimeError(f"Fetching posts failed: {exc}") from exc
 
+    def iter_all_posts(self, **kwargs) -> Iterator[dict]:
+        """Yield every post, fetching pages concurrently; see :func:`iter_all_posts`."""
+        return iter_all_posts(self, **kwargs)
+
     def delete_post(self, post_id: int, permanent: bool = False) -> int:
         """Delete a post by ID and return the deleted ID.
 
@@ -211,7 +474,8 @@ class WordpressClient:
         params = {"force": 1} if permanent else None
         resp: requests.Response | None = None
         try:
-            resp = self._post(url, params=params)
+            # Deleting again has the same result, so failures are retried.
+            resp = self._post(url, params=params, idempotent=True)
             resp.raise_for_status()
             return post_id
         except Exception as exc:
@@ -222,26 +486,29 @@ class WordpressClient:
     def empty_trash(self) -> list[int]:
         """Permanently remove all posts currently in the trash.
 
+        Each page of trashed posts is deleted concurrently through
+        :func:`bulk_delete.bulk_delete`.
+
         Returns
         -------
         list[int]
             IDs of posts that were successfully deleted.
         """
         deleted: list[int] = []
-        page = 1
         while True:
-            items = self.list_posts(page=page, number=100, status="trash")
+            # Deleting shifts later posts forward, so always read page 1.
+            items = self.list_posts(page=1, number=100, status="trash")
             if not items:
                 break
-            for item in items:
-                try:
-                    self.delete_post(item["id"], permanent=True)
-                    deleted.append(item["id"])
-                except Exception:
-                    continue
-            if len(items) < 100:
+            result = bulk_delete(
+                lambda pid: self.delete_post(pid, permanent=True),
+                [item["id"] for item in items],
+                site=self.site,
+                name=f"{self.site}:trash",
+            )
+            deleted.extend(result.deleted)
+            if not result.deleted or len(items) < 100:
                 break
-            page += 1
         return deleted
 
     def get_site_info(self, fields: str | None = None) -> dict:
@@ -294,6 +561,19 @@ class WordpressClient:
                 print(resp.status_code, resp.text)
             raise RuntimeError(f"Fetching media failed: {exc}") from exc
 
+    def get_media(self, media_id: int) -> dict:
+        """Return a single media library item."""
+        url = f"{self.API_BASE.format(site=self.site)}/media/{media_id}"
+        resp: requests.Response | None = None
+        try:
+            resp = self._get(url)
+            resp.raise_for_status()
+            return resp.json()
+        except Exception as exc:
+            if resp is not None:
+                print(resp.status_code, resp.text)
+            raise RuntimeError(f"Fetching media failed: {exc}") from exc
+
     def update_media_alt_text(self, media_id: int, alt_text: str) -> dict:
         """Update the alt text for a media item."""
         url = f"{self.API_BASE.format(site=self.site)}/media/{media_id}"
@@ -315,7 +595,7 @@ class WordpressClient:
         url = f"{self.API_BASE.format(site=self.site)}/media/{media_id}/delete"
         resp: requests.Response | None = None
         try:
-            resp = self._post(url)
+            resp = self._post(url, idempotent=True)
             resp.raise_for_status()
             return media_id
         except Exception as exc:
@@ -332,6 +612,8 @@ class WordpressClient:
             List of WordPress post IDs to fetch.
         day: str
             Target day in ``YYYY-MM-DD`` format.
+
+        Requests are paced by the governor's limit for the API host.
         """
         url = f"{self.API_BASE.format(site=self.site)}/stats/views/posts"
         headers = self.session.headers
@@ -346,20 +628,13 @@ class WordpressClient:
             try:
                 resp = self._get(url, headers=headers, params=params)
                 resp.raise_for_status()
-                data = resp.json() or {}
-                views = data.get("views") or {}
-                for pid_str, count in views.items():
-                    try:
-                        results[int(pid_str)] = int(count)
-                    except (ValueError, TypeError):
-                        continue
+                results.update(parse_daily_views(resp.json()))
             except Exception as exc:
                 if resp is not None:
                     print(resp.status_code, getattr(resp, "text", ""))
                 raise RuntimeError(
                     f"Fetching daily views failed: {exc}"
                 ) from exc
-            time.sleep(1)
         return results
 
     def get_post_views(self, post_id: int, days: int) -> dict:
@@ -384,16 +659,7 @@ class WordpressClient:
         try:
             resp = self._get(url, headers=self.session.headers, params=params)
             resp.raise_for_status()
-            data = resp.json()
-            terms = data.get("search_terms", [])
-            parsed: list[dict] = []
-            for item in terms:
-                if (
-                    isinstance(item, (list, tuple))
-                    and len(item) >= 2
-                ):
-                    parsed.append({"term": item[0], "views": item[1]})
-            return parsed
+            return parse_search_terms(resp.json())
         except Exception as exc:
             if resp is not None:
                 print(resp.status_code, resp.text)